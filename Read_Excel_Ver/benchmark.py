@@ -0,0 +1,221 @@
+"""
+Function: generate synthetic With_FrameID csv files and benchmark the data loading steps without real test data
+Date: 10/17/2026
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import cache
+from data_operation import *
+
+
+def generate_synthetic_csv(file_path, frame_count=20000, rows_per_frame=3, missing=0.5, seed=0, dropped=0.0):
+    """
+    Write a With_FrameID csv file like the exported test data: the frame ids are only written on the first row of every frame, the other cells are left empty at random
+    :param file_path: the path of the csv file to write
+    :param frame_count: the number of camera frames
+    :param rows_per_frame: the number of rows logged per frame
+    :param missing: the share of the signal cells left empty
+    :param seed: the seed of the random data
+    :param dropped: the share of the frames left out of the file (so the tests do not have the same camera ids)
+    :return: the path of the csv file
+    """
+    rng = np.random.default_rng(seed)
+    row_count = frame_count * rows_per_frame
+    data = {"t[s]": np.arange(row_count) * 0.011}
+    frame_ids = np.full(row_count, np.nan)
+    frame_ids[::rows_per_frame] = np.arange(frame_count)
+    data["Camera_Frame_ID"] = frame_ids
+    data["EyeQ_Frame_ID"] = frame_ids + 1000
+    for col in HEADER_LIST[3:]:
+        values = np.cumsum(rng.normal(0, 0.01, row_count))
+        values[rng.random(row_count) < missing] = np.nan
+        data[col] = values
+    kept = np.repeat(rng.random(frame_count) >= dropped, rows_per_frame)
+    pd.DataFrame(data)[kept].to_csv(file_path, index=False)
+    return file_path
+
+
+def same_dataframes(legacy, fast):
+    """
+    :param legacy: a dataframe generated by the current loader
+    :param fast: a dataframe generated by load_csv_fast
+    :return: whether both have the same rows and the same values (at float32 precision)
+    """
+    if list(legacy.columns) != list(fast.columns) or len(legacy) != len(fast):
+        return False
+    for col in legacy.columns:
+        if not np.allclose(legacy[col].to_numpy(dtype=np.float64), fast[col].to_numpy(dtype=np.float64), rtol=1e-6, atol=1e-6, equal_nan=True):
+            return False
+    return True
+
+
+def benchmark_csv_loading(work_dir, file_count=4, frame_count=20000, rows_per_frame=3, workers=4):
+    """
+    Compare the current csv loader of generate_dataframe with the fast one (time, peak memory and size of the dataframes)
+    :param work_dir: the directory to write the synthetic files in
+    :param file_count: the number of test csv files
+    :param frame_count: the number of camera frames in every file
+    :param rows_per_frame: the number of rows logged per frame
+    :param workers: the number of threads of the fast loader
+    :return: a dictionary with keys as the loader names, values as tuples of (seconds, peak MB, dataframe MB)
+    """
+    data_dir = os.path.join(work_dir, "csv_data")
+    os.makedirs(data_dir, exist_ok=True)
+    for n in range(file_count):
+        generate_synthetic_csv(os.path.join(data_dir, "Test{}_With_FrameID.csv".format(n + 1)), frame_count, rows_per_frame, seed=n)
+    size = sum(os.path.getsize(os.path.join(data_dir, f)) for f in os.listdir(data_dir)) / 1024 / 1024
+    print("Synthetic data: {} files, {} rows each, {:.1f} MB, csv engine: {}".format(file_count, frame_count * rows_per_frame, size, CSV_ENGINE))
+
+    results = {}
+    frames = {}
+    for name, options in (("current", {}), ("fast", {"fast": True}), ("fast threads", {"fast": True, "workers": workers})):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        frames[name] = generate_dataframe(data_dir, **options)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        frame_size = sum(df.memory_usage(deep=True).sum() for df in frames[name]) / 1024 / 1024
+        results[name] = (elapsed, peak, frame_size)
+
+    for name, (elapsed, peak, frame_size) in results.items():
+        print("{:>14}: {:.3f}s, peak {:.1f} MB, dataframes {:.1f} MB".format(name, elapsed, peak, frame_size))
+    same = all(same_dataframes(a, b) for a, b in zip(frames["current"], frames["fast"]))
+    print("Speed-up: {:.2f}x ({:.2f}x with {} threads), same data: {}".format(
+        results["current"][0] / results["fast"][0], results["current"][0] / results["fast threads"][0], workers, same))
+    return results
+
+
+def benchmark_aligned_merge(work_dir, test_count=3, frame_count=20000, rows_per_frame=3, dropped=0.05):
+    """
+    Compare merging the tests again for every column with aligning all the tests once (align_tests)
+    :param work_dir: the directory to write the synthetic files in
+    :param test_count: the number of test csv files (the chained merges of merge_and_calculate give duplicated column names from 4 tests)
+    :param frame_count: the number of camera frames in every file
+    :param rows_per_frame: the number of rows logged per frame
+    :param dropped: the share of the frames left out of every test
+    :return: a dictionary with keys as the merge names, values as the seconds for all the columns
+    """
+    data_dir = os.path.join(work_dir, "aligned_data")
+    os.makedirs(data_dir, exist_ok=True)
+    for n in range(test_count):
+        generate_synthetic_csv(os.path.join(data_dir, "Test{}_With_FrameID.csv".format(n + 1)), frame_count, rows_per_frame, seed=n, dropped=dropped)
+    df_array = generate_dataframe(data_dir, True)
+    columns = HEADER_LIST[3:]
+
+    t0 = time.perf_counter()
+    merged = [merge_and_calculate(df_array, col) for col in columns]
+    per_column = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    aligned = align_tests(df_array, columns)
+    align_time = time.perf_counter() - t0
+    served = [merge_and_calculate(df_array, col, aligned) for col in columns]
+    aligned_total = time.perf_counter() - t0
+
+    same = all(a.equals(b) for a, b in zip(merged, served))
+    print("{} tests, {} columns, {} camera ids".format(test_count, len(columns), len(aligned)))
+    print("merge per column: {:.3f}s, aligned once: {:.3f}s (alignment {:.3f}s), speed-up: {:.2f}x, same data: {}".format(
+        per_column, aligned_total, align_time, per_column / aligned_total, same))
+    return {"merge per column": per_column, "aligned once": aligned_total}
+
+
+def benchmark_csv_cache(work_dir, file_count=4, frame_count=20000, rows_per_frame=3):
+    """
+    Compare loading the csv files without cache, on the first run (filling the cache) and on a repeated run (reading the cache), then after one file changed
+    :param work_dir: the directory to write the synthetic files in
+    :param file_count: the number of test csv files
+    :param frame_count: the number of camera frames in every file
+    :param rows_per_frame: the number of rows logged per frame
+    :return: a dictionary with keys as the run names, values as the seconds
+    """
+    data_dir = os.path.join(work_dir, "cache_data")
+    cache_dir = os.path.join(work_dir, "csv_cache")
+    os.makedirs(data_dir, exist_ok=True)
+    for n in range(file_count):
+        generate_synthetic_csv(os.path.join(data_dir, "Test{}_With_FrameID.csv".format(n + 1)), frame_count, rows_per_frame, seed=n)
+    print("Cache format: " + cache.FRAME_FORMAT)
+
+    timings = {}
+    frames = {}
+    for name, options in (("no cache", {}), ("first run", {"cache_dir": cache_dir}), ("repeated run", {"cache_dir": cache_dir})):
+        t0 = time.perf_counter()
+        frames[name] = generate_dataframe(data_dir, True, **options)
+        timings[name] = time.perf_counter() - t0
+
+    # a changed file is parsed again, the others still come from the cache
+    generate_synthetic_csv(os.path.join(data_dir, "Test1_With_FrameID.csv"), frame_count, rows_per_frame, seed=file_count)
+    t0 = time.perf_counter()
+    changed = generate_dataframe(data_dir, True, cache_dir=cache_dir)
+    timings["one file changed"] = time.perf_counter() - t0
+
+    for name, elapsed in timings.items():
+        print("{:>16}: {:.3f}s".format(name, elapsed))
+    same = all(a.equals(b) for a, b in zip(frames["no cache"], frames["repeated run"]))
+    reloaded = sum(not a.equals(b) for a, b in zip(frames["no cache"], changed)) == 1
+    print("Speed-up: {:.2f}x, same data: {}, changed file reloaded: {}".format(timings["no cache"] / timings["repeated run"], same, reloaded))
+    return timings
+
+
+def benchmark_cache_formats(work_dir, file_count=2, frame_count=5000, rows_per_frame=3):
+    """
+    Force every cache format in turn (Parquet and pickle) and check that the dataframes read back from the cache are the same as the parsed ones, the formats needing a module which cannot be imported are reported as skipped
+    :param work_dir: the directory to write the synthetic files in
+    :param file_count: the number of test csv files
+    :param frame_count: the number of camera frames in every file
+    :param rows_per_frame: the number of rows logged per frame
+    :return: a dictionary with keys as the format names, values as whether the cached data was the same (None if skipped)
+    """
+    data_dir = os.path.join(work_dir, "format_data")
+    os.makedirs(data_dir, exist_ok=True)
+    for n in range(file_count):
+        generate_synthetic_csv(os.path.join(data_dir, "Test{}_With_FrameID.csv".format(n + 1)), frame_count, rows_per_frame, seed=n)
+    parsed = generate_dataframe(data_dir, True)
+
+    results = {}
+    default_format = cache.FRAME_FORMAT
+    for frame_format in ("parquet", "pickle"):
+        if frame_format not in cache.FRAME_FORMATS:
+            print("{:>8}: skipped, pyarrow cannot be imported".format(frame_format))
+            results[frame_format] = None
+            continue
+        cache_dir = os.path.join(work_dir, frame_format + "_cache")
+        cache.FRAME_FORMAT = frame_format
+        try:
+            generate_dataframe(data_dir, True, cache_dir=cache_dir)
+            t0 = time.perf_counter()
+            cached = generate_dataframe(data_dir, True, cache_dir=cache_dir)
+            elapsed = time.perf_counter() - t0
+        finally:
+            cache.FRAME_FORMAT = default_format
+        entries = [f for f in os.listdir(os.path.join(cache_dir, "frames")) if f.endswith("." + frame_format)]
+        results[frame_format] = len(entries) == file_count and all(a.equals(b) for a, b in zip(parsed, cached))
+        print("{:>8}: {} entries, repeated run {:.3f}s, same data: {}".format(frame_format, len(entries), elapsed, results[frame_format]))
+    return results
+
+
+BENCHMARKS = {
+    "csv_loading": benchmark_csv_loading,
+    "aligned_merge": benchmark_aligned_merge,
+    "csv_cache": benchmark_csv_cache,
+    "cache_formats": benchmark_cache_formats,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks on synthetic With_FrameID csv files")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS), help="benchmarks to run: " + ", ".join(BENCHMARKS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for bench in args.names:
+            print("===== " + bench + " =====")
+            BENCHMARKS[bench](tmp_dir)
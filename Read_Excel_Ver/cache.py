@@ -0,0 +1,90 @@
+"""
+Function: store the processed dataframes of the csv files on disk (Parquet if pyarrow is installed, else pickle), so that repeated runs over unchanged files skip parsing them
+Date: 10/17/2026
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow
+    FRAME_FORMATS = ["parquet", "pickle"]
+except ImportError:
+    FRAME_FORMATS = ["pickle"]
+# the format of the cached dataframes, the first available one
+FRAME_FORMAT = FRAME_FORMATS[0]
+
+# increase it whenever the processing of the csv files changes (ex: shift_columns, fill_na_and_remove_dup or shift_fill_and_dedup), so that cached dataframes are processed again
+CACHE_VERSION = 1
+
+
+def source_key(source_path, **options):
+    """
+    :param source_path: the path of the file being cached
+    :param options: the loading options changing the cached dataframe (ex: fast=True)
+    :return: a dictionary describing the source, the cache entry is outdated as soon as the file size or modification time or CACHE_VERSION changes
+    """
+    stat = os.stat(source_path)
+    return dict(options, path=os.path.abspath(source_path), size=stat.st_size, mtime_ns=stat.st_mtime_ns, format=FRAME_FORMAT, version=CACHE_VERSION)
+
+
+def frame_entry_path(cache_dir, source_path):
+    """
+    Generate the path of the cache entry of one source file, every source file has exactly one entry so that an outdated entry is overwritten instead of piling up
+    :param cache_dir: the root directory of the cache
+    :param source_path: the path of the file being cached
+    :return: a string of the cache entry's absolute path (the key is stored next to it, with the .json extension added)
+    """
+    folder = os.path.join(cache_dir, "frames")
+    os.makedirs(folder, exist_ok=True)
+    path_hash = hashlib.sha1(os.path.abspath(source_path).encode("utf8")).hexdigest()[:16]
+    file_name = os.path.splitext(os.path.basename(source_path))[0] + "-" + path_hash + "." + FRAME_FORMAT
+    return os.path.join(folder, file_name)
+
+
+def read_cached_frame(cache_dir, source_path, key):
+    """
+    :param cache_dir: the root directory of the cache
+    :param source_path: the path of the file being cached
+    :param key: the dictionary generated by source_key
+    :return: the cached pandas dataframe, or None if there is no entry or it is outdated
+    """
+    entry_path = frame_entry_path(cache_dir, source_path)
+    if not os.path.exists(entry_path) or not os.path.exists(entry_path + ".json"):
+        return None
+    try:
+        with open(entry_path + ".json") as f:
+            if json.load(f) != key:
+                return None
+        if FRAME_FORMAT == "parquet":
+            return pd.read_parquet(entry_path)
+        return pd.read_pickle(entry_path)
+    except Exception as e:
+        print("Cannot read cache entry: " + entry_path + ", " + str(e))
+        return None
+
+
+def write_cached_frame(cache_dir, source_path, key, dataframe):
+    """
+    Store the dataframe and its key (both written to a temporary file first, the key last, so an interrupted run cannot leave a broken entry)
+    :param cache_dir: the root directory of the cache
+    :param source_path: the path of the file being cached
+    :param key: the dictionary generated by source_key
+    :param dataframe: the processed pandas dataframe of the source file
+    :return: None
+    """
+    entry_path = frame_entry_path(cache_dir, source_path)
+    if os.path.exists(entry_path + ".json"):
+        os.remove(entry_path + ".json")
+    tmp_path = entry_path + ".tmp"
+    if FRAME_FORMAT == "parquet":
+        dataframe.to_parquet(tmp_path, index=False)
+    else:
+        dataframe.to_pickle(tmp_path)
+    os.replace(tmp_path, entry_path)
+    with open(tmp_path, "w") as f:
+        json.dump(key, f)
+    os.replace(tmp_path, entry_path + ".json")
@@ -0,0 +1,54 @@
+"""
+Function: run the benchmarks on synthetic DBC and MF4 files by name, every area has its own benchmark_<area>.py module (the shared synthetic data generators are in benchmark_data.py)
+Date: 10/17/2026
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmark_loading import *
+from benchmark_merge import *
+from benchmark_plot import *
+from benchmark_report import *
+from benchmark_pipeline import *
+
+
+BENCHMARKS = {
+    "single_open": benchmark_single_open,
+    "dbc_parser": benchmark_dbc_parser,
+    "dbc_pruning": benchmark_dbc_pruning,
+    "signal_index": benchmark_signal_index,
+    "frame_decoder": benchmark_frame_decoder,
+    "signal_cache": benchmark_signal_cache,
+    "signal_store": benchmark_signal_store,
+    "merge_engine": benchmark_merge_engine,
+    "batch_stats": benchmark_batch_stats,
+    "plot_rendering": benchmark_plot_rendering,
+    "plot_downsampling": benchmark_plot_downsampling,
+    "figure_templates": benchmark_figure_templates,
+    "ppt_records": benchmark_ppt_records,
+    "report_builder": benchmark_report_builder,
+    "pipeline": benchmark_pipeline,
+    "staged_rerun": benchmark_staged_rerun,
+    "pipelining": benchmark_pipelining,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks on synthetic DBC and MF4 files")
+    parser.add_argument("names", nargs="*", default=list(BENCHMARKS), help="benchmarks to run: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--save", default="pipeline_benchmark.json", help="the JSON file to save the pipeline results in")
+    parser.add_argument("--baseline", help="an earlier JSON file of the pipeline results to compare with")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for bench in args.names:
+            print("===== " + bench + " =====")
+            # every benchmark has its own folder, so that the files of one (ex: the figures) do not end up in the next one
+            work_dir = os.path.join(tmp_dir, bench)
+            os.makedirs(work_dir)
+            if bench == "pipeline":
+                BENCHMARKS[bench](work_dir, save_path=args.save, baseline_path=args.baseline)
+            else:
+                BENCHMARKS[bench](work_dir)
@@ -0,0 +1,276 @@
+"""
+Function: generate the synthetic DBC, MF4, data folders and checklist files shared by the benchmarks, so that they run without real vehicle logs
+Date: 10/17/2026
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+from asammdf import MDF, Signal as MdfSignal
+from asammdf.blocks import v4_constants as v4c
+from asammdf.blocks.source_utils import Source
+from asammdf.blocks.v4_blocks import SourceInformation
+
+CAMERA_ID_MSG = 256
+CAMERA_ID_NAME = "Camera_ID"
+
+
+def generate_synthetic_dbc(file_path, message_count=20, signals_per_message=4, first_id=CAMERA_ID_MSG, with_extras=False, enum_signals=0):
+    """
+    Write a DBC file with generated messages, the first message carries the camera id (16 bit counter) and every other message carries signals_per_message signals of 16 bits
+    :param file_path: the path of the dbc file to write
+    :param message_count: the number of messages in the dbc
+    :param signals_per_message: the number of signals in each message (at most 4 for the 8 bytes payload)
+    :param first_id: the frame id of the first message, the following messages take the next ids
+    :param with_extras: also write comments (some of them multi-line), value tables, and make every 10th message a multiplexed message of float signals
+    :param enum_signals: the number of signals at the start of every (not multiplexed) message written as unsigned enumerations with a value table
+    :return: a dictionary with keys as the message ids, values as the list of signal names in this message
+    """
+    lines = ['VERSION ""', '', '', 'NS_ :', '\tNS_DESC_', '\tCM_', '\tVAL_', '\tSIG_VALTYPE_', '', 'BS_:', '', 'BU_: IFC GW', '', '']
+    extras = []
+    messages = {}
+    for m in range(message_count):
+        msg_id = first_id + m
+        lines.append("BO_ {} Msg_{}: 8 IFC".format(msg_id, msg_id))
+        if m == 0:
+            names = [CAMERA_ID_NAME]
+            lines.append(' SG_ {} : 0|16@1+ (1,0) [0|65535] "" GW'.format(CAMERA_ID_NAME))
+        elif with_extras and m % 10 == 0:
+            # multiplexor in the first byte, one float signal in the last 4 bytes per multiplexer value
+            names = ["Mux_{}".format(msg_id)]
+            lines.append(' SG_ Mux_{} M : 0|8@1+ (1,0) [0|255] "" GW'.format(msg_id))
+            for s in range(signals_per_message):
+                name = "Sig_{}_{}".format(msg_id, s)
+                names.append(name)
+                lines.append(' SG_ {} m{} : 32|32@1- (1,0) [-1E+038|1E+038] "" GW'.format(name, s))
+                extras.append("SIG_VALTYPE_ {} {} : 1;".format(msg_id, name))
+        else:
+            names = []
+            for s in range(signals_per_message):
+                name = "Sig_{}_{}".format(msg_id, s)
+                names.append(name)
+                if s < enum_signals:
+                    lines.append(' SG_ {} : {}|16@1+ (1,0) [0|2] "" GW'.format(name, s * 16))
+                    extras.append('VAL_ {} {} 2 "Invalid" 1 "Active" 0 "Inactive" ;'.format(msg_id, name))
+                else:
+                    lines.append(' SG_ {} : {}|16@1- (0.01,0) [-327.68|327.67] "m" GW'.format(name, s * 16))
+        lines.append("")
+        messages[msg_id] = names
+        if with_extras and m > 0:
+            extras.append('CM_ BO_ {} "Synthetic message {}";'.format(msg_id, msg_id))
+            for s, name in enumerate(names):
+                if s % 2:
+                    extras.append('CM_ SG_ {} {} "Synthetic signal {}\nsecond comment line";'.format(msg_id, name, name))
+                else:
+                    extras.append('CM_ SG_ {} {} "Synthetic signal {}";'.format(msg_id, name, name))
+            if enum_signals == 0:
+                extras.append('VAL_ {} {} 2 "Invalid" 1 "Active" 0 "Inactive" ;'.format(msg_id, names[0]))
+    with open(file_path, "w") as f:
+        f.write("\n".join(lines + extras) + "\n")
+    return messages
+
+
+def generate_layout_dbc(file_path, message_count=50, signals_per_message=6, seed=0):
+    """
+    Write a DBC file whose signals cover many layouts: random start bits and lengths (1 to 32 bits), Intel and Motorola byte orders, signed and unsigned values, factors and offsets, and a multiplexed message every 5 messages. Signals may overlap, which does not matter for decoding
+    :param file_path: the path of the dbc file to write
+    :param message_count: the number of messages, the first one carries the camera id
+    :param signals_per_message: the number of signals in each message
+    :param seed: the seed of the random layouts
+    :return: a dictionary with keys as the message ids, values as the list of signal names in this message
+    """
+    rng = np.random.RandomState(seed)
+    lines = ['VERSION ""', '', '', 'NS_ :', '\tCM_', '\tVAL_', '', 'BS_:', '', 'BU_: IFC GW', '', '',
+             'BO_ {} Msg_{}: 8 IFC'.format(CAMERA_ID_MSG, CAMERA_ID_MSG),
+             ' SG_ {} : 0|16@1+ (1,0) [0|65535] "" GW'.format(CAMERA_ID_NAME), '']
+    messages = {CAMERA_ID_MSG: [CAMERA_ID_NAME]}
+    for m in range(1, message_count):
+        msg_id = CAMERA_ID_MSG + m
+        lines.append("BO_ {} Msg_{}: 8 IFC".format(msg_id, msg_id))
+        names = []
+        multiplexed = m % 5 == 0
+        if multiplexed:
+            names.append("Mux_{}".format(msg_id))
+            lines.append(' SG_ Mux_{} M : 0|2@1+ (1,0) [0|3] "" GW'.format(msg_id))
+        for s in range(signals_per_message):
+            name = "Sig_{}_{}".format(msg_id, s)
+            names.append(name)
+            length = int(rng.randint(1, 33))
+            intel = rng.rand() < 0.5
+            if intel:
+                start = int(rng.randint(0, 65 - length))
+            else:
+                # the most significant bit of a Motorola signal, numbered as in the DBC file
+                msb = int(rng.randint(length - 1, 64))
+                start = (7 - msb // 8) * 8 + msb % 8
+            factor, offset = [(1, 0), (0.1, 0), (0.01, -20), (2.5, 3)][rng.randint(0, 4)]
+            sign = "-" if rng.rand() < 0.5 else "+"
+            mux = " m{}".format(s % 4) if multiplexed else ""
+            lines.append(' SG_ {}{} : {}|{}@{}{} ({},{}) [0|0] "" GW'.format(name, mux, start, length, 1 if intel else 0, sign, factor, offset))
+        lines.append("")
+        messages[msg_id] = names
+    with open(file_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return messages
+
+
+def generate_synthetic_mf4(file_path, messages, channels=(3, 4, 5, 6), duration=60.0, cycle=0.02, seed=0, payloads=None):
+    """
+    Write a CAN bus logging MF4 file, every CAN channel is logged in its own channel group and carries all the given messages at a fixed cycle time
+    :param file_path: the path of the mf4 file to write
+    :param messages: the dictionary generated by generate_synthetic_dbc
+    :param channels: the CAN channel numbers to log
+    :param duration: the logging duration in seconds
+    :param cycle: the cycle time of every message in seconds
+    :param seed: the seed of the random payloads
+    :param payloads: a uint8 array of shape (cycles, messages, 8) with the payloads of the messages in id order (see synthetic_payloads), None for random payloads. The camera id is always written as a counter
+    :return: the path of the mf4 file
+    """
+    rng = np.random.RandomState(seed)
+    cycles = int(duration / cycle)
+    ids = np.array(sorted(messages), dtype="<u4")
+    mdf = MDF(version="4.10")
+    for bus in channels:
+        # one frame of every message per cycle, messages of the same cycle are 10 us apart
+        timestamps = (np.arange(cycles)[:, None] * cycle + np.arange(len(ids))[None, :] * 1e-5).ravel()
+        frame_ids = np.tile(ids, cycles)
+        payload = rng.randint(0, 256, (len(frame_ids), 8)).astype("u1") if payloads is None else payloads.reshape(-1, 8).copy()
+        camera_rows = frame_ids == CAMERA_ID_MSG
+        counter = np.arange(1, camera_rows.sum() + 1, dtype="<u2")
+        payload[camera_rows, 0] = counter & 0xFF
+        payload[camera_rows, 1] = counter >> 8
+        records = np.core.records.fromarrays(
+            [np.full(len(frame_ids), bus, "u1"), frame_ids, np.full(len(frame_ids), 8, "u1"), payload],
+            dtype=[("CAN_DataFrame.BusChannel", "u1"), ("CAN_DataFrame.ID", "<u4"),
+                   ("CAN_DataFrame.DataLength", "u1"), ("CAN_DataFrame.DataBytes", "u1", (8,))])
+        source = Source(name="CAN" + str(bus), path="CAN" + str(bus), comment="", source_type=v4c.SOURCE_BUS, bus_type=v4c.BUS_TYPE_CAN)
+        mdf.append([MdfSignal(records, timestamps, name="CAN_DataFrame", source=source)], common_timebase=True)
+        mdf.groups[-1].channel_group.acq_source = SourceInformation.from_common_source(source)
+    mdf.save(file_path, overwrite=True)
+    mdf.close()
+    return file_path
+
+
+def generate_synthetic_data_dictionary(signal_count=100, test_count=2, file_count=2, duration=60.0, cam_cycle=0.033, seed=0, integer_signals=0):
+    """
+    Generate the decoded data of an original data folder and its reinjection test folders in memory, in the form load_mf4_to_dic_for_all returns
+    Every file starts at timestamp 0, the test folders replay the camera ids of the original folder with a small timing jitter and noisy signal values
+    :param signal_count: the number of signals (besides the camera id) in every file
+    :param test_count: the number of test data folders
+    :param file_count: the number of files in every data folder
+    :param duration: the logging duration of every file in seconds
+    :param cam_cycle: the cycle time of the camera id in seconds
+    :param seed: the seed of the random values
+    :param integer_signals: the number of extra uint8 signals logged with the camera id (same timestamps), their merged columns stay integers
+    :return: a tuple of the data dictionary and the list of signal names
+    """
+    rng = np.random.RandomState(seed)
+    names = ["Sig_{}".format(i) for i in range(signal_count)]
+    cycles = [(0.01, 0.02, 0.05, 0.1)[i % 4] for i in range(signal_count)]
+    cam_count = int(duration / cam_cycle)
+    base = [[np.cumsum(rng.normal(0, 1, int(duration / cycles[i]))) for i in range(signal_count)] for _ in range(file_count)]
+
+    data_dictionary = {}
+    for folder in ["original"] + ["test" + str(t + 1) for t in range(test_count)]:
+        jitter = 0.0 if folder == "original" else 0.002
+        files = []
+        for f in range(file_count):
+            data = {}
+            cam_ts = np.arange(cam_count) * cam_cycle + rng.uniform(0, jitter, cam_count)
+            data[CAMERA_ID_NAME] = pd.DataFrame(np.arange(f * cam_count + 1, (f + 1) * cam_count + 1, dtype=np.uint16),
+                                                index=cam_ts, columns=[CAMERA_ID_NAME])
+            for i, name in enumerate(names):
+                values = base[f][i] if folder == "original" else base[f][i] + rng.normal(0, 0.1, len(base[f][i]))
+                data[name] = pd.DataFrame(values, index=np.arange(len(values)) * cycles[i] + rng.uniform(0, jitter, len(values)), columns=[name])
+            for i in range(integer_signals):
+                name = "Int_{}".format(i)
+                data[name] = pd.DataFrame(rng.randint(0, 4, cam_count).astype(np.uint8), index=cam_ts, columns=[name])
+            files.append(data)
+        data_dictionary[folder] = files
+    return data_dictionary, names + ["Int_{}".format(i) for i in range(integer_signals)]
+
+
+def synthetic_payloads(messages, cycles, enum_signals=0, seed=0):
+    """
+    Generate smooth payloads for the messages written by generate_synthetic_dbc (without extras): every value signal is a random walk, every enumeration signal holds one of its 3 values for a while
+    :param messages: the dictionary generated by generate_synthetic_dbc
+    :param cycles: the number of frames of every message
+    :param enum_signals: the number of enumeration signals at the start of every message
+    :param seed: the seed of the random values
+    :return: an int32 array of shape (cycles, messages, 4) with the raw value of every 16 bits signal
+    """
+    rng = np.random.RandomState(seed)
+    raw = np.cumsum(rng.normal(0, 20, (cycles, len(messages), 4)), axis=0)
+    raw = np.clip(raw, -32768, 32767).astype(np.int32)
+    if enum_signals:
+        # a new enumeration value every 50 frames
+        blocks = rng.randint(0, 3, (cycles // 50 + 1, len(messages), enum_signals))
+        raw[:, :, :enum_signals] = np.repeat(blocks, 50, axis=0)[:cycles]
+    return raw
+
+
+def pack_payloads(raw):
+    """
+    :param raw: the raw signal values generated by synthetic_payloads
+    :return: a uint8 array of shape (cycles, messages, 8), every signal in 2 little endian bytes
+    """
+    return np.ascontiguousarray(raw.astype("<i2")).view("u1").reshape(raw.shape[0], raw.shape[1], 8)
+
+
+def generate_synthetic_data_folders(data_dir, messages, test_count=2, file_count=2, duration=60.0, noise=0.05, enum_signals=0,
+                                    channels=(3, 4), cycle=0.02, seed=0):
+    """
+    Write an original data folder and test_count reinjection test folders of MF4 files, the test files replay the original signals with noise
+    :param data_dir: the directory to create the data folders in
+    :param messages: the dictionary generated by generate_synthetic_dbc (without extras)
+    :param test_count: the number of test data folders
+    :param file_count: the number of mf4 files in every data folder
+    :param duration: the logging duration of every file in seconds
+    :param noise: the standard deviation of the noise added to the value signals of the test files (in physical units)
+    :param enum_signals: the number of enumeration signals at the start of every message, they are replayed without noise
+    :param channels: the CAN channel numbers to log
+    :param cycle: the cycle time of every message in seconds
+    :param seed: the seed of the random values
+    :return: a dictionary with keys as the folder names, values as the lists of mf4 file paths
+    """
+    rng = np.random.RandomState(seed)
+    cycles = int(duration / cycle)
+    folders = {folder: [] for folder in ["original"] + ["test" + str(t + 1) for t in range(test_count)]}
+    for folder in folders:
+        os.makedirs(os.path.join(data_dir, folder), exist_ok=True)
+    for f in range(file_count):
+        raw = synthetic_payloads(messages, cycles, enum_signals, seed + f)
+        for folder in folders:
+            values = raw
+            if folder != "original":
+                values = raw.copy()
+                # the signals are scaled by 0.01
+                values[:, :, enum_signals:] += np.rint(rng.normal(0, noise / 0.01, values[:, :, enum_signals:].shape)).astype(np.int32)
+                values = np.clip(values, -32768, 32767)
+            path = os.path.join(data_dir, folder, "{}_{}.mf4".format(folder, f + 1))
+            generate_synthetic_mf4(path, messages, channels, duration, cycle, seed + f, pack_payloads(values))
+            folders[folder].append(path)
+    return folders
+
+
+def generate_synthetic_checklist(file_path, messages, enum_signals=0):
+    """
+    Write a Signal Checkpoint Excel file selecting every signal of the messages, in the form generate_wanted_signal reads
+    :param file_path: the path of the excel file to write
+    :param messages: the dictionary generated by generate_synthetic_dbc (without extras)
+    :param enum_signals: the number of enumeration signals at the start of every message
+    :return: a tuple of the lists of the enumeration and the value signal names
+    """
+    enum_names, value_names = [], []
+    for msg_id in sorted(messages):
+        for s, name in enumerate(messages[msg_id]):
+            if name == CAMERA_ID_NAME:
+                continue
+            (enum_names if s < enum_signals else value_names).append(name)
+    names = [CAMERA_ID_NAME] + enum_names + value_names
+    pd.DataFrame({"Name": names,
+                  "Priority": [1] * len(names),
+                  "Alignment": ["Agree"] * len(names),
+                  "Value Table": ["None"] + ["Enumeration"] * len(enum_names) + ["None"] * len(value_names)}).to_excel(file_path, index=False)
+    return enum_names, value_names
@@ -0,0 +1,344 @@
+"""
+Function: benchmark loading the MF4 files: single open, DBC parsing and pruning, signal index, frame decoder, signal cache and compact signal store
+Date: 10/17/2026
+"""
+
+import os
+import time
+import tracemalloc
+
+import asammdf
+import numpy as np
+import pandas as pd
+from asammdf import MDF
+
+from benchmark_data import *
+from data_operation import *
+from process_data import *
+
+
+def legacy_load_mf4(file, wanted_signals, dbcfiles):
+    """
+    The loading path used before loadMF4data2Dict opened each file once: the file is parsed again for every CAN channel
+    :param file: the path of mf4 file
+    :param wanted_signals: a list containing wanted signals
+    :param dbcfiles: the total_fullpath generated from load_total_matrix
+    :return: a dictionary
+    """
+    mdffile = asammdf.MDF(file, 'r')
+    data = {}
+    for channel_key in dbcfiles:
+        channel_num = int(channel_key.split('Ch')[-1])
+        if channel_num in mdffile.bus_logging_map['CAN']:
+            channel_index = list(mdffile.bus_logging_map['CAN'][channel_num].values())[0]
+            mdffile_ext = asammdf.MDF(file, 'r').filter([(None, channel_index, 1)]).extract_can_logging(dbcfiles[channel_key])
+            for w in wanted_signals:
+                try:
+                    if (w not in data) or (data[w] is None):
+                        tmpdata = mdffile_ext.get(w)
+                        data[w] = pd.DataFrame(tmpdata.samples, index=tmpdata.timestamps, columns=[w])
+                except:
+                    data[w] = None
+    return data
+
+
+def same_signal_data(data_a, data_b):
+    """
+    Check whether two dictionaries generated by loadMF4data2Dict hold the same signals and values
+    :param data_a: a dictionary generated by loadMF4data2Dict
+    :param data_b: another dictionary generated by loadMF4data2Dict
+    :return: a boolean value
+    """
+    if data_a.keys() != data_b.keys():
+        return False
+    for name in data_a:
+        if (data_a[name] is None) != (data_b[name] is None):
+            return False
+        if data_a[name] is not None and not data_a[name].equals(data_b[name]):
+            return False
+    return True
+
+
+def benchmark_single_open(work_dir, channels=(3, 4, 5, 6), duration=120.0, repeat=3):
+    """
+    Compare loading a multi-channel log by re-opening the file per channel with loading it from one handle
+    :param work_dir: the directory to write the synthetic files in
+    :param channels: the CAN channel numbers to log
+    :param duration: the logging duration in seconds
+    :param repeat: the number of timed runs of each loader, the fastest run is reported
+    :return: a dictionary of the best timings in seconds
+    """
+    dbc_path = os.path.join(work_dir, "synthetic.dbc")
+    messages = generate_synthetic_dbc(dbc_path)
+    mf4_path = generate_synthetic_mf4(os.path.join(work_dir, "synthetic.mf4"), messages, channels, duration)
+    total_fpath = {"Ch" + str(c): [dbc_path] for c in channels}
+    wanted = [name for names in messages.values() for name in names]
+
+    timings = {}
+    results = {}
+    for name, loader in (("reopen per channel", legacy_load_mf4), ("single open", loadMF4data2Dict)):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            results[name] = loader(mf4_path, wanted, total_fpath)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+
+    t0 = time.perf_counter()
+    mdffile = MDF(mf4_path)
+    mdffile.bus_logging_map
+    mdffile.close()
+    open_time = time.perf_counter() - t0
+
+    print("Synthetic log: {} channels, {:.0f}s, {:.2f} MB, {:.3f}s per open ({} opens saved per file)".format(
+        len(channels), duration, os.path.getsize(mf4_path) / 1024 / 1024, open_time, len(channels)))
+    for name, elapsed in timings.items():
+        print("{:>20}: {:.3f}s".format(name, elapsed))
+    print("Speed-up: {:.2f}x, same data: {}".format(timings["reopen per channel"] / timings["single open"],
+                                                 same_signal_data(results["reopen per channel"], results["single open"])))
+    return timings
+
+
+def benchmark_dbc_parser(work_dir, message_count=3000, signals_per_message=4):
+    """
+    Compare parse time and peak memory of the pyparsing grammar and the line-oriented DBC parser on a generated DBC
+    :param work_dir: the directory to write the synthetic files in
+    :param message_count: the number of messages in the generated DBC
+    :param signals_per_message: the number of signals in each message
+    :return: a dictionary with keys as the parser names, values as tuples of (seconds, peak memory in MB)
+    """
+    dbc_path = os.path.join(work_dir, "synthetic_large.dbc")
+    generate_synthetic_dbc(dbc_path, message_count, signals_per_message, with_extras=True)
+
+    results = {}
+    parsed = {}
+    for parser in DBC_PARSERS:
+        t0 = time.perf_counter()
+        parsed[parser] = load_dbc(dbc_path, parser)
+        elapsed = time.perf_counter() - t0
+        # memory is traced in a separate run, tracing slows the parsers down
+        tracemalloc.start()
+        load_dbc(dbc_path, parser)
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        results[parser] = (elapsed, peak)
+
+    print("Synthetic DBC: {} messages, {:.2f} MB".format(message_count, os.path.getsize(dbc_path) / 1024 / 1024))
+    for parser, (elapsed, peak) in results.items():
+        print("{:>10}: {:.3f}s, peak memory {:.1f} MB".format(parser, elapsed, peak))
+    print("Speed-up: {:.1f}x, same messages: {}".format(results["pyparsing"][0] / results["lines"][0], parsed["pyparsing"] == parsed["lines"]))
+    return results
+
+
+def benchmark_dbc_pruning(work_dir, message_count=500, signals_per_message=4, wanted_messages=(10, 50, 200), duration=60.0):
+    """
+    Compare decoding a log with the whole DBC files and with the DBC files pruned to the messages carrying wanted signals
+    :param work_dir: the directory to write the synthetic files in
+    :param message_count: the number of messages in the dbc and on the bus
+    :param signals_per_message: the number of signals in each message
+    :param wanted_messages: the numbers of messages (besides the camera id message) carrying wanted signals
+    :param duration: the logging duration in seconds
+    :return: a dictionary with keys as the numbers of wanted messages, values as dictionaries with keys as the modes, values as tuples of (seconds, peak traced memory in MB)
+    """
+    dbc_path = os.path.join(work_dir, "pruning.dbc")
+    messages = generate_synthetic_dbc(dbc_path, message_count, signals_per_message, with_extras=True)
+    mf4_path = generate_synthetic_mf4(os.path.join(work_dir, "pruning.mf4"), messages, (3, 4), duration, 0.1)
+    total_fpath, total_msg, _ = load_total_matrix(work_dir, {"Ch3": ["pruning.dbc"], "Ch4": ["pruning.dbc"]}, parser="lines")
+    other_ids = sorted(messages)[1:]
+    print("{} messages on 2 channels, {:.1f} MB log".format(message_count, os.path.getsize(mf4_path) / 1024 / 1024))
+
+    results = {}
+    for count in wanted_messages:
+        step = max(len(other_ids) // count, 1)
+        wanted = [CAMERA_ID_NAME] + [messages[msg_id][-1] for msg_id in other_ids[::step][:count]]
+        pruned = prune_channel_dbcs(total_fpath, total_msg, wanted, os.path.join(work_dir, "pruned_dbc"))
+        results[count] = {}
+        data = {}
+        for mode, decode_dbcs in (("whole DBC", None), ("pruned DBC", pruned)):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            data[mode] = loadMF4data2Dict(mf4_path, wanted, total_fpath, True, decode_dbcs)
+            elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+            results[count][mode] = (elapsed, peak)
+            print("{} wanted message(s), {:>10}: {:.2f}s, peak traced memory {:.1f} MB".format(count, mode, elapsed, peak))
+        same = all(np.array_equal(data["whole DBC"][w].timestamps, data["pruned DBC"][w].timestamps)
+                   and np.array_equal(data["whole DBC"][w].samples, data["pruned DBC"][w].samples) for w in wanted)
+        print("{} wanted message(s): same signals: {}".format(count, same))
+    return results
+
+
+def benchmark_signal_index(work_dir, message_count=200, signals_per_message=4, wanted_count=200, undefined_count=100, duration=60.0):
+    """
+    Compare loading a log of 4 CAN channels (Ch5 and Ch6 using the DBC files of Ch3 and Ch4, as in conf.yaml) by trying every wanted signal on every channel with reading every signal only from the channels defining it (build_signal_index)
+    :param work_dir: the directory to write the synthetic files in
+    :param message_count: the number of messages of each dbc
+    :param signals_per_message: the number of signals in each message
+    :param wanted_count: the number of wanted signals defined in the dbc files
+    :param undefined_count: the number of wanted signals defined in no dbc file (ex: signals of the checklist missing from the DBC version in use)
+    :param duration: the logging duration in seconds
+    :return: a dictionary with keys as the modes, values as the seconds
+    """
+    channel_dbcs = {"Ch3": ["index_a.dbc"], "Ch4": ["index_b.dbc"], "Ch5": ["index_a.dbc"], "Ch6": ["index_b.dbc"]}
+    messages_a = generate_synthetic_dbc(os.path.join(work_dir, "index_a.dbc"), message_count, signals_per_message)
+    messages_b = generate_synthetic_dbc(os.path.join(work_dir, "index_b.dbc"), message_count, signals_per_message, first_id=CAMERA_ID_MSG + message_count)
+    mf4_path = generate_synthetic_mf4(os.path.join(work_dir, "index.mf4"), {**messages_a, **messages_b}, (3, 4, 5, 6), duration, 0.1)
+    total_fpath, total_msg, _ = load_total_matrix(work_dir, channel_dbcs, parser="lines")
+    names_a = [name for msg_id in sorted(messages_a)[1:] for name in messages_a[msg_id]]
+    names_b = [name for msg_id in sorted(messages_b)[1:] for name in messages_b[msg_id]]
+    wanted = [CAMERA_ID_NAME] + names_a[:wanted_count // 2] + names_b[:wanted_count // 2] + ["Undefined_{}".format(i) for i in range(undefined_count)]
+    signal_index = build_signal_index(total_msg, wanted)
+
+    results = {}
+    data = {}
+    for mode, index in (("every channel", None), ("signal index", signal_index)):
+        t0 = time.perf_counter()
+        data[mode] = loadMF4data2Dict(mf4_path, wanted, total_fpath, True, None, index)
+        results[mode] = time.perf_counter() - t0
+        print("{:>13}: {:.2f}s".format(mode, results[mode]))
+    same = data["every channel"].keys() == data["signal index"].keys() and all(
+        (data["every channel"][w] is None and data["signal index"][w] is None) or
+        (np.array_equal(data["every channel"][w].timestamps, data["signal index"][w].timestamps) and
+         np.array_equal(data["every channel"][w].samples, data["signal index"][w].samples)) for w in wanted)
+    print("Same signals: {}".format(same))
+    return results
+
+
+def cross_check_frame_decoder(data_asammdf, data_numpy, wanted):
+    """
+    Compare the signals decoded by asammdf with the signals decoded by the numpy frame decoder
+    :param data_asammdf: a dictionary generated by loadMF4data2Dict with compact=True and the asammdf decoder
+    :param data_numpy: a dictionary generated by loadMF4data2Dict with compact=True and the numpy decoder
+    :param wanted: the wanted signals
+    :return: a list of the signal names decoded differently
+    """
+    different = []
+    for w in wanted:
+        a, b = data_asammdf.get(w), data_numpy.get(w)
+        if a is None or b is None:
+            if (a is None) != (b is None):
+                different.append(w)
+        elif not (np.array_equal(a.timestamps, b.timestamps) and np.array_equal(a.samples, b.samples)):
+            different.append(w)
+    return different
+
+
+def benchmark_frame_decoder(work_dir, message_count=200, signals_per_message=6, duration=60.0, seed=0):
+    """
+    Cross-check the numpy frame decoder against asammdf extract_can_logging on a log of random signal layouts, then compare their loading times
+    :param work_dir: the directory to write the synthetic files in
+    :param message_count: the number of messages in the dbc and on the bus
+    :param signals_per_message: the number of signals in each message
+    :param duration: the logging duration in seconds
+    :param seed: the seed of the random layouts and payloads
+    :return: a dictionary with keys as the decoders, values as the seconds
+    """
+    dbc_path = os.path.join(work_dir, "layouts.dbc")
+    messages = generate_layout_dbc(dbc_path, message_count, signals_per_message, seed)
+    mf4_path = generate_synthetic_mf4(os.path.join(work_dir, "layouts.mf4"), messages, (3, 4), duration, 0.05, seed)
+    total_fpath, total_msg, _ = load_total_matrix(work_dir, {"Ch3": ["layouts.dbc"], "Ch4": ["layouts.dbc"]}, parser="lines")
+    wanted = [name for names in messages.values() for name in names] + ["Undefined_signal"]
+    signal_index = build_signal_index(total_msg, wanted)
+    print("{} signals on 2 channels, {:.1f} MB log".format(len(wanted) - 1, os.path.getsize(mf4_path) / 1024 / 1024))
+
+    results = {}
+    data = {}
+    for decoder, decoder_messages in (("asammdf", None), ("numpy", total_msg)):
+        t0 = time.perf_counter()
+        data[decoder] = loadMF4data2Dict(mf4_path, wanted, total_fpath, True, None, signal_index, decoder_messages)
+        results[decoder] = time.perf_counter() - t0
+        print("{:>8}: {:.2f}s".format(decoder, results[decoder]))
+    different = cross_check_frame_decoder(data["asammdf"], data["numpy"], wanted)
+    # asammdf 5.23 with canmatrix 1.2 decodes every multiplexed signal on the frames where the multiplexor is 0, whatever its multiplexer value
+    multiplexed = set(name for message in total_msg["Ch3"].values() for name, signal in message["signals"].items()
+                      if signal["multi_type"] not in ("N", "M", 0))
+    as_asammdf = {}
+    for message in total_msg["Ch3"].values():
+        if any(name in multiplexed for name in message["signals"]):
+            zero_mux = dict(message, signals={name: dict(signal, multi_type=0) if name in multiplexed else signal
+                                              for name, signal in message["signals"].items()})
+            as_asammdf[message["id_dec"]] = zero_mux
+    reference = {"Ch3": {**total_msg["Ch3"], **as_asammdf}}
+    data["numpy, multiplexer 0"] = loadMF4data2Dict(mf4_path, wanted, {"Ch3": total_fpath["Ch3"]}, True, None, None, reference)
+    unexplained = cross_check_frame_decoder(data["asammdf"], data["numpy, multiplexer 0"], [w for w in different if w in multiplexed])
+    unexplained += [w for w in different if w not in multiplexed]
+    print("Signals decoded differently: {} of {}, all multiplexed with a multiplexer value other than 0: {}".format(
+        len(different), len(wanted), len(unexplained) == 0))
+    print("Signals still different when the numpy decoder also reads them on the frames of multiplexer 0: {}{}".format(
+        len(unexplained), (", " + ", ".join(unexplained[:10])) if unexplained else ""))
+    return results
+
+
+def benchmark_signal_cache(work_dir, file_count=4, duration=120.0):
+    """
+    Compare loading synthetic logs without the decoded signal cache, with a cold cache and with a warm cache
+    :param work_dir: the directory to write the synthetic files in
+    :param file_count: the number of mf4 files to load
+    :param duration: the logging duration of every file in seconds
+    :return: a dictionary of the timings in seconds
+    """
+    dbc_path = os.path.join(work_dir, "synthetic.dbc")
+    messages = generate_synthetic_dbc(dbc_path)
+    total_fpath = {"Ch" + str(c): [dbc_path] for c in (3, 4, 5, 6)}
+    wanted = [name for names in messages.values() for name in names]
+    files = [generate_synthetic_mf4(os.path.join(work_dir, "cache_{}.mf4".format(i)), messages, duration=duration, seed=i)
+             for i in range(file_count)]
+    cache_dir = os.path.join(work_dir, "cache")
+
+    timings = {}
+    results = {}
+    for name, loader in (("no cache", lambda f: loadMF4data2Dict(f, wanted, total_fpath)),
+                         ("cold cache", lambda f: load_mf4_cached(f, wanted, total_fpath, cache_dir)),
+                         ("warm cache", lambda f: load_mf4_cached(f, wanted, total_fpath, cache_dir))):
+        t0 = time.perf_counter()
+        results[name] = [loader(f) for f in files]
+        timings[name] = time.perf_counter() - t0
+
+    print("Synthetic logs: {} files, {} signals".format(file_count, len(wanted)))
+    for name, elapsed in timings.items():
+        print("{:>12}: {:.3f}s".format(name, elapsed))
+    same = all(same_signal_data(a, b) for a, b in zip(results["no cache"], results["warm cache"]))
+    print("Warm cache speed-up: {:.1f}x, same data: {}".format(timings["no cache"] / timings["warm cache"], same))
+    return timings
+
+
+def benchmark_signal_store(work_dir, message_count=375, signals_per_message=4, file_count=3, duration=60.0):
+    """
+    Compare the memory kept by the loaded data when every signal is a one-column dataframe and when it is a SignalSamples object
+    :param work_dir: the directory to write the synthetic files in
+    :param message_count: the number of messages in the generated DBC (1500 signals by default)
+    :param signals_per_message: the number of signals in each message
+    :param file_count: the number of mf4 files kept in memory together, like a data folder in load_mf4_to_dic_for_all
+    :param duration: the logging duration of every file in seconds
+    :return: a dictionary with keys as the representations, values as tuples of (seconds, retained memory in MB, peak memory in MB)
+    """
+    dbc_path = os.path.join(work_dir, "synthetic_wide.dbc")
+    messages = generate_synthetic_dbc(dbc_path, message_count, signals_per_message)
+    total_fpath = {"Ch" + str(c): [dbc_path] for c in (3, 4, 5, 6)}
+    wanted = [name for names in messages.values() for name in names]
+    files = [generate_synthetic_mf4(os.path.join(work_dir, "wide_{}.mf4".format(i)), messages, duration=duration, cycle=0.1, seed=i)
+             for i in range(file_count)]
+
+    results = {}
+    loaded = {}
+    for name, compact in (("dataframes", False), ("SignalSamples", True)):
+        t0 = time.perf_counter()
+        loaded[name] = [loadMF4data2Dict(f, wanted, total_fpath, compact) for f in files]
+        elapsed = time.perf_counter() - t0
+        # memory is traced in a separate run, tracing slows the decoding down
+        tracemalloc.start()
+        kept = [loadMF4data2Dict(f, wanted, total_fpath, compact) for f in files]
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        results[name] = (elapsed, retained / 1024 / 1024, peak / 1024 / 1024)
+
+    print("Synthetic logs: {} files, {} signals".format(file_count, len(wanted)))
+    for name, (elapsed, retained, peak) in results.items():
+        print("{:>14}: {:.3f}s, retained {:.1f} MB, peak {:.1f} MB".format(name, elapsed, retained, peak))
+    same = all(same_signal_data(a, {w: as_frame(v) for w, v in b.items()})
+               for a, b in zip(loaded["dataframes"], loaded["SignalSamples"]))
+    print("Retained memory reduced {:.1f}x, same data: {}".format(results["dataframes"][1] / results["SignalSamples"][1], same))
+    return results
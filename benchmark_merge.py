@@ -0,0 +1,181 @@
+"""
+Function: benchmark merging the signals on the camera id (pandas and numpy merge engines) and the batched statistics
+Date: 10/17/2026
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import *
+from data_operation import *
+
+
+def benchmark_merge_engine(work_dir, signal_count=100, test_count=2, file_count=2, duration=120.0, integer_signals=10, case_count=500):
+    """
+    Compare the per-signal merge time of the dataframe and the numpy version of merge_one_type_data (with and without the camera id timelines shared by all signals), then cross-check both versions on small random cases
+    :param work_dir: not used, the data is generated in memory
+    :param signal_count: the number of signals to merge
+    :param test_count: the number of test data folders
+    :param file_count: the number of files in every data folder
+    :param duration: the logging duration of every file in seconds
+    :param integer_signals: the number of extra uint8 signals, whose merged columns stay integers
+    :param case_count: the number of random cases of cross_check_merge_engines
+    :return: a dictionary of the mean merge time per signal in seconds
+    """
+    data_dictionary, names = generate_synthetic_data_dictionary(signal_count, test_count, file_count, duration, integer_signals=integer_signals)
+
+    timings = {}
+    results = {}
+    for engine in ("pandas", "numpy"):
+        t0 = time.perf_counter()
+        results[engine] = [merge_one_type_data(data_dictionary, name, CAMERA_ID_NAME, engine) for name in names]
+        timings[engine] = (time.perf_counter() - t0) / len(names)
+    # the camera id timelines are built once, their building time is spread over the signals
+    t0 = time.perf_counter()
+    timelines = build_cam_id_timelines(data_dictionary, CAMERA_ID_NAME)
+    results["numpy, shared timelines"] = [merge_one_type_data(data_dictionary, name, CAMERA_ID_NAME, "numpy", timelines) for name in names]
+    timings["numpy, shared timelines"] = (time.perf_counter() - t0) / len(names)
+
+    same = True
+    for engine in ("numpy", "numpy, shared timelines"):
+        for (merged_a, names_a), (merged_b, names_b) in zip(results["pandas"], results[engine]):
+            same = same and same_merge(merged_a, merged_b) and names_a == names_b
+
+    print("Synthetic data: {} signals, original + {} test folders, {} files of {:.0f}s each, {} rows per merged signal".format(
+        signal_count + integer_signals, test_count, file_count, duration, len(results["numpy"][0][0])))
+    for engine, elapsed in timings.items():
+        print("{:>23}: {:.2f} ms per signal, {:.1f}x".format(engine, elapsed * 1000, timings["pandas"] / elapsed))
+    print("Same dataframes (values and dtypes): {}".format(same))
+    compared, different = cross_check_merge_engines(case_count)
+    print("Random cases: {} compared, {} different{}".format(compared, len(different), (", seeds " + ", ".join(map(str, different[:10]))) if different else ""))
+    return timings
+
+
+def same_merge(expected, actual):
+    """
+    :param expected: a dataframe generated by the pandas version of merge_one_type_data
+    :param actual: a dataframe generated by the numpy version
+    :return: whether both have the same columns, dtypes and values
+    """
+    if list(expected.dtypes) != list(actual.dtypes):
+        return False
+    try:
+        pd.testing.assert_frame_equal(expected, actual)
+    except AssertionError:
+        return False
+    return True
+
+
+def generate_merge_case(seed, cam_name="Cam", signal_name="Signal"):
+    """
+    Generate a small random data dictionary of one signal: random camera id and signal dtypes, folders and files with dropped camera ids, signals logged with the camera id, faster, on a part of its timestamps or not at all
+    :param seed: the seed of the random case
+    :param cam_name: the name of the camera id
+    :param signal_name: the name of the signal
+    :return: the data dictionary
+    """
+    rng = np.random.RandomState(seed)
+    cam_dtype = [np.uint8, np.uint16, np.int64, np.float64][rng.randint(0, 4)]
+    signal_dtype = [np.uint8, np.int16, np.uint32, np.int64, np.float32, np.float64][rng.randint(0, 6)]
+    cam_count = rng.randint(3, 12)
+    data_dictionary = {}
+    for folder in ["original"] + ["test" + str(t + 1) for t in range(rng.randint(0, 4))]:
+        files = []
+        for f in range(rng.randint(1, 3)):
+            kept = rng.rand(cam_count) >= (0.3 if rng.rand() < 0.5 else 0.0)
+            cam_ts = (np.arange(cam_count) + f * 1000.0)[kept]
+            layout = rng.randint(0, 5)
+            if layout == 0:
+                signal_ts = cam_ts
+            elif layout == 1:
+                signal_ts = np.arange(2 * cam_count) * 0.5 + f * 1000.0
+            elif layout == 2:
+                signal_ts = cam_ts[rng.rand(len(cam_ts)) >= 0.3]
+            elif layout == 3:
+                signal_ts = np.sort(np.append(cam_ts, f * 1000.0 + 0.25))
+            else:
+                signal_ts = None
+            data = {cam_name: pd.DataFrame((np.arange(cam_count) + 1 + f * 100)[kept].astype(cam_dtype), index=cam_ts, columns=[cam_name])}
+            data[signal_name] = None if signal_ts is None else pd.DataFrame(
+                rng.randint(0, 50, len(signal_ts)).astype(signal_dtype), index=signal_ts, columns=[signal_name])
+            files.append(data)
+        data_dictionary[folder] = files
+    return data_dictionary
+
+
+def cross_check_merge_engines(case_count=500):
+    """
+    Merge small random cases (generate_merge_case) with both versions of merge_one_type_data and compare the dataframes, dtypes included
+    :param case_count: the number of random cases
+    :return: a tuple of the number of cases compared (the cases the pandas version cannot merge are skipped) and the list of the seeds of the different cases
+    """
+    compared = 0
+    different = []
+    for seed in range(case_count):
+        data_dictionary = generate_merge_case(seed)
+        try:
+            expected, names_a = merge_one_type_data(data_dictionary, "Signal", "Cam", "pandas")
+        except Exception:
+            continue
+        actual, names_b = merge_one_type_data(data_dictionary, "Signal", "Cam", "numpy")
+        compared += 1
+        if not same_merge(expected, actual) or names_a != names_b:
+            different.append(seed)
+    return compared, different
+
+
+def benchmark_batch_stats(work_dir, signal_counts=(100, 500, 1500), test_count=3, duration=60.0, percentile=0.95):
+    """
+    Compare the per-signal statistics (generate_stats and large_std_cam_id) with generate_stats_batch on all signals at once
+    :param work_dir: not used, the data is generated in memory
+    :param signal_counts: the numbers of signals to benchmark with
+    :param test_count: the number of test data folders
+    :param duration: the logging duration of the synthetic files in seconds
+    :param percentile: the percentile of the std lower bound
+    :return: a dictionary with keys as the signal counts, values as tuples of (per-signal seconds, batch seconds)
+    """
+    data_dictionary, names = generate_synthetic_data_dictionary(max(signal_counts), test_count, 1, duration)
+    timelines = build_cam_id_timelines(data_dictionary, CAMERA_ID_NAME)
+    merged_all = [merge_one_type_data(data_dictionary, name, CAMERA_ID_NAME, "numpy", timelines) for name in names]
+
+    results = {}
+    for count in signal_counts:
+        per_signal_input = [(df.copy(), test_names) for df, test_names in merged_all[:count]]
+        batch_input = [(df.copy(), test_names) for df, test_names in merged_all[:count]]
+
+        t0 = time.perf_counter()
+        per_signal = []
+        for df, test_names in per_signal_input:
+            df_s, changed = generate_stats(df, test_names)
+            outliers, lower_bound = large_std_cam_id(df_s, CAMERA_ID_NAME, percentile)
+            per_signal.append((df_s, changed, outliers, lower_bound))
+        per_signal_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        batch = generate_stats_batch(batch_input, CAMERA_ID_NAME, percentile)
+        batch_time = time.perf_counter() - t0
+
+        print("{:>5} signals: per signal {:.3f}s, batch {:.3f}s, {:.1f}x, same results: {}".format(
+            count, per_signal_time, batch_time, per_signal_time / batch_time, same_stats(per_signal, batch)))
+        results[count] = (per_signal_time, batch_time)
+
+    # a cell budget of about 10 signals splits the largest batch into smaller ones, with the same results
+    max_cells = 10 * len(merged_all[0][0]) * test_count
+    split = generate_stats_batch([(df.copy(), test_names) for df, test_names in merged_all], CAMERA_ID_NAME, percentile, max_cells)
+    print("{:>5} signals split by a budget of {} cells, same results: {}".format(len(merged_all), max_cells, same_stats(per_signal, split)))
+    return results
+
+
+def same_stats(expected, actual):
+    """
+    :param expected: a list of the (dataframe, flag, abnormal camera ids, std lower bound) tuples of the per-signal statistics
+    :param actual: the same list generated by generate_stats_batch
+    :return: whether both give the same flags, abnormal camera ids, lower bounds, test means and stds
+    """
+    same = len(expected) == len(actual)
+    for (df_a, changed_a, outliers_a, bound_a), (df_b, changed_b, outliers_b, bound_b) in zip(expected, actual):
+        same = same and changed_a == changed_b and outliers_a == outliers_b and np.isclose(bound_a, bound_b)
+        same = same and np.allclose(df_a[["test_mean", "test_std"]].values, df_b[["test_mean", "test_std"]].values, equal_nan=True)
+    return same
@@ -0,0 +1,201 @@
+"""
+Function: benchmark the whole report pipeline on synthetic data folders: scaling, staged reruns and pipelined loading
+Date: 10/17/2026
+"""
+
+import json
+import os
+import time
+
+import asammdf
+import numpy as np
+import pandas as pd
+
+from benchmark_data import *
+from checkpoint import RunCheckpoint
+
+
+def run_synthetic_pipeline(work_dir, file_count=2, signal_count=60, duration=30.0, test_count=2, noise=0.05, enum_signals=1, performance=None):
+    """
+    Generate a synthetic DBC, data folders and checklist, then run the whole report pipeline (run_report) on them with every stage timed
+    :param work_dir: the directory to write the synthetic files and the report in
+    :param file_count: the number of mf4 files in every data folder
+    :param signal_count: the number of signals besides the camera id (4 per message, rounded up to whole messages)
+    :param duration: the logging duration of every file in seconds
+    :param test_count: the number of test data folders
+    :param noise: the standard deviation of the noise added to the value signals of the test files
+    :param enum_signals: the number of enumeration signals of every message
+    :param performance: the performance section of the configuration (None for the defaults of run_report)
+    :return: a dictionary of the scale, the data size, the total seconds and the summary of the RunProfile
+    """
+    from main import run_report
+    from profiling import RunProfile
+
+    conf, folders = synthetic_pipeline_conf(work_dir, file_count, signal_count, duration, test_count, noise, enum_signals, performance)
+    profile = RunProfile()
+    t0 = time.perf_counter()
+    run_report(conf, profile)
+    total = time.perf_counter() - t0
+    data_size = sum(os.path.getsize(p) for paths in folders.values() for p in paths)
+    return {"file_count": file_count, "signal_count": signal_count, "duration": duration, "test_count": test_count,
+            "data_mb": data_size / 1024 / 1024, "total_s": total, "stages": profile.summary()}
+
+
+def synthetic_pipeline_conf(work_dir, file_count=2, signal_count=60, duration=30.0, test_count=2, noise=0.05, enum_signals=1, performance=None):
+    """
+    Generate a synthetic DBC, data folders and checklist, and the configuration of a report on them (the parameters are the ones of run_synthetic_pipeline)
+    :return: a tuple of the configuration dictionary and the dictionary of the generated data folders
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    dbc_name = "synthetic.dbc"
+    messages = generate_synthetic_dbc(os.path.join(work_dir, dbc_name), (signal_count + 3) // 4 + 1, 4, enum_signals=enum_signals)
+    data_dir = os.path.join(work_dir, "data")
+    folders = generate_synthetic_data_folders(data_dir, messages, test_count, file_count, duration, noise, enum_signals)
+    checklist = os.path.join(work_dir, "checklist.xlsx")
+    generate_synthetic_checklist(checklist, messages, enum_signals)
+    output_dir = os.path.join(work_dir, "output")
+    os.makedirs(output_dir, exist_ok=True)
+    conf = {"path": {"path_data_dir": data_dir, "path_dbc_dir": work_dir, "path_signal_excel": checklist,
+                     "path_to_create_folder": output_dir, "path_to_create_ppt": output_dir, "path_cache_dir": None},
+            "dbc_channels": {"Ch3": [dbc_name], "Ch4": [dbc_name]},
+            "performance": dict(performance or {})}
+    return conf, folders
+
+
+def benchmark_staged_rerun(work_dir, file_count=2, signal_count=60, duration=30.0, test_count=2):
+    """
+    Time a staged run (run_staged_report) from scratch with the performance options of conf.yaml, the reruns from the later stages, and the resumption of a run interrupted in the middle of the merge stage
+    :param work_dir: the directory to write the synthetic files and the run directory in
+    :param file_count: the number of mf4 files in every data folder
+    :param signal_count: the number of signals besides the camera id
+    :param duration: the logging duration of every file in seconds
+    :param test_count: the number of test data folders
+    :return: a dictionary with keys as the run names, values as the seconds
+    """
+    from infra import read_config
+    from main import run_staged_report
+
+    performance = read_config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "conf.yaml")).get("performance", {})
+    conf, _ = synthetic_pipeline_conf(os.path.join(work_dir, "staged"), file_count, signal_count, duration, test_count, performance=performance)
+    run_dir = os.path.join(work_dir, "staged", "run")
+    timings = {}
+    t0 = time.perf_counter()
+    run_staged_report(conf, run_dir)
+    timings["full run"] = time.perf_counter() - t0
+
+    for stage in ("stats", "plot", "ppt"):
+        t0 = time.perf_counter()
+        run_staged_report(conf, run_dir, from_stage=stage)
+        timings["rerun from " + stage] = time.perf_counter() - t0
+
+    # an interrupted merge: half of the merged signals are missing and the later stages never ran
+    checkpoint = RunCheckpoint(run_dir)
+    for stage in ("merge", "stats", "plot", "ppt"):
+        os.remove(os.path.join(run_dir, stage + ".done"))
+    merged = sorted(os.listdir(checkpoint.stage_dir("merge")))
+    for name in merged[len(merged) // 2:]:
+        os.remove(os.path.join(checkpoint.stage_dir("merge"), name))
+    for stage in ("stats", "plot"):
+        checkpoint.reset(stage)
+    t0 = time.perf_counter()
+    run_staged_report(conf, run_dir)
+    timings["resume in merge"] = time.perf_counter() - t0
+
+    for name, elapsed in timings.items():
+        print("{:>16}: {:.2f}s".format(name, elapsed))
+    return timings
+
+
+def compare_pipeline_results(baseline, results):
+    """
+    Print the stage timings of the runs found in both results, matched by their scale
+    :param baseline: the dictionary loaded from an earlier results file of benchmark_pipeline
+    :param results: the dictionary of the current results
+    :return: None
+    """
+    def scale(run):
+        return run["file_count"], run["signal_count"], run["duration"], run["test_count"]
+
+    old_runs = {scale(run): run for run in baseline["runs"]}
+    for run in results["runs"]:
+        old = old_runs.get(scale(run))
+        if old is None:
+            continue
+        print("{} file(s), {} signals, {}s, {} test folder(s): {:.2f}s -> {:.2f}s".format(*scale(run), old["total_s"], run["total_s"]))
+        for name, stage in run["stages"].items():
+            if name in old["stages"] and old["stages"][name]["wall_s"] > 0:
+                print("{:>26}: {:.3f}s -> {:.3f}s ({:.2f}x speed-up)".format(
+                    name, old["stages"][name]["wall_s"], stage["wall_s"], old["stages"][name]["wall_s"] / max(stage["wall_s"], 1e-9)))
+
+
+def benchmark_pipeline(work_dir, file_counts=(1, 2, 4), signal_counts=(30, 60, 120), durations=(15.0, 30.0, 60.0), test_count=2, noise=0.05,
+                       save_path="pipeline_benchmark.json", baseline_path=None):
+    """
+    Time every stage of the whole pipeline from load_total_matrix to generate_ppt on synthetic data, scaling the file count, the signal count and the duration one at a time from the middle values
+    The performance options of conf.yaml are used, and the results are saved as JSON so that a later run can be compared with them
+    :param work_dir: the directory to write the synthetic files in
+    :param file_counts: the numbers of mf4 files per data folder
+    :param signal_counts: the numbers of wanted signals
+    :param durations: the logging durations of every file in seconds
+    :param test_count: the number of test data folders
+    :param noise: the standard deviation of the noise added to the test files
+    :param save_path: the path of the JSON results file (None for not saving)
+    :param baseline_path: the path of an earlier JSON results file to compare with (None for no comparison)
+    :return: a dictionary of the settings and the list of runs
+    """
+    from infra import read_config
+
+    performance = read_config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "conf.yaml")).get("performance", {})
+    middle = (file_counts[len(file_counts) // 2], signal_counts[len(signal_counts) // 2], durations[len(durations) // 2])
+    scales = [(f, middle[1], middle[2]) for f in file_counts] + [(middle[0], n, middle[2]) for n in signal_counts] + \
+             [(middle[0], middle[1], d) for d in durations]
+    scales = list(dict.fromkeys(scales))
+
+    results = {"created": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "versions": {"numpy": np.__version__, "pandas": pd.__version__, "asammdf": asammdf.__version__},
+               "performance": performance, "runs": []}
+    for file_count, signal_count, duration in scales:
+        run_dir = os.path.join(work_dir, "pipeline_{}_{}_{}".format(file_count, signal_count, int(duration)))
+        run = run_synthetic_pipeline(run_dir, file_count, signal_count, duration, test_count, noise, performance=performance)
+        results["runs"].append(run)
+        print("{} file(s), {} signals, {}s per file ({:.1f} MB): {:.2f}s".format(file_count, signal_count, duration, run["data_mb"], run["total_s"]))
+        for name, stage in run["stages"].items():
+            print("{:>26}: {} time(s), {:.3f}s".format(name, stage["count"], stage["wall_s"]))
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            compare_pipeline_results(json.load(f), results)
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Results saved to: " + save_path)
+    return results
+
+
+def benchmark_pipelining(work_dir, file_count=2, signal_count=60, duration=30.0, test_count=2):
+    """
+    Compare the phased run (run_report) with the pipelined run (run_pipelined_report) on the same synthetic data, with the performance options of conf.yaml; the pipelined run prints the utilization of its stages and the depth of its queues
+    :param work_dir: the directory to write the synthetic files in
+    :param file_count: the number of mf4 files in every data folder
+    :param signal_count: the number of signals besides the camera id
+    :param duration: the logging duration of every file in seconds
+    :param test_count: the number of test data folders
+    :return: a dictionary with keys as the run names, values as the seconds
+    """
+    from infra import read_config
+    from main import run_report
+
+    performance = read_config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "conf.yaml")).get("performance", {})
+    timings = {}
+    abnormals = {}
+    for name, pipelined in (("phased", False), ("pipelined", True)):
+        conf, _ = synthetic_pipeline_conf(os.path.join(work_dir, name), file_count, signal_count, duration, test_count,
+                                          performance=dict(performance, pipeline=pipelined))
+        t0 = time.perf_counter()
+        abnormals[name] = run_report(conf)
+        timings[name] = time.perf_counter() - t0
+
+    for name, elapsed in timings.items():
+        print("{:>10}: {:.2f}s".format(name, elapsed))
+    print("Speed-up: {:.2f}x, same abnormal intervals: {}".format(timings["phased"] / timings["pipelined"], abnormals["phased"] == abnormals["pipelined"]))
+    return timings
@@ -0,0 +1,130 @@
+"""
+Function: benchmark rendering the figures: parallel plot workers, downsampling and figure templates
+Date: 10/17/2026
+"""
+
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmark_data import *
+from data_operation import *
+
+
+def benchmark_plot_rendering(work_dir, signal_count=300, test_count=2, duration=60.0, workers=4):
+    """
+    Render the outlier figures of a synthetic report with one process and with a pool of processes, and trace the memory of the one process rendering
+    :param work_dir: the directory to save the figures in
+    :param signal_count: the number of value signals in the report
+    :param test_count: the number of test data folders
+    :param duration: the logging duration of the synthetic files in seconds
+    :param workers: the number of rendering processes of the pool
+    :return: a dictionary with keys as the rendering modes, values as figures per second
+    """
+    data_dictionary, names = generate_synthetic_data_dictionary(signal_count, test_count, 1, duration)
+    timelines = build_cam_id_timelines(data_dictionary, CAMERA_ID_NAME)
+    merged_list = [merge_one_type_data(data_dictionary, name, CAMERA_ID_NAME, "numpy", timelines) for name in names]
+    jobs = [make_plot_job("StatsAbnormalFig", df, work_dir, name, CAMERA_ID_NAME, changed, lower_bound)
+            for name, (df, changed, _, lower_bound) in zip(names, generate_stats_batch(merged_list, CAMERA_ID_NAME))]
+    del merged_list
+
+    results = {}
+    for mode, worker_count in (("1 process", 1), ("{} processes".format(workers), workers)):
+        t0 = time.perf_counter()
+        with PlotRenderer(worker_count) as renderer:
+            for job in jobs:
+                renderer.submit(job)
+        results[mode] = len(jobs) / (time.perf_counter() - t0)
+
+    # memory is traced in a separate run, tracing slows the rendering down
+    tracemalloc.start()
+    with PlotRenderer(1) as renderer:
+        for job in jobs:
+            renderer.submit(job)
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+
+    print("Synthetic report: {} figures of {} points per line".format(len(jobs), len(jobs[0]["series"][0][1])))
+    for mode, figures_per_second in results.items():
+        print("{:>12}: {:.2f} figures/s".format(mode, figures_per_second))
+    print("Peak traced memory of 1 process rendering: {:.1f} MB, open figures left: {}".format(peak, len(plt.get_fignums())))
+    return results
+
+
+def benchmark_plot_downsampling(work_dir, point_counts=(10000, 100000, 500000), test_count=3, seed=0):
+    """
+    Compare the render time and figure file size of an outlier figure with all the points and with the lines downsampled to the figure's pixel width
+    :param work_dir: the directory to save the figures in
+    :param point_counts: the numbers of camera ids per line to benchmark with
+    :param test_count: the number of test data lines
+    :param seed: the seed of the random values
+    :return: a dictionary with keys as the point counts, values as tuples of (seconds with all points, seconds downsampled)
+    """
+    rng = np.random.RandomState(seed)
+    results = {}
+    for count in point_counts:
+        columns = {CAMERA_ID_NAME: np.arange(1, count + 1, dtype=np.float64)}
+        base = np.cumsum(rng.normal(0, 1, count))
+        names = ["Sig_original"] + ["Sig_test" + str(t + 1) for t in range(test_count)]
+        for name in names:
+            values = base + rng.normal(0, 0.1, count)
+            # a few one-sample spikes, they must stay visible after downsampling
+            values[rng.randint(0, count, 5)] += 50
+            columns[name] = values
+        df = pd.DataFrame(columns)
+        df["test_mean"] = df[names[1:]].mean(axis=1)
+        df["test_std"] = df[names[1:]].std(axis=1)
+
+        timings = []
+        sizes = []
+        for downsample_width in (None, FIGURE_WIDTH_PIXELS):
+            t0 = time.perf_counter()
+            job = make_plot_job("StatsAbnormalFig", df, work_dir, "Sig", CAMERA_ID_NAME, True, df["test_std"].quantile(0.95), downsample_width)
+            render_plot_job(job)
+            timings.append(time.perf_counter() - t0)
+            sizes.append(os.path.getsize(job["file_path"]) / 1024)
+            spikes_kept = all(np.nanmax(values) == df[name].max() for name, (_, _, values) in zip(names, job["series"]))
+        print("{:>7} points: all points {:.2f}s {:.0f} KB, downsampled to {} points {:.2f}s {:.0f} KB, {:.1f}x, spikes kept: {}".format(
+            count, timings[0], sizes[0], len(job["series"][0][1]), timings[1], sizes[1], timings[0] / timings[1], spikes_kept))
+        results[count] = tuple(timings)
+
+    # a line without any value (ex: the std of a single test folder, a signal missing from a test) keeps one NaN per bucket
+    x_nan, values_nan = downsample_min_max(np.arange(10000.0), np.full(10000, np.nan), FIGURE_WIDTH_PIXELS)
+    print("All-NaN line of 10000 points: {} points kept, all NaN: {}".format(len(x_nan), bool(np.isnan(values_nan).all())))
+    return results
+
+
+def benchmark_figure_templates(work_dir, signal_count=50, test_count=2, duration=60.0):
+    """
+    Compare the per-figure time of building every figure from scratch (render_plot_job) with updating a FigureTemplate
+    :param work_dir: the directory to save the figures in
+    :param signal_count: the number of figures of every kind
+    :param test_count: the number of test data folders
+    :param duration: the logging duration of the synthetic files in seconds
+    :return: a dictionary with keys as the plot kinds, values as tuples of (seconds per figure from scratch, seconds per figure with the template)
+    """
+    data_dictionary, names = generate_synthetic_data_dictionary(signal_count, test_count, 1, duration)
+    timelines = build_cam_id_timelines(data_dictionary, CAMERA_ID_NAME)
+    merged_list = [merge_one_type_data(data_dictionary, name, CAMERA_ID_NAME, "numpy", timelines) for name in names]
+    stats = generate_stats_batch(merged_list, CAMERA_ID_NAME)
+    use_agg_backend()
+
+    results = {}
+    for kind in ("OriTestFig", "StatsAbnormalFig"):
+        # the lines are downsampled, so that the time goes to the figure building rather than to drawing long lines
+        jobs = [make_plot_job(kind, df, work_dir, name, CAMERA_ID_NAME, changed, lower_bound, FIGURE_WIDTH_PIXELS)
+                for name, (df, changed, _, lower_bound) in zip(names, stats)]
+        timings = []
+        for render in (render_plot_job, render_plot_job_with_template):
+            t0 = time.perf_counter()
+            for job in jobs:
+                render(job)
+            timings.append((time.perf_counter() - t0) / len(jobs))
+        close_figure_templates()
+        print("{:>16}: from scratch {:.1f} ms per figure, template {:.1f} ms per figure, {:.1f}x".format(
+            kind, timings[0] * 1000, timings[1] * 1000, timings[0] / timings[1]))
+        results[kind] = tuple(timings)
+    return results
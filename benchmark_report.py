@@ -0,0 +1,106 @@
+"""
+Function: benchmark generating the PPT report from the figure records and with the streaming ReportBuilder
+Date: 10/17/2026
+"""
+
+import os
+import time
+import tracemalloc
+from io import BytesIO
+
+from PIL import Image
+
+from benchmark_data import *
+from data_operation import *
+from ppt import *
+
+
+def benchmark_ppt_records(work_dir, signal_count=100, test_count=2, duration=60.0):
+    """
+    Compare building the PPT from the figure files (written by the plot stage and read back by generate_ppt) with building it from the PNG records kept in memory
+    :param work_dir: the directory to write the figures and the PPT files in
+    :param signal_count: the number of value signals in the report
+    :param test_count: the number of test data folders
+    :param duration: the logging duration of the synthetic files in seconds
+    :return: a dictionary with keys as the modes, values as the seconds of plotting and PPT generation
+    """
+    data_dictionary, names = generate_synthetic_data_dictionary(signal_count, test_count, 1, duration)
+    timelines = build_cam_id_timelines(data_dictionary, CAMERA_ID_NAME)
+    merged_list = [merge_one_type_data(data_dictionary, name, CAMERA_ID_NAME, "numpy", timelines) for name in names]
+    abnormals = {}
+    jobs = []
+    for name, (df, changed, outliers, lower_bound) in zip(names, generate_stats_batch(merged_list, CAMERA_ID_NAME)):
+        abnormals[name] = convert_to_interval(outliers)
+        jobs.append(make_plot_job("StatsAbnormalFig", df, work_dir, name, CAMERA_ID_NAME, changed, lower_bound, FIGURE_WIDTH_PIXELS))
+    del merged_list
+
+    results = {}
+    for mode, keep_records in (("figure files", False), ("in memory", True)):
+        t0 = time.perf_counter()
+        with PlotRenderer(1, True, keep_records, save_files=False) as renderer:
+            for job in jobs:
+                renderer.submit(job)
+        if keep_records:
+            generate_ppt_from_records(renderer.records, abnormals, work_dir, "records")
+        else:
+            generate_ppt(work_dir, abnormals, work_dir, "files")
+        results[mode] = time.perf_counter() - t0
+
+    for mode, elapsed in results.items():
+        print("{:>12}: {:.2f}s for {} figures and the PPT".format(mode, elapsed, len(jobs)))
+    print("PPT sizes: {:.1f} MB from files, {:.1f} MB from records".format(
+        os.path.getsize(os.path.join(work_dir, "files.pptx")) / 1024 / 1024, os.path.getsize(os.path.join(work_dir, "records.pptx")) / 1024 / 1024))
+    return results
+
+
+def benchmark_report_builder(work_dir, figure_count=500, distinct_figures=10, image_dpi=60, max_deck_mb=20):
+    """
+    Compare the wall time and peak traced memory of building a large report at once (generate_ppt_from_records) with the incremental ReportBuilder (recompressed images, decks split by size)
+    :param work_dir: the directory to write the PPT files in
+    :param figure_count: the number of figures in the report
+    :param distinct_figures: the number of figures actually rendered, the other figures are copies of them with one pixel changed
+    :param image_dpi: the image resolution of the ReportBuilder
+    :param max_deck_mb: the deck size limit of the ReportBuilder
+    :return: a dictionary with keys as the modes, values as tuples of (seconds, peak traced memory in MB)
+    """
+    data_dictionary, names = generate_synthetic_data_dictionary(distinct_figures, 2, 1, 60.0)
+    timelines = build_cam_id_timelines(data_dictionary, CAMERA_ID_NAME)
+    merged_list = [merge_one_type_data(data_dictionary, name, CAMERA_ID_NAME, "numpy", timelines) for name in names]
+    with PlotRenderer(1, True, True, save_files=False) as renderer:
+        for name, (df, changed, _, lower_bound) in zip(names, generate_stats_batch(merged_list, CAMERA_ID_NAME)):
+            renderer.submit(make_plot_job("StatsAbnormalFig", df, work_dir, name, CAMERA_ID_NAME, changed, lower_bound, FIGURE_WIDTH_PIXELS))
+    # every figure of the report gets distinct pixels (one corner pixel), otherwise the PPT would store the repeated images once
+    figure_dir = os.path.join(work_dir, "report_figures")
+    os.makedirs(figure_dir, exist_ok=True)
+    for i in range(figure_count):
+        image = Image.open(BytesIO(renderer.records[i % len(renderer.records)][2])).convert("RGB")
+        image.putpixel((0, 0), (i % 256, i // 256 % 256, 255))
+        image.save(os.path.join(figure_dir, "{}.png".format(i)))
+    abnormals = {"Sig_{}".format(i): ["{}-{}".format(i * 100, i * 100 + 20)] for i in range(figure_count)}
+
+    def records():
+        # the figures arrive one by one, as from the plot stage
+        for i in range(figure_count):
+            with open(os.path.join(figure_dir, "{}.png".format(i)), "rb") as f:
+                yield "Sig_{}".format(i), "StatsAbnormalFig", f.read()
+
+    results = {}
+    for mode, dpi in (("all at once", None), ("ReportBuilder", None), ("ReportBuilder, {} dpi".format(image_dpi), image_dpi)):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        if mode == "all at once":
+            # the records are all held before the PPT is built, as with renderer.records
+            generate_ppt_from_records(list(records()), abnormals, work_dir, "at_once")
+            paths = [os.path.join(work_dir, "at_once.pptx")]
+        else:
+            with ReportBuilder(work_dir, "builder_{}".format(dpi), abnormals, dpi, max_deck_mb) as report:
+                for record in records():
+                    report.add_record(record)
+            paths = report.saved_paths
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+        results[mode] = (elapsed, peak)
+        print("{:>22}: {:.2f}s, peak traced memory {:.1f} MB, {} deck(s), {:.1f} MB in total".format(
+            mode, elapsed, peak, len(paths), sum(os.path.getsize(p) for p in paths) / 1024 / 1024))
+    return results
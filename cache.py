@@ -0,0 +1,73 @@
+"""
+Function: store the results of slow loading steps on disk, so that repeated runs over unchanged files can skip them
+Date: 10/17/2026
+"""
+
+import hashlib
+import os
+import pickle
+
+
+def file_digest(file_path, chunk_size=1 << 20):
+    """
+    Calculate the sha256 digest of a file's content
+    :param file_path: the path of the file
+    :param chunk_size: the number of bytes read at a time
+    :return: a string of the hex digest
+    """
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def cache_entry_path(cache_dir, kind, source_path, extension=".pkl"):
+    """
+    Generate the path of the cache entry of one source file, every source file has exactly one entry per kind so that an outdated entry is overwritten instead of piling up
+    :param cache_dir: the root directory of the cache
+    :param kind: a string of the cache type (ex: "dbc"), used as the sub folder name
+    :param source_path: the path of the file being cached
+    :param extension: the extension of the cache entry file
+    :return: a string of the cache entry's absolute path
+    """
+    folder = os.path.join(cache_dir, kind)
+    os.makedirs(folder, exist_ok=True)
+    path_hash = hashlib.sha1(os.path.abspath(source_path).encode("utf8")).hexdigest()[:16]
+    file_name = os.path.splitext(os.path.basename(source_path))[0] + "-" + path_hash + extension
+    return os.path.join(folder, file_name)
+
+
+def read_cache_entry(entry_path, key):
+    """
+    Read a pickled cache entry
+    :param entry_path: the path generated by cache_entry_path
+    :param key: a dictionary describing the source (path, content hash, versions...), the entry is only valid if it was written with the same key
+    :return: the dictionary stored by write_cache_entry, or None if the entry does not exist or is outdated
+    """
+    if not os.path.exists(entry_path):
+        return None
+    try:
+        with open(entry_path, "rb") as f:
+            entry = pickle.load(f)
+    except Exception as e:
+        print("Cannot read cache entry: " + entry_path + ", " + str(e))
+        return None
+    if not isinstance(entry, dict) or entry.get("key") != key:
+        return None
+    return entry
+
+
+def write_cache_entry(entry_path, key, **content):
+    """
+    Pickle the content together with its key to the cache entry (written to a temporary file first, so an interrupted run cannot leave a broken entry)
+    :param entry_path: the path generated by cache_entry_path
+    :param key: a dictionary describing the source, checked by read_cache_entry
+    :param content: the values to store
+    :return: None
+    """
+    entry = dict(content, key=key)
+    tmp_path = entry_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, entry_path)
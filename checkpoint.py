@@ -0,0 +1,79 @@
+"""
+Function: save the outputs of the stages of a run in a run directory, so that an interrupted or rerun report can start again from the saved outputs instead of from the beginning
+Date: 10/17/2026
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import time
+
+
+class RunCheckpoint:
+    """
+    The saved outputs of a run, one sub folder per stage and one pickle file per item (ex: per signal) of a stage
+    Attributes:
+        path: the run directory
+    Methods:
+        stage_dir: the folder of a stage's outputs
+        is_done: whether a stage has finished
+        mark_done: record that a stage has finished
+        reset: delete a stage's outputs and its finished mark, so that it runs again
+        has: whether an item of a stage is saved
+        save: save an item of a stage
+        load: load a saved item of a stage
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def stage_dir(self, stage):
+        folder = os.path.join(self.path, stage)
+        os.makedirs(folder, exist_ok=True)
+        return folder
+
+    def _done_path(self, stage):
+        return os.path.join(self.path, stage + ".done")
+
+    def is_done(self, stage):
+        return os.path.exists(self._done_path(stage))
+
+    def mark_done(self, stage):
+        with open(self._done_path(stage), "w") as f:
+            json.dump({"stage": stage, "finished": time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+
+    def reset(self, stage):
+        if os.path.exists(self._done_path(stage)):
+            os.remove(self._done_path(stage))
+        folder = os.path.join(self.path, stage)
+        if os.path.isdir(folder):
+            shutil.rmtree(folder)
+
+    def item_path(self, stage, item):
+        """
+        :param stage: the name of the stage
+        :param item: a string naming the item (ex: a signal name), any character is allowed
+        :return: the path of the item's pickle file, the readable part of the name is followed by a hash of the item so that different items never share a file
+        """
+        safe_name = re.sub(r"[^\w.-]", "_", item)[:80]
+        item_hash = hashlib.sha1(item.encode("utf8")).hexdigest()[:8]
+        return os.path.join(self.stage_dir(stage), safe_name + "-" + item_hash + ".pkl")
+
+    def has(self, stage, item):
+        return os.path.exists(self.item_path(stage, item))
+
+    def save(self, stage, item, value):
+        # written to a temporary file first, so an interrupted run never leaves a broken item behind
+        path = self.item_path(stage, item)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, stage, item):
+        with open(self.item_path(stage, item), "rb") as f:
+            return pickle.load(f)
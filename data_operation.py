@@ -1,317 +1,725 @@
-"""
-Function: process raw data excel (original and Reinjection data), generate aligned pandas dataframes, perform mean and standard deviation operation on Reinjection data, and can filter out potential problematic data (those with large std)
-Author: Xinran Wang
-Date: 09/02/2020
-"""
-
-# suggested folder structures:
-# ├──
-# ├── original data folder
-# ---├── original mf4 1
-# ---├── original mf4 2
-# ---└── ...
-# ├── test data 1 folder
-# ---├── test 1 mf4 1
-# ---├── test 1 mf4 2
-# ---└── ...
-# ├── test data 2 folder
-# ---├── test 2 mf4 1
-# ---├── test 2 mf4 2
-# ---└── ...
-# └── ...
-
-
-import pandas as pd
-import xlrd
-import os
-import asammdf
-from asammdf import MDF
-import glob
-import time
-from process_data import *
-from plot import *
-import sys
-
-sys.setrecursionlimit(100000)
-pd.set_option('display.max_columns', 8)
-pd.set_option('expand_frame_repr', False)
-
-
-def search_dir(directory):
-    """
-    In the given directory, find original data and Reinjection data, and output their names
-    :param directory: the absolute path of the folder storing all the excel files
-    :return: a dictionary containing keys as the data name (original, test file No.), value as a list of files in this folder
-    example output: {"original": [o_dir1, o_dir2, ...], "test1": [t1_dir1, t1_dir2, ...], "test2": [...], ...}
-    """
-    folders = os.listdir(directory)
-
-    files = {}
-
-    for f in folders:
-        if "original" in f.lower():
-            files["original"] = list_file_path(os.path.join(directory, f))
-        else:
-            files[f] = list_file_path(os.path.join(directory, f))
-
-    return files
-
-
-def list_file_path(path):
-    """
-    If the directory has the structure listed below, then can use this function to further extract files
-        ├──
-        ├── original data folder
-        ---├── original mf4 1
-        ---├── original mf4 2
-        ---└── ...
-        ├── test data 1 folder
-        ---├── test 1 mf4 1
-        ---├── test 1 mf4 2
-        ---└── ...
-        ├── test data 2 folder
-        ---├── test 2 mf4 1
-        ---├── test 2 mf4 2
-        ---└── ...
-        └── ...
-    :param path: the path of one folder (ex: original data folder, test data folder...)
-    :return: a list containing all the mf4 files' paths in this folder
-    """
-    file_paths = []
-    files = os.listdir(path)
-    for f in files:
-        if f.endswith(".mf4"):
-            file_paths.append(os.path.join(path, f))
-    return file_paths
-
-
-def generate_wanted_signal(signal_path):
-    """
-    From the excel containing wanted signals, extract the signals with top priority and split them by enumerate and value types
-    :param signal_path: the path of the signals excel file
-    :return: a tuple with 2 lists containing respectively enumerated signal and value signal, and the string name of camera id
-    """
-    start_time = time.time()
-
-    signals = pd.read_excel(signal_path)
-    first_priority = signals[(signals["Priority"] == 1) & (signals["Alignment"] == "Agree")]
-    camera_id = "Camera_ID"
-    for i in first_priority["Name"]:
-        if "camera" in i.lower() and "id" in i.lower():
-            camera_id = i
-            break
-    enum_list = list(first_priority[first_priority["Value Table"] == "Enumeration"]["Name"])
-    val_list = list(first_priority[first_priority["Value Table"] == "None"]["Name"])
-    enum_list.append(camera_id)
-    end_time = time.time()
-    print("Time spent on extracting wanted signals from excel: " + str(end_time - start_time) + " seconds")
-
-    return enum_list, val_list, camera_id
-
-
-def load_mf4_to_dic_for_all(data_path_dic, dbc, total_wanted):
-    """
-    Based on the given dictionary containing all data files' paths, extract all the dictionary-form data using loadMF4data2Dict
-    :param data_path_dic: the directory of data file
-    :param dbc: the total_fullpath variable generated from load_total_matrix
-    :param total_wanted: the wanted signals for extracting data
-    :return: a dictionary containing keys as the data name (original, test file No.), value as a list of dictionaries, each dictionary contains the data of one file in this folder
-    example output: {"original": [{Idx1: df1, Idx2: df2, ...}, {Idx1': df1', Idx2': df2', ...}, ...], "test1": [{Idx1: df1, Idx2: df2, ...}, {Idx1': df1', Idx2': df2', ...}, ...], "test2": [...], ...}
-    """
-    data_dic = {}
-    for k in data_path_dic:
-        data_dic[k] = []
-        for p in data_path_dic[k]:
-            data_dic[k].append(loadMF4data2Dict(p, total_wanted, dbc))
-    return data_dic
-
-
-def merge_one_type_data(data_dictionary, to_analysis, cam_id_name):
-    """
-    Based on the given signal to analysis, generate the full dataframe
-    :param data_dictionary: the dictionary with key as the data folders' names and the value as a list of dictionaries, each dictionary holding the data for one file in that data folder
-    :param to_analysis: the signal to analysis
-    :param cam_id_name: a string representing the name of the camera id's name in the data columns
-    :return: the merged dataframe, and the list containing all the test data's names (for further detection of the existence of test data)
-    """
-    ori_name_list = [cam_id_name]
-    test_name_list = []
-
-    # first generate the dataframe for original data
-    to_analysis_ori = [i[to_analysis] for i in data_dictionary["original"] if i[to_analysis] is not None]
-    if len(to_analysis_ori) == 0:
-        merged = pd.DataFrame()
-    elif len(to_analysis_ori) > 1:
-        merged = pd.concat(to_analysis_ori)
-    else:
-        merged = to_analysis_ori[0]
-        
-    cam_id_ori = [o[cam_id_name] for o in data_dictionary["original"] if o[cam_id_name] is not None]
-    if len(cam_id_ori) == 0:
-        original_cam_id = pd.DataFrame()
-    elif len(cam_id_ori) > 1:
-        original_cam_id = pd.concat(cam_id_ori)
-    else:
-        original_cam_id = cam_id_ori[0]
-    merged = original_cam_id.join(merged, how="outer")
-    # fill the NAs in the original cam ids and delete all the NAs in the signal data accordingly
-    merged[cam_id_name].fillna(method="ffill", inplace=True)
-    merged[cam_id_name].fillna(method="bfill", inplace=True)
-    # merged.fillna(method="ffill", inplace=True)
-    # merged.fillna(method="bfill", inplace=True)
-    merged = merged.dropna()
-    merged = remove_dup(merged, cam_id_name)
-
-    if merged.shape[1] > 1:
-        ori_name_list.append(to_analysis + "_original")
-
-    # then generate the dataframe for test data
-    for k in sorted(list(data_dictionary.keys())):
-        if k != "original":
-            to_analysis_test = [d[to_analysis] for d in data_dictionary[k] if d[to_analysis] is not None]
-            cam_id_test = [d[cam_id_name] for d in data_dictionary[k] if d[cam_id_name] is not None]
-            if len(to_analysis_test) == 0:
-                dataframe = pd.DataFrame()
-            elif len(to_analysis_test) > 1:
-                dataframe = pd.concat(to_analysis_test)
-            else:
-                dataframe = to_analysis_test[0]
-
-            if len(cam_id_test) == 0:
-                cam_id_test_total = pd.DataFrame()
-            elif len(cam_id_test) > 1:
-                cam_id_test_total = pd.concat(cam_id_test)
-            else:
-                cam_id_test_total = cam_id_test[0]
-            dataframe = cam_id_test_total.join(dataframe, how="outer")
-            # after joining, fill in all the missing cam ids for current test case, and remove duplicated cam ids' data
-            dataframe[cam_id_name].fillna(method="ffill", inplace=True)
-            dataframe[cam_id_name].fillna(method="bfill", inplace=True)
-            dataframe = dataframe.dropna()
-            dataframe = remove_dup(dataframe, cam_id_name)
-
-            # merge the dataframe to the result, and fill in all the missing values in other data columns
-            merged = pd.merge(merged, dataframe, on=cam_id_name, how="outer")
-            merged = merged.sort_values(by=cam_id_name)
-            merged = merged.reset_index(drop=True)
-            merged.fillna(method="ffill", inplace=True)
-            merged.fillna(method="bfill", inplace=True)
-            # merged = remove_dup(merged, cam_id_name)
-
-            if dataframe.shape[1] > 1:
-                test_name_list.append(to_analysis + "_" + k)
-
-    merged.columns = ori_name_list + test_name_list
-    merged = drop_zero_and_na(merged, cam_id_name)
-
-    return merged, test_name_list
-
-
-def remove_dup(dataframe, cam_id_name):
-    """
-    Drop rows that have duplicated camera id (keep the first duplicated camera id data)
-    :param dataframe: a pandas dataframe
-    :return: a pandas dataframe after removing duplicates
-    """
-    dataframe.drop_duplicates(subset=cam_id_name, inplace=True)
-    return dataframe
-
-
-# below is further data analysis and calculation methods
-
-def drop_zero_and_na(dataframe, camera_id_name):
-    """
-    Drop columns that include NaN or camera id is 0
-    :param dataframe: a pandas dataframe (after combining original dataframe with Reinjection dataframes)
-    :param camera_id_name: a string representing the name of the camera id's name in the data columns
-    :return: a pandas dataframe after dropping
-    """
-    new = dataframe.reset_index(drop=True)
-    new = new.drop(dataframe[dataframe[camera_id_name] == 0].index)
-    new = new.dropna()
-    new = new.reset_index(drop=True)
-    return new
-
-
-def generate_stats(dataframe, test_name_list):
-    """
-    Generate the test data's mean and std data from the given dataframe
-    :param dataframe: the dataframe containing all the merged data
-    :param test_name_list: a list containing test data's names (it is used to detect whether test data exists for this signal)
-    :return: a new dataframe with mean and std added, and a boolean flag value of whether there is test data for
-    """
-    if len(test_name_list) > 0:
-        flag = True
-        dataframe["test_mean"] = dataframe[test_name_list].mean(axis=1)
-        dataframe["test_std"] = dataframe[test_name_list].std(axis=1)
-    else:
-        flag = False
-    return dataframe, flag
-
-
-def large_std_cam_id(dataframe, cam_id_name, percentile=0.95):
-    """
-    Pick out the camera ids that have too large std values (larger than some pre-set percentile lower bound)
-    :param dataframe: a pandas dataframe that has gone through merge_and_calculate operation
-    :param cam_id_name: a string representing the name of the cam id parameter
-    :param percentile: the percentile of the std lower bound
-    :return: a list containing numbers representing the camera ids of potential abnormal points, and a float number representing the lower bound of abnormal std
-    """
-    # set the default lower bound to 95% largest data std
-    std_lower_bound = dataframe["test_std"].describe((1-percentile, percentile))[str(int(percentile*100))+"%"]
-    filt = (dataframe["test_std"] >= std_lower_bound)
-    return list(dataframe[filt][cam_id_name].astype(int)), std_lower_bound
-
-
-def convert_to_interval(id_array):
-    """
-    Convert some consecutive timestamps' id to some intervals for easier retrieval
-    :param id_array: a list containing all the camera ids of outliers
-    :return: a list of strings representing the abnormal camera id ranges
-    """
-    interval = []
-    current_interval = [id_array[0]]
-    digit = id_array[0] // 100
-    for i in range(1, len(id_array)):
-        now = id_array[i]
-        if now // 100 == digit:
-            current_interval.append(now)
-        elif now // 100 == digit + 1:
-            current_interval.append(now)
-            digit += 1
-        else:
-            if current_interval[-1] - current_interval[0] >= 5:
-                interval.append(str(current_interval[0]) + "-" + str(current_interval[-1]))
-            current_interval = [now]
-            digit = now // 100
-    if current_interval[-1] - current_interval[0] >= 5:
-        interval.append(str(current_interval[0]) + "-" + str(current_interval[-1]))
-    return interval
-
-
-if __name__ == "__main__":
-    path = "C:\\Users\\Z0050908\\Desktop\\hil_test\\"
-    dbc_path = "C:\\Users\\Z0050908\\Downloads\\"
-    signal = "C:\\Users\\Z0050908\\Desktop\\FR-IFC-Private CAN_Checklist.xlsx"
-
-    e, v, cam = generate_wanted_signal(signal)
-
-    dbcs = {"Ch3": ['GWM V71 CAN 01C.dbc'], "Ch4": ['FR-IFC-Private CAN.dbc'], "Ch5": ['GWM V71 CAN 01C.dbc'], "Ch6": ['FR-IFC-Private CAN.dbc']}
-    A, B, C = load_total_matrix(dbc_path, dbcs)
-
-    dic = search_dir(path)
-    print(dic)
-    data_dic = load_mf4_to_dic_for_all(dic, A, e+v)
-
-    df, tn = merge_one_type_data(data_dic, 'IFC_obj01_Dx', cam)
-    # val: IFC_obj01_Dx
-    # enum: BridgeDistance
-    # none: FS_Out_Of_Calib
-    df_stat, changed = generate_stats(df, tn)
-
-    print(df_stat.head(50))
-    print(df_stat.tail(50))
-
-    abnormal, lower = large_std_cam_id(df_stat, cam, 0.95)
-    plot_data_and_stats_with_outliers(df_stat, dbc_path, changed, "IFC_obj01_Dx", cam, lower)
-    # plot_data_and_stats(df_stat, dbc_path, changed, "IFC_obj01_Dx", cam)
+"""
+Function: process raw data excel (original and Reinjection data), generate aligned pandas dataframes, perform mean and standard deviation operation on Reinjection data, and can filter out potential problematic data (those with large std)
+Author: Xinran Wang
+Date: 09/02/2020
+"""
+
+# suggested folder structures:
+# ├──
+# ├── original data folder
+# ---├── original mf4 1
+# ---├── original mf4 2
+# ---└── ...
+# ├── test data 1 folder
+# ---├── test 1 mf4 1
+# ---├── test 1 mf4 2
+# ---└── ...
+# ├── test data 2 folder
+# ---├── test 2 mf4 1
+# ---├── test 2 mf4 2
+# ---└── ...
+# └── ...
+
+
+import pandas as pd
+import xlrd
+import os
+import asammdf
+from asammdf import MDF
+import glob
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from process_data import *
+from plot import *
+import sys
+
+sys.setrecursionlimit(100000)
+pd.set_option('display.max_columns', 8)
+pd.set_option('expand_frame_repr', False)
+
+# the most values of the 3-D array of generate_stats_batch (float64, 160 MB), a larger batch is split into smaller ones
+STATS_BATCH_MAX_CELLS = 20000000
+
+
+def search_dir(directory):
+    """
+    In the given directory, find original data and Reinjection data, and output their names
+    :param directory: the absolute path of the folder storing all the excel files
+    :return: a dictionary containing keys as the data name (original, test file No.), value as a list of files in this folder
+    example output: {"original": [o_dir1, o_dir2, ...], "test1": [t1_dir1, t1_dir2, ...], "test2": [...], ...}
+    """
+    folders = os.listdir(directory)
+
+    files = {}
+
+    for f in folders:
+        if "original" in f.lower():
+            files["original"] = list_file_path(os.path.join(directory, f))
+        else:
+            files[f] = list_file_path(os.path.join(directory, f))
+
+    return files
+
+
+def list_file_path(path):
+    """
+    If the directory has the structure listed below, then can use this function to further extract files
+        ├──
+        ├── original data folder
+        ---├── original mf4 1
+        ---├── original mf4 2
+        ---└── ...
+        ├── test data 1 folder
+        ---├── test 1 mf4 1
+        ---├── test 1 mf4 2
+        ---└── ...
+        ├── test data 2 folder
+        ---├── test 2 mf4 1
+        ---├── test 2 mf4 2
+        ---└── ...
+        └── ...
+    :param path: the path of one folder (ex: original data folder, test data folder...)
+    :return: a list containing all the mf4 files' paths in this folder
+    """
+    file_paths = []
+    files = os.listdir(path)
+    for f in files:
+        if f.endswith(".mf4"):
+            file_paths.append(os.path.join(path, f))
+    return file_paths
+
+
+def generate_wanted_signal(signal_path):
+    """
+    From the excel containing wanted signals, extract the signals with top priority and split them by enumerate and value types
+    :param signal_path: the path of the signals excel file
+    :return: a tuple with 2 lists containing respectively enumerated signal and value signal, and the string name of camera id
+    """
+    start_time = time.time()
+
+    signals = pd.read_excel(signal_path)
+    # "None" is a value of the Value Table column, not a missing cell (pandas parses it as NaN), only this column is read again as text
+    signals["Value Table"] = pd.read_excel(signal_path, usecols=["Value Table"], keep_default_na=False)["Value Table"]
+    first_priority = signals[(signals["Priority"] == 1) & (signals["Alignment"] == "Agree")]
+    camera_id = "Camera_ID"
+    for i in first_priority["Name"]:
+        if "camera" in i.lower() and "id" in i.lower():
+            camera_id = i
+            break
+    enum_list = list(first_priority[first_priority["Value Table"] == "Enumeration"]["Name"])
+    val_list = list(first_priority[first_priority["Value Table"] == "None"]["Name"])
+    enum_list.append(camera_id)
+    end_time = time.time()
+    print("Time spent on extracting wanted signals from excel: " + str(end_time - start_time) + " seconds")
+
+    return enum_list, val_list, camera_id
+
+
+def load_mf4_to_dic_for_all(data_path_dic, dbc, total_wanted, workers=1, cache_dir=None, compact=False, profile=None, decode_dbcs=None, signal_index=None, decoder_messages=None):
+    """
+    Based on the given dictionary containing all data files' paths, extract all the dictionary-form data using loadMF4data2Dict
+    :param data_path_dic: the directory of data file
+    :param dbc: the total_fullpath variable generated from load_total_matrix
+    :param total_wanted: the wanted signals for extracting data
+    :param workers: the number of processes used to decode the files (1 means loading the files one after another)
+    :param cache_dir: the root directory of the decoded signal cache (None to always decode the files)
+    :param compact: keep every signal as a SignalSamples object (two numpy arrays) instead of a one-column dataframe
+    :param profile: a RunProfile recording the time spent on every file as a "loadMF4data2Dict" stage (None for no recording)
+    :param decode_dbcs: the dbc files actually used to decode every channel (ex: the pruned dbc files generated by prune_channel_dbcs), None to decode with dbc
+    :param signal_index: the dictionary generated by build_signal_index, so that only the channels and signals defined in the dbc files are read (None to try every signal on every channel)
+    :param decoder_messages: the total_messages generated from load_total_matrix to decode the raw CAN frames with the numpy decoder of frame_decoder, None to decode with asammdf
+    :return: a dictionary containing keys as the data name (original, test file No.), value as a list of dictionaries, each dictionary contains the data of one file in this folder
+    example output: {"original": [{Idx1: df1, Idx2: df2, ...}, {Idx1': df1', Idx2': df2', ...}, ...], "test1": [{Idx1: df1, Idx2: df2, ...}, {Idx1': df1', Idx2': df2', ...}, ...], "test2": [...], ...}
+    """
+    start_time = time.time()
+    tasks = load_tasks(data_path_dic)
+
+    data_dic = {k: [None] * len(data_path_dic[k]) for k in data_path_dic}
+    if workers is None or workers <= 1:
+        for k, idx, p, size in tasks:
+            with profile.stage("loadMF4data2Dict", p) if profile is not None else nullcontext():
+                data, elapsed, _ = timed_load_mf4(p, total_wanted, dbc, cache_dir, compact, decode_dbcs, signal_index, decoder_messages)
+            data_dic[k][idx] = data
+            print_throughput(os.path.split(p)[-1], 1, size, elapsed)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(k, idx, p, size, executor.submit(timed_load_mf4, p, total_wanted, dbc, cache_dir, compact, decode_dbcs, signal_index, decoder_messages)) for k, idx, p, size in tasks]
+            for k, idx, p, size, future in futures:
+                data, elapsed, cpu_elapsed = future.result()
+                data_dic[k][idx] = data
+                if profile is not None:
+                    # measured in the worker process, whose memory is not traced
+                    profile.add_record("loadMF4data2Dict", p, elapsed, cpu_elapsed)
+                print_throughput(os.path.split(p)[-1], 1, size, elapsed)
+
+    total_size = sum(task[3] for task in tasks)
+    print_throughput("all data folders with " + str(max(workers or 1, 1)) + " worker(s)", len(tasks), total_size, time.time() - start_time)
+    return data_dic
+
+
+def load_tasks(data_path_dic):
+    """
+    :param data_path_dic: the directory of data file
+    :return: a list of tuples of (folder name, position in folder, file path, file size), the largest files first so that one huge log does not become the tail
+    """
+    tasks = []
+    for k in data_path_dic:
+        for idx, p in enumerate(data_path_dic[k]):
+            size = os.path.getsize(p) if os.path.exists(p) else 0
+            tasks.append((k, idx, p, size))
+    tasks.sort(key=lambda task: task[3], reverse=True)
+    return tasks
+
+
+def timed_load_mf4(file, wanted_signals, dbcfiles, cache_dir=None, compact=False, decode_dbcs=None, signal_index=None, decoder_messages=None):
+    """
+    Load one mf4 file with loadMF4data2Dict (or load_mf4_cached if a cache directory is given) and measure the time spent (top-level function so that it can be sent to worker processes)
+    :param file: the path of mf4 file
+    :param wanted_signals: a list containing wanted signals
+    :param dbcfiles: the total_fullpath generated from load_total_matrix
+    :param cache_dir: the root directory of the decoded signal cache (None to always decode the file)
+    :param compact: keep every signal as a SignalSamples object instead of a one-column dataframe
+    :param decode_dbcs: the dbc files actually used to decode every channel, None to decode with dbcfiles
+    :param signal_index: the dictionary generated by build_signal_index, None to try every signal on every channel
+    :param decoder_messages: the total_messages used by the numpy decoder, None to decode with asammdf
+    :return: a tuple of the dictionary generated by loadMF4data2Dict, the seconds spent on loading and the CPU seconds of the loading process
+    """
+    t0 = time.time()
+    cpu_t0 = time.process_time()
+    if cache_dir:
+        data = load_mf4_cached(file, wanted_signals, dbcfiles, cache_dir, compact, decode_dbcs, signal_index, decoder_messages)
+    else:
+        data = loadMF4data2Dict(file, wanted_signals, dbcfiles, compact, decode_dbcs, signal_index, decoder_messages)
+    return data, time.time() - t0, time.process_time() - cpu_t0
+
+
+def print_throughput(name, file_count, size, elapsed):
+    """
+    Print the loading throughput in files per second and MB per second
+    :param name: a string describing what has been loaded
+    :param file_count: the number of files loaded
+    :param size: the total size of the loaded files in bytes
+    :param elapsed: the seconds spent on loading
+    :return: None
+    """
+    elapsed = max(elapsed, 1e-9)
+    mega_bytes = size / 1024 / 1024
+    print("Throughput: {}, {} file(s), {:.2f} MB in {:.2f}s, {:.2f} files/s, {:.2f} MB/s".format(
+        name, file_count, mega_bytes, elapsed, file_count / elapsed, mega_bytes / elapsed))
+
+
+def merge_one_type_data(data_dictionary, to_analysis, cam_id_name, engine="pandas", timelines=None):
+    """
+    Based on the given signal to analysis, generate the full dataframe
+    :param data_dictionary: the dictionary with key as the data folders' names and the value as a list of dictionaries, each dictionary holding the data for one file in that data folder
+    :param to_analysis: the signal to analysis
+    :param cam_id_name: a string representing the name of the camera id's name in the data columns
+    :param engine: "pandas" (join and fill the dataframes) or "numpy" (align the samples with merge_one_type_data_numpy, same result)
+    :param timelines: for the numpy engine, the camera id timelines generated by build_cam_id_timelines, so that they are not rebuilt for every signal
+    :return: the merged dataframe, and the list containing all the test data's names (for further detection of the existence of test data)
+    """
+    if engine == "numpy":
+        return merge_one_type_data_numpy(data_dictionary, to_analysis, cam_id_name, timelines)
+    if engine != "pandas":
+        raise ValueError("Unknown merge engine: " + str(engine) + ", expected pandas or numpy")
+
+    ori_name_list = [cam_id_name]
+    test_name_list = []
+
+    # first generate the dataframe for original data
+    to_analysis_ori = [as_frame(i[to_analysis]) for i in data_dictionary["original"] if i[to_analysis] is not None]
+    if len(to_analysis_ori) == 0:
+        merged = pd.DataFrame()
+    elif len(to_analysis_ori) > 1:
+        merged = pd.concat(to_analysis_ori)
+    else:
+        merged = to_analysis_ori[0]
+        
+    cam_id_ori = [as_frame(o[cam_id_name]) for o in data_dictionary["original"] if o[cam_id_name] is not None]
+    if len(cam_id_ori) == 0:
+        original_cam_id = pd.DataFrame()
+    elif len(cam_id_ori) > 1:
+        original_cam_id = pd.concat(cam_id_ori)
+    else:
+        original_cam_id = cam_id_ori[0]
+    merged = original_cam_id.join(merged, how="outer")
+    # fill the NAs in the original cam ids and delete all the NAs in the signal data accordingly
+    merged[cam_id_name].fillna(method="ffill", inplace=True)
+    merged[cam_id_name].fillna(method="bfill", inplace=True)
+    # merged.fillna(method="ffill", inplace=True)
+    # merged.fillna(method="bfill", inplace=True)
+    merged = merged.dropna()
+    merged = remove_dup(merged, cam_id_name)
+
+    if merged.shape[1] > 1:
+        ori_name_list.append(to_analysis + "_original")
+
+    # then generate the dataframe for test data
+    for k in sorted(list(data_dictionary.keys())):
+        if k != "original":
+            to_analysis_test = [as_frame(d[to_analysis]) for d in data_dictionary[k] if d[to_analysis] is not None]
+            cam_id_test = [as_frame(d[cam_id_name]) for d in data_dictionary[k] if d[cam_id_name] is not None]
+            if len(to_analysis_test) == 0:
+                dataframe = pd.DataFrame()
+            elif len(to_analysis_test) > 1:
+                dataframe = pd.concat(to_analysis_test)
+            else:
+                dataframe = to_analysis_test[0]
+
+            if len(cam_id_test) == 0:
+                cam_id_test_total = pd.DataFrame()
+            elif len(cam_id_test) > 1:
+                cam_id_test_total = pd.concat(cam_id_test)
+            else:
+                cam_id_test_total = cam_id_test[0]
+            dataframe = cam_id_test_total.join(dataframe, how="outer")
+            # after joining, fill in all the missing cam ids for current test case, and remove duplicated cam ids' data
+            dataframe[cam_id_name].fillna(method="ffill", inplace=True)
+            dataframe[cam_id_name].fillna(method="bfill", inplace=True)
+            dataframe = dataframe.dropna()
+            dataframe = remove_dup(dataframe, cam_id_name)
+
+            # merge the dataframe to the result, and fill in all the missing values in other data columns
+            merged = pd.merge(merged, dataframe, on=cam_id_name, how="outer")
+            merged = merged.sort_values(by=cam_id_name)
+            merged = merged.reset_index(drop=True)
+            merged.fillna(method="ffill", inplace=True)
+            merged.fillna(method="bfill", inplace=True)
+            # merged = remove_dup(merged, cam_id_name)
+
+            if dataframe.shape[1] > 1:
+                test_name_list.append(to_analysis + "_" + k)
+
+    merged.columns = ori_name_list + test_name_list
+    merged = drop_zero_and_na(merged, cam_id_name)
+
+    return merged, test_name_list
+
+
+def merge_one_type_data_numpy(data_dictionary, to_analysis, cam_id_name, timelines=None):
+    """
+    Generate the same dataframe as merge_one_type_data, by mapping every sample's timestamp to the camera id with np.searchsorted instead of joining and filling dataframes
+    The values are aligned as float, then every column takes the dtype the dataframe version gives it (see merged_column_dtypes)
+    :param data_dictionary: the dictionary generated by load_mf4_to_dic_for_all
+    :param to_analysis: the signal to analysis
+    :param cam_id_name: a string representing the name of the camera id's name in the data columns
+    :param timelines: the dictionary generated by build_cam_id_timelines for this data (None to build it for this signal only)
+    :return: the merged dataframe, and the list containing all the test data's names
+    """
+    if timelines is None:
+        timelines = build_cam_id_timelines(data_dictionary, cam_id_name)
+    folder_names = ["original"] + [k for k in sorted(list(data_dictionary.keys())) if k != "original"]
+    folders = []
+    for k in folder_names:
+        signal = concat_signal_arrays([d[to_analysis] for d in data_dictionary[k] if d[to_analysis] is not None])
+        if timelines[k] is None or (signal is not None and not is_numeric_samples(signal[1])):
+            # camera ids with gaps or text samples are left to the dataframe version
+            return merge_one_type_data(data_dictionary, to_analysis, cam_id_name, "pandas")
+        folders.append((k, timelines[k], signal))
+
+    aligned = []
+    column_dtypes = []
+    for k, timeline, signal in folders:
+        if signal is None:
+            aligned.append((k, timeline.unique_ids, None))
+            column_dtypes.append((timeline.unique_ids, timeline.dtype, None))
+        else:
+            ids, values = align_to_cam_id(timeline.timestamps, timeline.cam_ids, *signal)
+            aligned.append((k, ids, values))
+            # the outer join of the dataframe version leaves gaps in the camera ids and the signal where their timestamps differ (float columns keep their dtype anyway)
+            cam_dtype = timeline.dtype
+            if cam_dtype.kind != "f" and not all_in(signal[0], timeline.timestamps):
+                cam_dtype = gap_dtype(cam_dtype)
+            value_dtype = signal[1].dtype
+            if value_dtype.kind != "f" and not all_in(timeline.timestamps, np.sort(signal[0])):
+                value_dtype = gap_dtype(value_dtype)
+            column_dtypes.append((ids, cam_dtype, value_dtype))
+
+    test_name_list = [to_analysis + "_" + k for k, _, values in aligned[1:] if values is not None]
+    column_names = [cam_id_name] + [to_analysis + "_" + k for k, _, values in aligned if values is not None]
+    if len(aligned) == 1:
+        # without test data the rows stay in time order and nothing is filled
+        _, ids, values = aligned[0]
+        columns = [ids] if values is None else [ids, values]
+    else:
+        all_ids = np.unique(np.concatenate([ids for _, ids, _ in aligned]))
+        columns = [all_ids]
+        for _, ids, values in aligned:
+            if values is not None:
+                columns.append(fill_on_cam_ids(all_ids, ids, values))
+
+    merged = pd.DataFrame(dict(zip(column_names, columns)), columns=column_names)
+    merged = drop_zero_and_na(merged, cam_id_name)
+    dtypes = {name: dtype for name, dtype in zip(column_names, merged_column_dtypes(column_dtypes)) if merged[name].dtype != dtype}
+    if dtypes:
+        merged = merged.astype(dtypes)
+    return merged, test_name_list
+
+
+def merged_column_dtypes(folders):
+    """
+    Follow the dtypes of the columns through the outer merges of merge_one_type_data: a column left with gaps by a merge becomes float, and the camera id column takes the common type once a merged folder adds camera ids
+    :param folders: a list of tuples of (camera ids, camera id dtype, signal dtype or None for the folders without the signal), one per data folder in the merge order, with the dtypes each folder's dataframe has before the merges
+    :return: a list of the dtypes of the camera id column and of the signal columns
+    """
+    known_ids, key_dtype, first_dtype = folders[0]
+    known_ids = np.unique(known_ids)
+    dtypes = [] if first_dtype is None else [first_dtype]
+    for ids, cam_dtype, value_dtype in folders[1:]:
+        if not all_in(ids, known_ids):
+            dtypes = [gap_dtype(dtype) for dtype in dtypes]
+            key_dtype = np.result_type(key_dtype, cam_dtype)
+        if value_dtype is not None:
+            dtypes.append(value_dtype if all_in(known_ids, np.sort(ids)) else gap_dtype(value_dtype))
+        known_ids = np.union1d(known_ids, ids)
+    return [key_dtype] + dtypes
+
+
+def gap_dtype(dtype):
+    """
+    :param dtype: the numpy dtype of a dataframe column
+    :return: the dtype pandas gives the column once a join or merge leaves it missing values (integers become float64, float columns keep their precision)
+    """
+    return dtype if dtype.kind == "f" else np.dtype(np.float64)
+
+
+def all_in(values, known):
+    """
+    :param values: a numpy array
+    :param known: a sorted numpy array
+    :return: whether every value is in known
+    """
+    if len(known) == 0:
+        return len(values) == 0
+    position = np.minimum(np.searchsorted(known, values), len(known) - 1)
+    return bool(np.all(known[position] == values))
+
+
+class CamIdTimeline:
+    """
+    The camera ids of all the files of one data folder, built once and shared by the merges of all the signals
+    Attributes:
+        timestamps: the timestamps of the camera ids of all the files, sorted (stable, so the files' order is kept for equal timestamps)
+        cam_ids: the camera ids in the order of timestamps, as float numpy array
+        unique_ids: the first occurrence of every camera id, in the order joining an empty dataframe gives (used for the folders without the signal)
+        dtype: the dtype of the camera ids as loaded
+    """
+
+    __slots__ = ('timestamps', 'cam_ids', 'unique_ids', 'dtype')
+
+    def __init__(self, timestamps, cam_ids, unique_ids, dtype):
+        self.timestamps = timestamps
+        self.cam_ids = cam_ids
+        self.unique_ids = unique_ids
+        self.dtype = dtype
+
+
+def build_cam_id_timelines(data_dictionary, cam_id_name):
+    """
+    Build the camera id timeline of every data folder, to be reused by merge_one_type_data_numpy for all signals
+    :param data_dictionary: the dictionary generated by load_mf4_to_dic_for_all
+    :param cam_id_name: a string representing the name of the camera id's name in the data columns
+    :return: a dictionary with keys as the data folders' names, values as CamIdTimeline objects (None if the folder has no numeric camera id, or one with gaps)
+    """
+    timelines = {}
+    for k in data_dictionary:
+        cam_id = concat_signal_arrays([d[cam_id_name] for d in data_dictionary[k] if d[cam_id_name] is not None])
+        if cam_id is None or len(cam_id[1]) == 0 or not is_numeric_samples(cam_id[1]) or np.isnan(cam_id[1]).any():
+            timelines[k] = None
+            continue
+        cam_ts, cam_ids = cam_id
+        # joining an empty dataframe keeps sorted timestamps as they are, and sorts the others with the default (not stable) sort
+        if np.any(cam_ts[1:] < cam_ts[:-1]):
+            unique_ids = first_occurrences(cam_ids[np.argsort(cam_ts)].astype(np.float64))
+        else:
+            unique_ids = first_occurrences(cam_ids.astype(np.float64))
+        timelines[k] = CamIdTimeline(*sort_by_timestamps(cam_ts, cam_ids), unique_ids, cam_ids.dtype)
+    return timelines
+
+
+def concat_signal_arrays(signals):
+    """
+    Concatenate the timestamps and samples of one signal loaded from several files, in the order of the files
+    :param signals: a list of one-column dataframes or SignalSamples objects
+    :return: a tuple of (timestamps, samples) numpy arrays, or None if the list is empty
+    """
+    if len(signals) == 0:
+        return None
+    timestamps = []
+    samples = []
+    for signal in signals:
+        if isinstance(signal, SignalSamples):
+            timestamps.append(np.asarray(signal.timestamps, dtype=np.float64))
+            samples.append(np.asarray(signal.samples))
+        else:
+            timestamps.append(np.asarray(signal.index.values, dtype=np.float64))
+            samples.append(signal.iloc[:, 0].values)
+    return np.concatenate(timestamps), np.concatenate(samples)
+
+
+def is_numeric_samples(samples):
+    """
+    Check whether the samples can be aligned as numbers (boolean samples are not, the dataframe version turns them into objects where they have gaps)
+    :param samples: a numpy array
+    :return: a boolean value
+    """
+    return samples.dtype.kind in "iuf"
+
+
+def sort_by_timestamps(timestamps, samples):
+    """
+    Stable sort of the samples by their timestamps (samples sharing a timestamp keep the order of the files)
+    :param timestamps: a numpy array of timestamps
+    :param samples: a numpy array of the samples
+    :return: a tuple of the sorted timestamps and the sorted samples as float
+    """
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], samples[order].astype(np.float64)
+
+
+def first_occurrences(cam_ids, values=None):
+    """
+    Keep the first row of every camera id (the rows are in time order), like remove_dup
+    :param cam_ids: a numpy array of camera ids
+    :param values: a numpy array of the signal values on the same rows, or None
+    :return: the camera ids kept (in time order), or a tuple of the camera ids and the values kept if values are given
+    """
+    _, first = np.unique(cam_ids, return_index=True)
+    first.sort()
+    if values is None:
+        return cam_ids[first]
+    return cam_ids[first], values[first]
+
+
+def align_to_cam_id(cam_ts, cam_ids, signal_ts, signal_values):
+    """
+    Map every sample of the signal to the last camera id logged at or before its timestamp (the first camera id for the samples logged before any camera id), and keep the first sample of every camera id
+    Samples logged at the same time as camera ids are paired with all of them, as the outer join of the dataframes does
+    :param cam_ts: a sorted numpy array of the camera id timestamps
+    :param cam_ids: a numpy array of the camera ids, in the order of cam_ts
+    :param signal_ts: a numpy array of the signal's timestamps
+    :param signal_values: a numpy array of the signal's samples
+    :return: a tuple of the camera ids (in time order) and the signal values aligned to them, as float numpy arrays
+    """
+    signal_ts, signal_values = sort_by_timestamps(signal_ts, signal_values)
+    valid = ~np.isnan(signal_values)
+    signal_ts = signal_ts[valid]
+    signal_values = signal_values[valid]
+
+    right = np.searchsorted(cam_ts, signal_ts, side="right")
+    exact = np.zeros(len(signal_ts), dtype=bool)
+    exact[right > 0] = cam_ts[right[right > 0] - 1] == signal_ts[right > 0]
+
+    # samples without a camera id at the same time take the previous one
+    before = ~exact
+    row_ts = [signal_ts[before]]
+    row_order = [np.flatnonzero(before)]
+    row_ids = [cam_ids[np.maximum(right[before] - 1, 0)]]
+    row_values = [signal_values[before]]
+
+    # samples with camera ids at the same time: the first sample of that time is paired with each of them
+    first_of_time = exact & np.concatenate(([True], signal_ts[1:] != signal_ts[:-1]))
+    if first_of_time.any():
+        left = np.searchsorted(cam_ts, signal_ts[first_of_time], side="left")
+        counts = right[first_of_time] - left
+        starts = np.repeat(left, counts)
+        cam_index = starts + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        row_ts.append(cam_ts[cam_index])
+        row_order.append(cam_index)
+        row_ids.append(cam_ids[cam_index])
+        row_values.append(np.repeat(signal_values[first_of_time], counts))
+
+    row_ts = np.concatenate(row_ts)
+    order = np.lexsort((np.concatenate(row_order), row_ts))
+    return first_occurrences(np.concatenate(row_ids)[order], np.concatenate(row_values)[order])
+
+
+def fill_on_cam_ids(all_ids, ids, values):
+    """
+    Spread the values of one data folder over all the camera ids, and fill the camera ids missing in this folder with the previous (or else the next) value
+    :param all_ids: a sorted numpy array of the camera ids of all data folders
+    :param ids: a numpy array of the camera ids of this data folder
+    :param values: a numpy array of the values on these camera ids
+    :return: a float numpy array of the values on all_ids
+    """
+    column = np.full(len(all_ids), np.nan)
+    if len(ids) == 0:
+        return column
+    column[np.searchsorted(all_ids, ids)] = values
+    known = np.flatnonzero(~np.isnan(column))
+    if len(known) == 0:
+        return column
+    previous = np.maximum.accumulate(np.where(np.isnan(column), 0, np.arange(len(column))))
+    previous[:known[0]] = known[0]
+    return column[previous]
+
+
+def remove_dup(dataframe, cam_id_name):
+    """
+    Drop rows that have duplicated camera id (keep the first duplicated camera id data)
+    :param dataframe: a pandas dataframe
+    :return: a pandas dataframe after removing duplicates
+    """
+    dataframe.drop_duplicates(subset=cam_id_name, inplace=True)
+    return dataframe
+
+
+# below is further data analysis and calculation methods
+
+def drop_zero_and_na(dataframe, camera_id_name):
+    """
+    Drop columns that include NaN or camera id is 0
+    :param dataframe: a pandas dataframe (after combining original dataframe with Reinjection dataframes)
+    :param camera_id_name: a string representing the name of the camera id's name in the data columns
+    :return: a pandas dataframe after dropping
+    """
+    new = dataframe.reset_index(drop=True)
+    new = new[new[camera_id_name] != 0]
+    new = new.dropna()
+    new = new.reset_index(drop=True)
+    return new
+
+
+def generate_stats(dataframe, test_name_list):
+    """
+    Generate the test data's mean and std data from the given dataframe
+    :param dataframe: the dataframe containing all the merged data
+    :param test_name_list: a list containing test data's names (it is used to detect whether test data exists for this signal)
+    :return: a new dataframe with mean and std added, and a boolean flag value of whether there is test data for
+    """
+    if len(test_name_list) > 0:
+        flag = True
+        dataframe["test_mean"] = dataframe[test_name_list].mean(axis=1)
+        dataframe["test_std"] = dataframe[test_name_list].std(axis=1)
+    else:
+        flag = False
+    return dataframe, flag
+
+
+def large_std_cam_id(dataframe, cam_id_name, percentile=0.95):
+    """
+    Pick out the camera ids that have too large std values (larger than some pre-set percentile lower bound)
+    :param dataframe: a pandas dataframe that has gone through merge_and_calculate operation
+    :param cam_id_name: a string representing the name of the cam id parameter
+    :param percentile: the percentile of the std lower bound
+    :return: a list containing numbers representing the camera ids of potential abnormal points, and a float number representing the lower bound of abnormal std
+    """
+    # set the default lower bound to 95% largest data std
+    std_lower_bound = dataframe["test_std"].describe((1-percentile, percentile))[str(int(percentile*100))+"%"]
+    filt = (dataframe["test_std"] >= std_lower_bound)
+    return list(dataframe[filt][cam_id_name].astype(int)), std_lower_bound
+
+
+def generate_stats_batch(merged_list, cam_id_name, percentile=0.95, max_cells=STATS_BATCH_MAX_CELLS):
+    """
+    Do generate_stats and large_std_cam_id for several signals at once: the test data of all signals are put on one shared camera id axis as a 3-D array (signal x camera id x test), and the test mean, std and std lower bound of all signals come from NaN-aware reductions of this array
+    :param merged_list: a list of the (merged dataframe, test_name_list) tuples generated by merge_one_type_data, one per signal
+    :param cam_id_name: a string representing the name of the camera id's name in the data columns
+    :param percentile: the percentile of the std lower bound
+    :param max_cells: the most values of the 3-D array, the signals are computed in as many smaller batches as needed (the results of a signal do not depend on the other signals of its batch)
+    :return: a list of tuples, one per signal: (the dataframe with mean and std added, the boolean flag of whether there is test data, the list of the camera ids of potential abnormal points, the lower bound of abnormal std)
+    the signals without test data get no mean and std columns, no abnormal camera id and NaN as the lower bound
+    """
+    if len(merged_list) == 0:
+        return []
+    cam_axis = np.unique(np.concatenate([np.asarray(df[cam_id_name].values, dtype=np.float64) for df, _ in merged_list]))
+    test_count = max(len(test_name_list) for _, test_name_list in merged_list)
+    signals_per_batch = max(max_cells // (len(cam_axis) * max(test_count, 1)), 1)
+    if signals_per_batch < len(merged_list):
+        results = []
+        for start in range(0, len(merged_list), signals_per_batch):
+            results.extend(generate_stats_batch(merged_list[start:start + signals_per_batch], cam_id_name, percentile, max_cells))
+        return results
+    values = np.full((len(merged_list), len(cam_axis), max(test_count, 1)), np.nan)
+    on_axis = np.zeros((len(merged_list), len(cam_axis)), dtype=bool)
+    rows = []
+    for s, (df, test_name_list) in enumerate(merged_list):
+        row = np.searchsorted(cam_axis, np.asarray(df[cam_id_name].values, dtype=np.float64))
+        on_axis[s, row] = True
+        if len(test_name_list) > 0:
+            values[s, row, :len(test_name_list)] = df[test_name_list].values
+        rows.append(row)
+
+    # the mean and std (ddof=1) of the available test values, as DataFrame.mean(axis=1) and DataFrame.std(axis=1) do
+    counts = np.sum(~np.isnan(values), axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.nansum(values, axis=2) / counts
+        squares = np.nansum((values - means[:, :, None]) ** 2, axis=2)
+        stds = np.sqrt(squares / (counts - 1))
+    means[counts == 0] = np.nan
+    stds[counts < 2] = np.nan
+    # the percentile of the std over each signal's own camera ids, with linear interpolation as describe does
+    stds_on_axis = np.where(on_axis, stds, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        lower_bounds = np.nanpercentile(stds_on_axis, percentile * 100, axis=1)
+
+    results = []
+    for s, (df, test_name_list) in enumerate(merged_list):
+        if len(test_name_list) == 0:
+            results.append((df, False, [], np.nan))
+            continue
+        row = rows[s]
+        df["test_mean"] = means[s, row]
+        df["test_std"] = stds[s, row]
+        filt = stds[s, row] >= lower_bounds[s]
+        results.append((df, True, list(df[cam_id_name].values[filt].astype(int)), lower_bounds[s]))
+    return results
+
+
+def convert_to_interval(id_array):
+    """
+    Convert some consecutive timestamps' id to some intervals for easier retrieval
+    :param id_array: a list containing all the camera ids of outliers
+    :return: a list of strings representing the abnormal camera id ranges
+    """
+    interval = []
+    if len(id_array) == 0:
+        return interval
+    current_interval = [id_array[0]]
+    digit = id_array[0] // 100
+    for i in range(1, len(id_array)):
+        now = id_array[i]
+        if now // 100 == digit:
+            current_interval.append(now)
+        elif now // 100 == digit + 1:
+            current_interval.append(now)
+            digit += 1
+        else:
+            if current_interval[-1] - current_interval[0] >= 5:
+                interval.append(str(current_interval[0]) + "-" + str(current_interval[-1]))
+            current_interval = [now]
+            digit = now // 100
+    if current_interval[-1] - current_interval[0] >= 5:
+        interval.append(str(current_interval[0]) + "-" + str(current_interval[-1]))
+    return interval
+
+
+if __name__ == "__main__":
+    path = "C:\\Users\\Z0050908\\Desktop\\hil_test\\"
+    dbc_path = "C:\\Users\\Z0050908\\Downloads\\"
+    signal = "C:\\Users\\Z0050908\\Desktop\\FR-IFC-Private CAN_Checklist.xlsx"
+
+    e, v, cam = generate_wanted_signal(signal)
+
+    dbcs = {"Ch3": ['GWM V71 CAN 01C.dbc'], "Ch4": ['FR-IFC-Private CAN.dbc'], "Ch5": ['GWM V71 CAN 01C.dbc'], "Ch6": ['FR-IFC-Private CAN.dbc']}
+    A, B, C = load_total_matrix(dbc_path, dbcs)
+
+    dic = search_dir(path)
+    print(dic)
+    data_dic = load_mf4_to_dic_for_all(dic, A, e+v)
+
+    df, tn = merge_one_type_data(data_dic, 'IFC_obj01_Dx', cam)
+    # val: IFC_obj01_Dx
+    # enum: BridgeDistance
+    # none: FS_Out_Of_Calib
+    df_stat, changed = generate_stats(df, tn)
+
+    print(df_stat.head(50))
+    print(df_stat.tail(50))
+
+    abnormal, lower = large_std_cam_id(df_stat, cam, 0.95)
+    plot_data_and_stats_with_outliers(df_stat, dbc_path, changed, "IFC_obj01_Dx", cam, lower)
+    # plot_data_and_stats(df_stat, dbc_path, changed, "IFC_obj01_Dx", cam)
@@ -0,0 +1,157 @@
+"""
+Function: decode the raw CAN frames of mf4 files with numpy, every message id is decoded in one batch of bit operations using the signal definitions of the DBC files (an alternative to asammdf extract_can_logging)
+Date: 10/17/2026
+"""
+
+import numpy as np
+
+# the 29 bits of a CAN identifier, masking clears the bit flagging an extended frame (0x80000000) in the DBC files and in the logged frame ids
+EXTENDED_ID_MASK = 0x1FFFFFFF
+
+
+def extract_raw_values(payload, start_bit, length_bit, byte_order, value_type):
+    """
+    Extract the raw integer values of one signal from the payloads of many frames
+    :param payload: a uint8 array of shape (frames, bytes)
+    :param start_bit: the start bit of the signal as written in the DBC file (the least significant bit for Intel, the most significant bit for Motorola)
+    :param length_bit: the bit length of the signal (at most 64, within 8 consecutive bytes)
+    :param byte_order: 1 for little endian (Intel), 0 for big endian (Motorola)
+    :param value_type: 0 for unsigned, 1 for signed (two's complement)
+    :return: a numpy integer array (the smallest standard size holding length_bit bits)
+    """
+    frame_count, byte_count = payload.shape
+    if byte_count < 8:
+        payload = np.hstack([payload, np.zeros((frame_count, 8 - byte_count), dtype=np.uint8)])
+        byte_count = 8
+    # the signal is read from a window of 8 bytes, read as one 64 bits integer
+    window_start = min(start_bit // 8, byte_count - 8)
+    window = np.ascontiguousarray(payload[:, window_start:window_start + 8])
+    if byte_order == 1:
+        shift = start_bit - window_start * 8
+        values = window.view('<u8').ravel()
+    else:
+        # in the big endian window, bit i of byte b is at position (7 - b) * 8 + i, the start bit is the most significant bit
+        msb = (7 - (start_bit // 8 - window_start)) * 8 + start_bit % 8
+        shift = msb - length_bit + 1
+        values = window.view('>u8').ravel()
+    if shift < 0 or shift + length_bit > 64:
+        raise ValueError('Signal with start bit ' + str(start_bit) + ' and length ' + str(length_bit) + ' does not fit in 8 consecutive bytes')
+    if length_bit < 64:
+        values = (values >> np.uint64(shift)) & np.uint64((1 << length_bit) - 1)
+
+    size = 1
+    while size * 8 < length_bit:
+        size *= 2
+    if value_type == 1:
+        signed = values.astype(np.int64)
+        if length_bit < 64:
+            signed = np.where(signed >= (1 << (length_bit - 1)), signed - (1 << length_bit), signed)
+        return signed.astype('i' + str(size))
+    return values.astype('u' + str(size))
+
+
+def physical_values(raw, factor, offset):
+    """
+    :param raw: the raw values generated by extract_raw_values
+    :param factor: the factor of the signal
+    :param offset: the offset of the signal
+    :return: the raw values as they are if the factor is 1 and the offset 0 (as asammdf does), else the scaled float values
+    """
+    if factor == 1 and offset == 0:
+        return raw
+    values = raw * float(factor)
+    if offset:
+        values += float(offset)
+    return values
+
+
+def decode_message_frames(message, payload, timestamps, wanted_signals=None):
+    """
+    Decode all the frames of one message id at once
+    Multiplexed signals only keep the frames where the multiplexor equals their multiplexer value. SIG_VALTYPE_ float signals are decoded as integers, like asammdf does
+    :param message: a message dictionary generated by load_dbc ('dlc' and 'signals' are used)
+    :param payload: a uint8 array of shape (frames, bytes) of the frames of this message
+    :param timestamps: a numpy array of the timestamps of the frames
+    :param wanted_signals: a set of the signal names to decode (None to decode every signal)
+    :return: a dictionary with keys as the signal names, values as tuples of (timestamps, samples), signals without any frame are left out
+    """
+    decoded = {}
+    if len(timestamps) == 0 or message['dlc'] > payload.shape[1] or message['dlc'] == 0:
+        return decoded
+    signals = message['signals']
+    multiplexor = None
+    for signal in signals.values():
+        if signal['multi_type'] == 'M':
+            multiplexor = signal
+            break
+    mux_values = None
+    if multiplexor is not None:
+        # the multiplexer index of a signal (multi_type) is a raw value, so the factor and offset of the multiplexor are not applied
+        mux_values = extract_raw_values(payload, multiplexor['start_bit'], multiplexor['length_bit'],
+                                        multiplexor['byte_order'], multiplexor['value_type'])
+    for name, signal in signals.items():
+        if wanted_signals is not None and name not in wanted_signals:
+            continue
+        if signal['multi_type'] in ('N', 'M') or mux_values is None:
+            rows_payload, rows_timestamps = payload, timestamps
+        else:
+            rows = mux_values == signal['multi_type']
+            if not rows.any():
+                continue
+            rows_payload, rows_timestamps = payload[rows], timestamps[rows]
+        raw = extract_raw_values(rows_payload, signal['start_bit'], signal['length_bit'], signal['byte_order'], signal['value_type'])
+        decoded[name] = (rows_timestamps, physical_values(raw, signal['factor'], signal['offset']))
+    return decoded
+
+
+def read_can_frames(mdffile, group_index, bus=None):
+    """
+    Read the raw CAN frames of one CAN bus logging channel group
+    :param mdffile: an opened asammdf MDF object
+    :param group_index: the index of the channel group (from the bus_logging_map of the MDF)
+    :param bus: the CAN bus channel number to keep (None to keep the frames of every bus in the group)
+    :return: a tuple of numpy arrays: the timestamps, the frame ids (without the extended id flag) and the uint8 payloads of shape (frames, bytes)
+    """
+    ids = mdffile.get('CAN_DataFrame.ID', group=group_index)
+    timestamps = ids.timestamps
+    frame_ids = ids.samples.astype('<u4') & EXTENDED_ID_MASK
+    payload = mdffile.get('CAN_DataFrame.DataBytes', group=group_index, samples_only=True)[0]
+    if bus is not None:
+        buses = mdffile.get('CAN_DataFrame.BusChannel', group=group_index, samples_only=True)[0]
+        keep = buses == bus
+        if not keep.all():
+            timestamps, frame_ids, payload = timestamps[keep], frame_ids[keep], payload[keep]
+    return timestamps, frame_ids, payload
+
+
+def decode_can_frames(timestamps, frame_ids, payload, channel_messages, wanted_signals):
+    """
+    Decode the wanted signals from raw CAN frames, the frames of every message id carrying a wanted signal are gathered once and decoded together
+    :param timestamps: the timestamps generated by read_can_frames
+    :param frame_ids: the frame ids generated by read_can_frames
+    :param payload: the payloads generated by read_can_frames
+    :param channel_messages: the messages of the channel, generated by load_total_matrix
+    :param wanted_signals: a list containing wanted signals
+    :return: a dictionary with keys as the decoded signal names, values as tuples of (timestamps, samples)
+    """
+    wanted = set(wanted_signals)
+    messages = {}
+    for msg_id, message in channel_messages.items():
+        if not wanted.isdisjoint(message['signals']):
+            messages.setdefault(msg_id & EXTENDED_ID_MASK, message)
+    decoded = {}
+    if len(messages) == 0 or len(frame_ids) == 0:
+        return decoded
+    # one stable sort groups the frames by id and keeps every group in time order
+    order = np.argsort(frame_ids, kind='stable')
+    sorted_ids = frame_ids[order]
+    unique_ids, starts = np.unique(sorted_ids, return_index=True)
+    ends = np.append(starts[1:], len(sorted_ids))
+    for msg_id, start, end in zip(unique_ids.tolist(), starts, ends):
+        message = messages.get(msg_id)
+        if message is None:
+            continue
+        rows = order[start:end]
+        for name, value in decode_message_frames(message, payload[rows], timestamps[rows], wanted).items():
+            decoded.setdefault(name, value)
+    return decoded
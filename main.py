@@ -1,45 +1,504 @@
-from data_operation import *
-from ppt import *
-from infra import read_config
-
-conf = read_config("conf.yaml")
-
-data_dir = conf["path"]["path_data_dir"]
-dbc_dir = conf["path"]["path_dbc_dir"]
-signal_excel = conf["path"]["path_signal_excel"]
-folder_path = conf["path"]["path_to_create_folder"]
-ppt_path = conf["path"]["path_to_create_ppt"]
-
-dbcs = conf["dbc_channels"]
-
-signal_enum, signal_val, cam_id_name = generate_wanted_signal(signal_excel)
-total_fpath, total_msg, total_signal = load_total_matrix(dbc_dir, dbcs)
-
-folder_name = data_dir.strip("\\").split("\\")[-1] + "_HIL_Report"
-ppt_name = folder_name
-
-data_directory_dic = search_dir(data_dir)
-data_dic = load_mf4_to_dic_for_all(data_directory_dic, total_fpath, signal_enum + signal_val)
-
-figure_path = create_folder(folder_path, folder_name)
-
-abnormals = {}
-
-for i in signal_enum:
-    if i != cam_id_name:
-        print("Processing: " + i)
-        test_df, _ = merge_one_type_data(data_dic, i, cam_id_name)
-        plot_ori_and_test(test_df, figure_path, i, cam_id_name)
-for j in signal_val:
-    if j != cam_id_name:
-        print("Processing: " + j)
-        test_df, testcase_name_list = merge_one_type_data(data_dic, j, cam_id_name)
-        test_df_s, changed = generate_stats(test_df, testcase_name_list)
-
-        outlier_list, std_threshold = large_std_cam_id(test_df_s, cam_id_name, 0.95)
-        cam_id_interval = convert_to_interval(outlier_list)
-        abnormals[j] = cam_id_interval
-
-        plot_data_and_stats_with_outliers(test_df_s, figure_path, changed, j, cam_id_name, std_threshold)
-
-generate_ppt(figure_path, abnormals, ppt_path, ppt_name)
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from data_operation import *
+from ppt import *
+from infra import read_config
+from profiling import RunProfile
+from checkpoint import RunCheckpoint
+from pipeline import Pipeline, END
+
+# the stages of a staged run, in order
+REPORT_STAGES = ["load", "merge", "stats", "plot", "ppt"]
+
+
+def report_name(conf):
+    """
+    :param conf: the dictionary read from conf.yaml
+    :return: the name of the figure folder and the PPT file of the configured data folder
+    """
+    return conf["path"]["path_data_dir"].strip("\\").split("\\")[-1] + "_HIL_Report"
+
+
+def create_run_profile(conf):
+    """
+    :param conf: the dictionary read from conf.yaml
+    :return: a tuple of the RunProfile configured by the profiling section and the path of the run profile without extension
+    """
+    profiling = conf.get("profiling") or {}
+    output = profiling.get("output") or os.path.join(conf["path"]["path_to_create_ppt"], report_name(conf) + "_profile")
+    profile = RunProfile(profiling.get("enabled", False), profiling.get("trace_memory", False), profiling.get("cprofile_stage"), output)
+    return profile, output
+
+
+def prepare_report_loading(conf, profile=None, prune_dir=None):
+    """
+    Read the wanted signals and the DBC files, and prepare the loading of the MF4 files as configured
+    :param conf: the dictionary read from conf.yaml
+    :param profile: a RunProfile timing every stage (None for no timing)
+    :param prune_dir: the directory of the pruned DBC files when path_cache_dir is not set, deleted by the caller once the files are loaded (ex: a tempfile.TemporaryDirectory of the run)
+    :return: a tuple of the enumeration signals, the value signals, the camera id signal name, the data file paths generated by search_dir and the arguments of timed_load_mf4 after the file path
+    """
+    if profile is None:
+        profile = RunProfile(enabled=False)
+
+    data_dir = conf["path"]["path_data_dir"]
+    dbc_dir = conf["path"]["path_dbc_dir"]
+    signal_excel = conf["path"]["path_signal_excel"]
+    cache_dir = conf["path"].get("path_cache_dir")
+
+    dbcs = conf["dbc_channels"]
+    performance = conf.get("performance", {})
+    dbc_parser = performance.get("dbc_parser", "pyparsing")
+    prune_dbc = performance.get("prune_dbc", False)
+    frame_decoder = performance.get("frame_decoder", "asammdf")
+    if frame_decoder not in ("asammdf", "numpy"):
+        raise ValueError("Unknown frame decoder: " + str(frame_decoder) + ", expected asammdf or numpy")
+    compact_signals = performance.get("compact_signals", False)
+
+    with profile.stage("generate_wanted_signal"):
+        signal_enum, signal_val, cam_id_name = generate_wanted_signal(signal_excel)
+    with profile.stage("load_total_matrix"):
+        total_fpath, total_msg, total_signal = load_total_matrix(dbc_dir, dbcs, cache_dir, dbc_parser)
+
+    # every wanted signal is only read from the channels whose DBC files define it
+    signal_index = build_signal_index(total_msg, signal_enum + signal_val)
+
+    # the numpy decoder reads the raw CAN frames and decodes them with the parsed DBC messages
+    decoder_messages = total_msg if frame_decoder == "numpy" else None
+
+    # only the messages carrying wanted signals are loaded and decoded from the pruned DBC files (the numpy decoder only decodes them anyway)
+    decode_dbcs = None
+    if prune_dbc and decoder_messages is None:
+        with profile.stage("prune_channel_dbcs"):
+            decode_dbcs = prune_channel_dbcs(total_fpath, total_msg, signal_enum + signal_val, os.path.join(cache_dir, "pruned_dbc") if cache_dir else prune_dir)
+
+    load_args = (signal_enum + signal_val, total_fpath, cache_dir, compact_signals, decode_dbcs, signal_index, decoder_messages)
+    return signal_enum, signal_val, cam_id_name, search_dir(data_dir), load_args
+
+
+def load_report_data(conf, profile=None):
+    """
+    Read the wanted signals and the DBC files, and load the wanted signals of every MF4 file of the data folder as configured
+    :param conf: the dictionary read from conf.yaml
+    :param profile: a RunProfile timing every stage (None for no timing)
+    :return: a tuple of the enumeration signals, the value signals, the camera id signal name and the data dictionary generated by load_mf4_to_dic_for_all
+    """
+    if profile is None:
+        profile = RunProfile(enabled=False)
+    with tempfile.TemporaryDirectory(prefix="pruned_dbc_") as prune_dir:
+        signal_enum, signal_val, cam_id_name, data_directory_dic, load_args = prepare_report_loading(conf, profile, prune_dir)
+        wanted, dbcs, cache_dir, compact_signals, decode_dbcs, signal_index, decoder_messages = load_args
+        load_workers = conf.get("performance", {}).get("load_workers", 1)
+        with profile.stage("load_mf4_to_dic_for_all"):
+            data_dic = load_mf4_to_dic_for_all(data_directory_dic, dbcs, wanted, load_workers, cache_dir, compact_signals, profile, decode_dbcs, signal_index, decoder_messages)
+    return signal_enum, signal_val, cam_id_name, data_dic
+
+
+def run_report(conf, profile=None):
+    """
+    Load the data folder, merge and analyze every wanted signal, render the figures and generate the PPT report as configured
+    :param conf: the dictionary read from conf.yaml
+    :param profile: a RunProfile timing every stage (None for no timing)
+    :return: a dictionary with keys as the value signals, values as the lists of abnormal camera id intervals
+    """
+    if profile is None:
+        profile = RunProfile(enabled=False)
+
+    performance = conf.get("performance", {})
+    if performance.get("pipeline", False):
+        return run_pipelined_report(conf, profile)
+
+    folder_path = conf["path"]["path_to_create_folder"]
+    ppt_path = conf["path"]["path_to_create_ppt"]
+
+    merge_engine = performance.get("merge_engine", "pandas")
+    stats_batch_size = performance.get("stats_batch_size", 0)
+    plot_workers = performance.get("plot_workers", 1)
+    plot_downsample_width = performance.get("plot_downsample_width", 0)
+    plot_templates = performance.get("plot_templates", False)
+    figures_in_memory = performance.get("figures_in_memory", False)
+    save_figure_files = performance.get("save_figure_files", True)
+    ppt_image_dpi = performance.get("ppt_image_dpi")
+    ppt_max_deck_mb = performance.get("ppt_max_deck_mb")
+
+    folder_name = report_name(conf)
+    ppt_name = folder_name
+
+    signal_enum, signal_val, cam_id_name, data_dic = load_report_data(conf, profile)
+
+    # the camera id timelines never change between signals, build them once for the numpy merge engine
+    with profile.stage("build_cam_id_timelines"):
+        cam_timelines = build_cam_id_timelines(data_dic, cam_id_name) if merge_engine == "numpy" else None
+
+    figure_path = create_folder(folder_path, folder_name)
+
+    abnormals = {}
+
+    # with the figures in memory, every figure becomes a slide as soon as it is rendered
+    report = ReportBuilder(ppt_path, ppt_name, abnormals, ppt_image_dpi, ppt_max_deck_mb) if figures_in_memory else None
+
+    # the figures are rendered by plot_workers processes while the next signals are merged
+    # with several plot workers the "plot" stages only measure handing the figures over, the rendering is in "process_signals"
+    with profile.stage("process_signals"), PlotRenderer(plot_workers, plot_templates, figures_in_memory, save_figure_files, report.add_record if report else None) as renderer:
+        for i in signal_enum:
+            if i != cam_id_name:
+                print("Processing: " + i)
+                with profile.stage("merge", i):
+                    test_df, _ = merge_one_type_data(data_dic, i, cam_id_name, merge_engine, cam_timelines)
+                with profile.stage("plot", i):
+                    renderer.submit(make_plot_job("OriTestFig", test_df, figure_path, i, cam_id_name, downsample_width=plot_downsample_width))
+        if stats_batch_size > 0:
+            # the statistics of stats_batch_size signals are computed together, the memory of the 3-D array grows with the batch size
+            value_signals = [j for j in signal_val if j != cam_id_name]
+            for start in range(0, len(value_signals), stats_batch_size):
+                batch = value_signals[start:start + stats_batch_size]
+                merged_list = []
+                for j in batch:
+                    print("Processing: " + j)
+                    with profile.stage("merge", j):
+                        merged_list.append(merge_one_type_data(data_dic, j, cam_id_name, merge_engine, cam_timelines))
+                with profile.stage("stats", str(len(batch)) + " signals from " + batch[0]):
+                    stats = generate_stats_batch(merged_list, cam_id_name, 0.95)
+                for j, (test_df_s, changed, outlier_list, std_threshold) in zip(batch, stats):
+                    with profile.stage("interval", j):
+                        abnormals[j] = convert_to_interval(outlier_list)
+                    with profile.stage("plot", j):
+                        renderer.submit(make_plot_job("StatsAbnormalFig", test_df_s, figure_path, j, cam_id_name, changed, std_threshold, plot_downsample_width))
+        else:
+            for j in signal_val:
+                if j != cam_id_name:
+                    print("Processing: " + j)
+                    with profile.stage("merge", j):
+                        test_df, testcase_name_list = merge_one_type_data(data_dic, j, cam_id_name, merge_engine, cam_timelines)
+                    with profile.stage("stats", j):
+                        test_df_s, changed = generate_stats(test_df, testcase_name_list)
+                        outlier_list, std_threshold = large_std_cam_id(test_df_s, cam_id_name, 0.95)
+
+                    with profile.stage("interval", j):
+                        cam_id_interval = convert_to_interval(outlier_list)
+                    abnormals[j] = cam_id_interval
+
+                    with profile.stage("plot", j):
+                        renderer.submit(make_plot_job("StatsAbnormalFig", test_df_s, figure_path, j, cam_id_name, changed, std_threshold, plot_downsample_width))
+
+    with profile.stage("generate_ppt"):
+        if report is not None:
+            # the slides follow the signal order, the figures are not read from the folder again
+            report.close()
+        else:
+            generate_ppt(figure_path, abnormals, ppt_path, ppt_name)
+    return abnormals
+
+
+def run_pipelined_report(conf, profile=None):
+    """
+    Generate the same report as run_report with the stages running at the same time as threads connected by bounded queues:
+    load (the MF4 files, by load_workers processes) -> merge (the camera id timeline of every data folder as soon as it is loaded, then every signal) -> stats -> render (by plot_workers processes) -> report (every figure becomes a slide as soon as it is rendered)
+    A signal is merged from all the data folders, so the merges start once the last file is loaded; the rendering and the slides overlap with the merges and the statistics
+    The utilization of every stage and the depth of every queue are printed at the end, and recorded in the profile as "pipeline_<stage>" stages (the busy time)
+    :param conf: the dictionary read from conf.yaml
+    :param profile: a RunProfile timing every stage (None for no timing)
+    :return: a dictionary with keys as the value signals, values as the lists of abnormal camera id intervals
+    """
+    if profile is None:
+        profile = RunProfile(enabled=False)
+
+    performance = conf.get("performance", {})
+    load_workers = performance.get("load_workers", 1)
+    merge_engine = performance.get("merge_engine", "pandas")
+    stats_batch_size = performance.get("stats_batch_size", 0)
+    plot_downsample_width = performance.get("plot_downsample_width", 0)
+    queue_size = performance.get("pipeline_queue_size", 8)
+
+    # the pruned DBC files of a run without path_cache_dir are deleted once the load stage has finished
+    prune_dir = tempfile.TemporaryDirectory(prefix="pruned_dbc_")
+    signal_enum, signal_val, cam_id_name, data_directory_dic, load_args = prepare_report_loading(conf, profile, prune_dir.name)
+    figure_path = create_folder(conf["path"]["path_to_create_folder"], report_name(conf))
+    abnormals = {}
+
+    pipeline = Pipeline()
+    loaded = pipeline.queue("loaded", queue_size)
+    merged = pipeline.queue("merged", queue_size)
+    jobs = pipeline.queue("plot_jobs", queue_size)
+    figures = pipeline.queue("figures", queue_size)
+
+    def load(ctx):
+        tasks = load_tasks(data_directory_dic)
+        try:
+            if load_workers > 1:
+                with ProcessPoolExecutor(max_workers=load_workers) as executor:
+                    futures = {executor.submit(timed_load_mf4, p, *load_args): (k, idx, p, size) for k, idx, p, size in tasks}
+                    for future in as_completed(futures):
+                        k, idx, p, size = futures[future]
+                        data, elapsed, cpu_elapsed = future.result()
+                        profile.add_record("loadMF4data2Dict", p, elapsed, cpu_elapsed)
+                        print_throughput(os.path.split(p)[-1], 1, size, elapsed)
+                        ctx.put(loaded, (k, idx, data))
+            else:
+                for k, idx, p, size in tasks:
+                    data, elapsed, cpu_elapsed = timed_load_mf4(p, *load_args)
+                    profile.add_record("loadMF4data2Dict", p, elapsed, cpu_elapsed)
+                    print_throughput(os.path.split(p)[-1], 1, size, elapsed)
+                    ctx.put(loaded, (k, idx, data))
+        finally:
+            prune_dir.cleanup()
+        ctx.put(loaded, END)
+
+    def merge(ctx):
+        data_dic = {k: [None] * len(data_directory_dic[k]) for k in data_directory_dic}
+        remaining = {k: len(data_directory_dic[k]) for k in data_directory_dic}
+        cam_timelines = {} if merge_engine == "numpy" else None
+        while True:
+            item = ctx.get(loaded)
+            if item is END:
+                break
+            k, idx, data = item
+            data_dic[k][idx] = data
+            remaining[k] -= 1
+            if remaining[k] == 0 and cam_timelines is not None:
+                # the timeline of a data folder is built while the other folders are still loading
+                cam_timelines.update(build_cam_id_timelines({k: data_dic[k]}, cam_id_name))
+        for kind, signals in (("OriTestFig", signal_enum), ("StatsAbnormalFig", signal_val)):
+            for signal in signals:
+                if signal != cam_id_name:
+                    print("Processing: " + signal)
+                    ctx.put(merged, (kind, signal, merge_one_type_data(data_dic, signal, cam_id_name, merge_engine, cam_timelines)))
+        ctx.put(merged, END)
+
+    def analyze(batch):
+        if stats_batch_size > 0:
+            stats = generate_stats_batch([merged_data for _, merged_data in batch], cam_id_name, 0.95)
+        else:
+            stats = []
+            for _, (test_df, testcase_name_list) in batch:
+                test_df_s, changed = generate_stats(test_df, testcase_name_list)
+                stats.append((test_df_s, changed) + tuple(large_std_cam_id(test_df_s, cam_id_name, 0.95)))
+        for (j, _), (test_df_s, changed, outlier_list, std_threshold) in zip(batch, stats):
+            # the intervals are known before the figure reaches the report
+            abnormals[j] = convert_to_interval(outlier_list)
+            yield make_plot_job("StatsAbnormalFig", test_df_s, figure_path, j, cam_id_name, changed, std_threshold, plot_downsample_width)
+
+    def stats(ctx):
+        batch = []
+        while True:
+            item = ctx.get(merged)
+            if item is END:
+                break
+            kind, signal, (test_df, testcase_name_list) = item
+            if kind == "OriTestFig":
+                ctx.put(jobs, make_plot_job(kind, test_df, figure_path, signal, cam_id_name, downsample_width=plot_downsample_width))
+                continue
+            batch.append((signal, (test_df, testcase_name_list)))
+            if len(batch) >= max(stats_batch_size, 1):
+                for job in analyze(batch):
+                    ctx.put(jobs, job)
+                batch = []
+        for job in analyze(batch):
+            ctx.put(jobs, job)
+        ctx.put(jobs, END)
+
+    def render(ctx):
+        with PlotRenderer(performance.get("plot_workers", 1), performance.get("plot_templates", False), True,
+                          performance.get("save_figure_files", True), lambda record: ctx.put(figures, record)) as renderer:
+            while True:
+                job = ctx.get(jobs)
+                if job is END:
+                    break
+                renderer.submit(job)
+        ctx.put(figures, END)
+
+    def report(ctx):
+        with ReportBuilder(conf["path"]["path_to_create_ppt"], report_name(conf), abnormals, performance.get("ppt_image_dpi"), performance.get("ppt_max_deck_mb")) as builder:
+            while True:
+                record = ctx.get(figures)
+                if record is END:
+                    break
+                builder.add_record(record)
+
+    for name, func in (("load", load), ("merge", merge), ("stats", stats), ("render", render), ("report", report)):
+        pipeline.stage(name, func)
+    with profile.stage("pipeline"):
+        pipeline.run()
+    pipeline.print_report()
+    for name, context in pipeline.stages.items():
+        profile.add_record("pipeline_" + name, None, context.busy_s())
+    return abnormals
+
+
+def report_figures(signal_enum, signal_val, cam_id_name):
+    """
+    :param signal_enum: the enumeration signals generated by generate_wanted_signal
+    :param signal_val: the value signals generated by generate_wanted_signal
+    :param cam_id_name: the camera id signal name
+    :return: a list of tuples of (signal name, plot kind), the figures of the report in the order of the slides
+    """
+    return [(i, "OriTestFig") for i in signal_enum if i != cam_id_name] + [(j, "StatsAbnormalFig") for j in signal_val if j != cam_id_name]
+
+
+def run_inputs(conf):
+    """
+    :param conf: the dictionary read from conf.yaml
+    :return: the part of the configuration the loaded data depends on, saved by the load stage of a staged run
+    """
+    return {"path": conf["path"], "dbc_channels": conf["dbc_channels"]}
+
+
+def stage_load(conf, checkpoint, profile):
+    """
+    Load the wanted signals of every MF4 file, and save the data, the signal lists and the run_inputs of the configuration
+    """
+    signal_enum, signal_val, cam_id_name, data_dic = load_report_data(conf, profile)
+    # the data is saved apart from the signal lists, so that the later stages only read it if they still have signals to merge
+    checkpoint.save("load", "data", data_dic)
+    checkpoint.save("load", "signals", (signal_enum, signal_val, cam_id_name))
+    checkpoint.save("load", "conf", run_inputs(conf))
+
+
+def stage_merge(conf, checkpoint, profile):
+    """
+    Merge every signal of the loaded data on the camera id, and save the merged dataframe of every signal
+    """
+    signal_enum, signal_val, cam_id_name = checkpoint.load("load", "signals")
+    merge_engine = conf.get("performance", {}).get("merge_engine", "pandas")
+    signals = [s for s in dict.fromkeys(signal_enum + signal_val) if s != cam_id_name and not checkpoint.has("merge", s)]
+    if len(signals) == 0:
+        return
+    data_dic = checkpoint.load("load", "data")
+    with profile.stage("build_cam_id_timelines"):
+        cam_timelines = build_cam_id_timelines(data_dic, cam_id_name) if merge_engine == "numpy" else None
+    for s in signals:
+        print("Merging: " + s)
+        with profile.stage("merge", s):
+            checkpoint.save("merge", s, merge_one_type_data(data_dic, s, cam_id_name, merge_engine, cam_timelines))
+
+
+def stage_stats(conf, checkpoint, profile):
+    """
+    Compute the test mean and std and the abnormal camera id intervals of every value signal, and save them per signal
+    """
+    signal_enum, signal_val, cam_id_name = checkpoint.load("load", "signals")
+    stats_batch_size = conf.get("performance", {}).get("stats_batch_size", 0)
+    signals = [j for j in signal_val if j != cam_id_name and not checkpoint.has("stats", j)]
+    # every saved item is (the dataframe with mean and std, whether there is test data, the abnormal camera ids, the std lower bound, the abnormal camera id intervals)
+    if stats_batch_size > 0:
+        for start in range(0, len(signals), stats_batch_size):
+            batch = signals[start:start + stats_batch_size]
+            merged_list = [checkpoint.load("merge", j) for j in batch]
+            with profile.stage("stats", str(len(batch)) + " signals from " + batch[0]):
+                stats = generate_stats_batch(merged_list, cam_id_name, 0.95)
+            for j, (test_df_s, changed, outlier_list, std_threshold) in zip(batch, stats):
+                checkpoint.save("stats", j, (test_df_s, changed, outlier_list, std_threshold, convert_to_interval(outlier_list)))
+    else:
+        for j in signals:
+            print("Analyzing: " + j)
+            test_df, testcase_name_list = checkpoint.load("merge", j)
+            with profile.stage("stats", j):
+                test_df_s, changed = generate_stats(test_df, testcase_name_list)
+                outlier_list, std_threshold = large_std_cam_id(test_df_s, cam_id_name, 0.95)
+            checkpoint.save("stats", j, (test_df_s, changed, outlier_list, std_threshold, convert_to_interval(outlier_list)))
+
+
+def stage_plot(conf, checkpoint, profile):
+    """
+    Render the figure files of the report in the plot folder of the run directory, the figures already rendered are kept
+    """
+    signal_enum, signal_val, cam_id_name = checkpoint.load("load", "signals")
+    performance = conf.get("performance", {})
+    plot_downsample_width = performance.get("plot_downsample_width", 0)
+    figure_path = checkpoint.stage_dir("plot")
+    # the figures are the outputs of this stage, the ones already rendered by an interrupted run are kept
+    with PlotRenderer(performance.get("plot_workers", 1), performance.get("plot_templates", False)) as renderer:
+        for signal, kind in report_figures(signal_enum, signal_val, cam_id_name):
+            if os.path.exists(figure_file_path(figure_path, signal, kind)):
+                continue
+            print("Plotting: " + signal)
+            with profile.stage("plot", signal):
+                if kind == "OriTestFig":
+                    test_df, _ = checkpoint.load("merge", signal)
+                    renderer.submit(make_plot_job(kind, test_df, figure_path, signal, cam_id_name, downsample_width=plot_downsample_width))
+                else:
+                    test_df_s, changed, _, std_threshold, _ = checkpoint.load("stats", signal)
+                    renderer.submit(make_plot_job(kind, test_df_s, figure_path, signal, cam_id_name, changed, std_threshold, plot_downsample_width))
+
+
+def stage_ppt(conf, checkpoint, profile):
+    """
+    Build the PPT from the figure files of the plot stage, and return the abnormal camera id intervals
+    """
+    signal_enum, signal_val, cam_id_name = checkpoint.load("load", "signals")
+    performance = conf.get("performance", {})
+    figure_path = checkpoint.stage_dir("plot")
+    abnormals = {j: checkpoint.load("stats", j)[4] for j in signal_val if j != cam_id_name}
+    # the slides follow the signal order, the figure files are embedded as they are read
+    with ReportBuilder(conf["path"]["path_to_create_ppt"], report_name(conf), abnormals, performance.get("ppt_image_dpi"), performance.get("ppt_max_deck_mb")) as report:
+        for signal, kind in report_figures(signal_enum, signal_val, cam_id_name):
+            with open(figure_file_path(figure_path, signal, kind), "rb") as f:
+                report.add_figure(signal, kind, f.read())
+    return abnormals
+
+
+STAGE_FUNCTIONS = {"load": stage_load, "merge": stage_merge, "stats": stage_stats, "plot": stage_plot, "ppt": stage_ppt}
+
+
+def run_staged_report(conf, run_dir, from_stage=None, to_stage=None, profile=None):
+    """
+    Generate the same report as run_report through the stages of REPORT_STAGES: every stage saves its outputs in the run directory (merge, stats and plot per signal), the finished stages and signals are skipped, so an interrupted run resumes where it stopped
+    The figures are rendered as files in the plot folder of the run directory (figures_in_memory is not used)
+    :param conf: the dictionary read from conf.yaml
+    :param run_dir: the directory of the saved outputs
+    :param from_stage: the outputs of this stage and of the later stages are deleted first, so that they run again (ex: "plot" after changing the figures), None resumes the run
+    :param to_stage: the last stage to run (None runs up to the PPT)
+    :param profile: a RunProfile timing every stage (None for no timing)
+    :return: the dictionary of abnormal camera id intervals if the ppt stage ran, else None
+    """
+    if profile is None:
+        profile = RunProfile(enabled=False)
+    checkpoint = RunCheckpoint(run_dir)
+    # the saved outputs are only reused with the paths and DBC files they were generated from
+    if from_stage != "load" and checkpoint.has("load", "conf") and checkpoint.load("load", "conf") != run_inputs(conf):
+        raise ValueError("The paths or DBC files differ from the ones of the saved run in: " + run_dir + ", use --from load to load the data again")
+    if from_stage is not None:
+        for stage in REPORT_STAGES[REPORT_STAGES.index(from_stage):]:
+            checkpoint.reset(stage)
+
+    abnormals = None
+    last = REPORT_STAGES.index(to_stage) if to_stage is not None else len(REPORT_STAGES) - 1
+    for stage in REPORT_STAGES[:last + 1]:
+        if checkpoint.is_done(stage):
+            print("Stage " + stage + " already done in: " + run_dir)
+            continue
+        print("Running stage: " + stage)
+        with profile.stage("stage_" + stage):
+            abnormals = STAGE_FUNCTIONS[stage](conf, checkpoint, profile)
+        checkpoint.mark_done(stage)
+    return abnormals
+
+
+if __name__ == "__main__":
+    # the guard is needed because the worker processes of parallel loading re-import this module
+    parser = argparse.ArgumentParser(description="Generate the HIL report configured by conf.yaml")
+    parser.add_argument("--run-dir", help="run the report in stages saving their outputs in this directory (default: path_run_dir of conf.yaml, empty runs without stages)")
+    parser.add_argument("--from", dest="from_stage", choices=REPORT_STAGES, help="with a run directory, run this stage and the later ones again")
+    parser.add_argument("--to", dest="to_stage", choices=REPORT_STAGES, help="with a run directory, stop after this stage")
+    args = parser.parse_args()
+
+    config_start, config_cpu_start = time.perf_counter(), time.process_time()
+    conf = read_config("conf.yaml")
+    config_wall, config_cpu = time.perf_counter() - config_start, time.process_time() - config_cpu_start
+
+    # every stage of the run is timed, the run profile is written next to the PPT
+    profile, profile_output = create_run_profile(conf)
+    profile.add_record("read_config", None, config_wall, config_cpu)
+    run_dir = args.run_dir or conf["path"].get("path_run_dir")
+    if not run_dir and (args.from_stage or args.to_stage):
+        parser.error("--from and --to need a run directory (--run-dir or path_run_dir of conf.yaml)")
+    if run_dir:
+        run_staged_report(conf, run_dir, args.from_stage, args.to_stage, profile)
+    else:
+        run_report(conf, profile)
+
+    if profile.enabled:
+        profile.print_summary()
+        print("Run profile saved to: " + ", ".join(profile.write(profile_output)))
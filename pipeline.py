@@ -0,0 +1,157 @@
+"""
+Function: run the stages of a report as threads connected by bounded queues, so that the stages overlap (a stage works on the next item while the following stage works on the previous one), and measure where the stages wait
+Date: 10/17/2026
+"""
+
+import queue
+import threading
+import time
+
+# put on a queue by a stage when it has no more items
+END = object()
+
+
+class PipelineAborted(Exception):
+    """
+    Raised in the stages still running when another stage has failed
+    """
+
+
+class StageContext:
+    """
+    The handle of one running stage, its get and put measure the time the stage waits for its input and is blocked by a full output queue
+    Attributes:
+        name: the name of the stage
+        items_in: the number of items taken from the input queues
+        items_out: the number of items put on the output queues
+        wait_s: the seconds spent waiting for an input item
+        blocked_s: the seconds spent waiting for room in a full output queue
+        start: the perf_counter time the stage started
+        end: the perf_counter time the stage finished (None while running)
+    Methods:
+        get: take the next item of a queue (END once the previous stage has finished)
+        put: put an item on a queue, waiting for room if it is full
+        busy_s: the seconds the stage was working (neither waiting nor blocked)
+    """
+
+    def __init__(self, name, stop_event):
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.wait_s = 0.0
+        self.blocked_s = 0.0
+        self.start = time.perf_counter()
+        self.end = None
+        self._stop_event = stop_event
+
+    def get(self, source):
+        t0 = time.perf_counter()
+        try:
+            while True:
+                try:
+                    item = source.get(timeout=0.1)
+                    break
+                except queue.Empty:
+                    if self._stop_event.is_set():
+                        raise PipelineAborted(self.name)
+        finally:
+            self.wait_s += time.perf_counter() - t0
+        if item is not END:
+            self.items_in += 1
+        return item
+
+    def put(self, target, item):
+        t0 = time.perf_counter()
+        try:
+            while True:
+                try:
+                    target.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    if self._stop_event.is_set():
+                        raise PipelineAborted(self.name)
+        finally:
+            self.blocked_s += time.perf_counter() - t0
+        if item is not END:
+            self.items_out += 1
+
+    def busy_s(self):
+        lifetime = (self.end or time.perf_counter()) - self.start
+        return max(lifetime - self.wait_s - self.blocked_s, 0.0)
+
+
+class Pipeline:
+    """
+    A set of stages, each one running a function in its own thread, connected by bounded queues (the memory held between two stages is bounded by the queue size)
+    Attributes:
+        queues: a dictionary with keys as the queue names, values as queue.Queue objects
+        stages: a dictionary with keys as the stage names, values as their StageContext (once started)
+        depths: a dictionary with keys as the queue names, values as the lists of the sampled queue sizes
+        sample_interval: the seconds between two samples of the queue sizes
+    Methods:
+        queue: create a bounded queue
+        stage: add a stage, func(context, *args) is run in its own thread
+        run: start all stages, wait for them to finish, and raise the first error of a stage
+        print_report: print the utilization of every stage and the depth of every queue
+    """
+
+    def __init__(self, sample_interval=0.05):
+        self.queues = {}
+        self.stages = {}
+        self.depths = {}
+        self.sample_interval = sample_interval
+        self._stage_funcs = []
+        self._errors = []
+        self._stop_event = threading.Event()
+
+    def queue(self, name, maxsize):
+        self.queues[name] = queue.Queue(maxsize=max(maxsize, 1))
+        self.depths[name] = []
+        return self.queues[name]
+
+    def stage(self, name, func, *args):
+        self._stage_funcs.append((name, func, args))
+
+    def _run_stage(self, context, func, args):
+        try:
+            func(context, *args)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            self._errors.append(e)
+            self._stop_event.set()
+        finally:
+            context.end = time.perf_counter()
+
+    def _sample_depths(self, done_event):
+        while not done_event.wait(self.sample_interval):
+            for name, q in self.queues.items():
+                self.depths[name].append(q.qsize())
+
+    def run(self):
+        threads = []
+        for name, func, args in self._stage_funcs:
+            context = StageContext(name, self._stop_event)
+            self.stages[name] = context
+            threads.append(threading.Thread(target=self._run_stage, args=(context, func, args), name=name, daemon=True))
+        done_event = threading.Event()
+        sampler = threading.Thread(target=self._sample_depths, args=(done_event,), daemon=True)
+        sampler.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done_event.set()
+        sampler.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def print_report(self):
+        for name, context in self.stages.items():
+            lifetime = max((context.end or time.perf_counter()) - context.start, 1e-9)
+            print("Pipeline stage {}: {} in, {} out, busy {:.2f}s ({:.0f}%), waiting for input {:.2f}s, blocked on output {:.2f}s".format(
+                name, context.items_in, context.items_out, context.busy_s(), 100 * context.busy_s() / lifetime, context.wait_s, context.blocked_s))
+        for name, q in self.queues.items():
+            samples = self.depths[name] or [0]
+            print("Pipeline queue {}: capacity {}, mean depth {:.1f}, max depth {}, full {:.0f}% of the time".format(
+                name, q.maxsize, sum(samples) / len(samples), max(samples), 100 * sum(s >= q.maxsize for s in samples) / len(samples)))
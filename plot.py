@@ -1,153 +1,436 @@
-"""
-Function: plot data and stats and abnormal values
-Author: Xinran Wang
-Date: 09/02/2020
-"""
-
-import matplotlib.pyplot as plt
-import os
-
-plt.rc('font', family='Tahoma')
-
-
-def create_folder(directory, name='ReinjectionFigures'):
-    """
-    Create a folder in the assigned directory with assigned name
-    :param directory: the directory where the new folder will be located
-    :param name: the folder's name
-    :return: the absolute path of the folder (None if the folder already exists under the directory)
-    """
-    path = os.path.join(directory, name)
-    exist = os.path.exists(path)
-    if exist:
-        print("The folder: " + path + " already exists, cannot create new folder")
-        return
-    else:
-        os.mkdir(path)
-        print("Created a new folder in: " + directory)
-        return path
-
-
-def plot_ori_and_test(dataframe, save_path, to_analysis, cam_id_name):
-    """
-    Plot the original and test data based on the given data column and save the figure to the given path
-    :param dataframe: a pandas dataframe of the test data excel
-    :param save_path: a string representing the path where the output figure should locate in
-    :param to_analysis: a string corresponding to the column on the dataframe, indicating the data to look into
-    :param cam_id_name: a string representing the name of the cam id parameter
-    :return: None
-    """
-    fig = plt.figure(figsize=(20, 8), dpi=80)
-    ax = plt.subplot(111)
-    name_list = []
-    # colors = ["r", "g", "b", "y", "c"]
-    index_names = list(dataframe.columns)
-    for n in index_names:
-        if n.startswith(to_analysis):
-            name = n.split("_")[-1]
-            name_list.append(name)
-            plt.plot(dataframe[cam_id_name], dataframe[n])
-
-    plt.title("Comparison of Original and Test Data's " + to_analysis + " as a function of Camera ID", color='navy', fontsize=18, y=1.03)
-    plt.xlabel(cam_id_name, color='navy', fontsize=15)
-    plt.ylabel(to_analysis, color='navy', fontsize=15)
-    ax.legend(name_list, loc=1, fontsize=12)
-
-    square_bracket = to_analysis.find("[")
-    if square_bracket != -1:
-        file_name = to_analysis[:square_bracket]
-        plt.savefig(os.path.join(os.path.abspath(save_path), file_name + "-OriTestFig" + ".png"))
-    else:
-        plt.savefig(os.path.join(os.path.abspath(save_path), to_analysis + "-OriTestFig" + ".png"))
-    # plt.show()
-
-
-def plot_data_and_stats(dataframe, save_path, has_stats, to_analysis, cam_id_name):
-    """
-    Plot all the test data as well as the mean and std statistics in one figure
-    :param dataframe: a pandas dataframe of the test data excel
-    :param save_path: a string representing the path where the output figure should locate in
-    :param has_stats: a boolean value of whether this dataframe has statistics (if no test case exists, then no stats)
-    :param to_analysis: a string corresponding to the column on the dataframe, indicating the data to look into
-    :param cam_id_name: a string representing the name of the cam id parameter
-    :return: None
-    """
-    fig = plt.figure(figsize=(20, 8), dpi=80)
-    fig.suptitle("Comparison of Original and Test Data's " + to_analysis + " as a function of Camera ID, with mean and std presented", color='navy', fontsize=18, y=0.95)
-    ax_up = plt.subplot(211)
-    ax_down = plt.subplot(212)
-    name_list = []
-    colors = ["mediumseagreen", "orangered"]
-    index_names = list(dataframe.columns)
-    if has_stats:
-        stats_list = index_names[-2:]
-    else:
-        stats_list = []
-    for n in index_names:
-        if n.startswith(to_analysis):
-            name = n.split("_")[-1]
-            name_list.append(name)
-            ax_up.plot(dataframe[cam_id_name], dataframe[n])
-    for idx, m_s in enumerate(stats_list):
-        ax_down.plot(dataframe[cam_id_name], dataframe[m_s], color=colors[idx])
-
-    plt.xlabel(cam_id_name, color='navy', fontsize=15)
-    plt.ylabel(to_analysis, color='navy', fontsize=15, y=1.7)
-    ax_up.legend(name_list, loc=1, fontsize=12)
-    ax_down.legend(stats_list, loc=1, fontsize=12)
-
-    square_bracket = to_analysis.find("[")
-    if square_bracket != -1:
-        file_name = to_analysis[:square_bracket]
-        plt.savefig(os.path.join(os.path.abspath(save_path), file_name + "-StatsFig" + ".png"))
-    else:
-        plt.savefig(os.path.join(os.path.abspath(save_path), to_analysis + "-StatsFig" + ".png"))
-    # plt.show()
-
-
-def plot_data_and_stats_with_outliers(dataframe, save_path, has_stats, to_analysis, cam_id_name, threshold):
-    """
-    Plot all the test data as well as the mean, std statistics and the outlier line of data analysis in one figure
-    :param dataframe: a pandas dataframe of the test data excel
-    :param save_path: a string representing the path where the output figure should locate in
-    :param has_stats: a boolean value of whether this dataframe has statistics (if no test case exists, then no stats)
-    :param to_analysis: a string corresponding to the column on the dataframe, indicating the data to look into
-    :param cam_id_name: a string representing the name of the cam id parameter
-    :param threshold: the threshold indicating the outlier bottom line
-    :return: None
-    """
-    fig = plt.figure(figsize=(20, 8), dpi=80)
-    fig.suptitle("Changes in Test Data's " + to_analysis + " as a function of Camera ID, with mean and std presented", color='navy', fontsize=18, y=0.95)
-    ax_up = plt.subplot(211)
-    ax_down = plt.subplot(212)
-    name_list = []
-    colors = ["mediumseagreen", "orangered"]
-    index_names = list(dataframe.columns)
-    if has_stats:
-        stats_list = index_names[-2:]
-    else:
-        stats_list = []
-    for n in index_names:
-        if n.startswith(to_analysis):
-            name = n.split("_")[-1]
-            name_list.append(name)
-            ax_up.plot(dataframe[cam_id_name], dataframe[n])
-    for idx, m_s in enumerate(stats_list):
-        ax_down.plot(dataframe[cam_id_name], dataframe[m_s], color=colors[idx])
-    plt.xlabel(cam_id_name, color='navy', fontsize=15)
-    plt.ylabel(to_analysis, color='navy', fontsize=15, y=1.7)
-    plt.axhline(y=threshold, ls=":", c="purple")
-
-    x_axis_max = plt.axis()[1]
-    ax_down.text(x_axis_max+50, threshold, "Abnormal data:\nstd >= {:.5f}".format(threshold), fontsize=12, color='navy', bbox=dict(facecolor='white', alpha=0.5))
-    ax_up.legend(name_list, loc=1, fontsize=12)
-    ax_down.legend(stats_list, loc=1, fontsize=12)
-
-    square_bracket = to_analysis.find("[")
-    if square_bracket != -1:
-        file_name = to_analysis[:square_bracket]
-        plt.savefig(os.path.join(os.path.abspath(save_path), file_name + "-StatsAbnormalFig" + ".png"))
-    else:
-        plt.savefig(os.path.join(os.path.abspath(save_path), to_analysis + "-StatsAbnormalFig" + ".png"))
-    # plt.show()
-
+"""
+Function: plot data and stats and abnormal values
+Author: Xinran Wang
+Date: 09/02/2020
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import os
+import time
+from io import BytesIO
+from multiprocessing.util import Finalize
+from concurrent.futures import ProcessPoolExecutor
+
+plt.rc('font', family='Tahoma')
+
+FIGURE_SIZE = (20, 8)
+FIGURE_DPI = 80
+# the number of pixel columns of a figure, downsampling below this does not change what is drawn
+FIGURE_WIDTH_PIXELS = FIGURE_SIZE[0] * FIGURE_DPI
+
+
+def create_folder(directory, name='ReinjectionFigures'):
+    """
+    Create a folder in the assigned directory with assigned name
+    :param directory: the directory where the new folder will be located
+    :param name: the folder's name
+    :return: the absolute path of the folder (None if the folder already exists under the directory)
+    """
+    path = os.path.join(directory, name)
+    exist = os.path.exists(path)
+    if exist:
+        print("The folder: " + path + " already exists, cannot create new folder")
+        return
+    else:
+        os.mkdir(path)
+        print("Created a new folder in: " + directory)
+        return path
+
+
+def plot_ori_and_test(dataframe, save_path, to_analysis, cam_id_name):
+    """
+    Plot the original and test data based on the given data column and save the figure to the given path
+    :param dataframe: a pandas dataframe of the test data excel
+    :param save_path: a string representing the path where the output figure should locate in
+    :param to_analysis: a string corresponding to the column on the dataframe, indicating the data to look into
+    :param cam_id_name: a string representing the name of the cam id parameter
+    :return: None
+    """
+    render_plot_job(make_plot_job("OriTestFig", dataframe, save_path, to_analysis, cam_id_name))
+
+
+def plot_data_and_stats(dataframe, save_path, has_stats, to_analysis, cam_id_name):
+    """
+    Plot all the test data as well as the mean and std statistics in one figure
+    :param dataframe: a pandas dataframe of the test data excel
+    :param save_path: a string representing the path where the output figure should locate in
+    :param has_stats: a boolean value of whether this dataframe has statistics (if no test case exists, then no stats)
+    :param to_analysis: a string corresponding to the column on the dataframe, indicating the data to look into
+    :param cam_id_name: a string representing the name of the cam id parameter
+    :return: None
+    """
+    render_plot_job(make_plot_job("StatsFig", dataframe, save_path, to_analysis, cam_id_name, has_stats))
+
+
+def plot_data_and_stats_with_outliers(dataframe, save_path, has_stats, to_analysis, cam_id_name, threshold):
+    """
+    Plot all the test data as well as the mean, std statistics and the outlier line of data analysis in one figure
+    :param dataframe: a pandas dataframe of the test data excel
+    :param save_path: a string representing the path where the output figure should locate in
+    :param has_stats: a boolean value of whether this dataframe has statistics (if no test case exists, then no stats)
+    :param to_analysis: a string corresponding to the column on the dataframe, indicating the data to look into
+    :param cam_id_name: a string representing the name of the cam id parameter
+    :param threshold: the threshold indicating the outlier bottom line
+    :return: None
+    """
+    render_plot_job(make_plot_job("StatsAbnormalFig", dataframe, save_path, to_analysis, cam_id_name, has_stats, threshold))
+
+
+def figure_file_path(save_path, to_analysis, kind):
+    """
+    Generate the path of a figure file (the unit part in square brackets of the signal name is not used in the file name)
+    :param save_path: a string representing the path where the output figure should locate in
+    :param to_analysis: a string of the signal name
+    :param kind: the figure kind, used as the file name suffix ("OriTestFig", "StatsFig" or "StatsAbnormalFig")
+    :return: a string of the figure file's absolute path
+    """
+    square_bracket = to_analysis.find("[")
+    if square_bracket != -1:
+        return os.path.join(os.path.abspath(save_path), to_analysis[:square_bracket] + "-" + kind + ".png")
+    return os.path.join(os.path.abspath(save_path), to_analysis + "-" + kind + ".png")
+
+
+def downsample_min_max(x, values, bucket_count=FIGURE_WIDTH_PIXELS):
+    """
+    Downsample a line for plotting: the x range is split into bucket_count buckets (one per pixel column) and only the minimum and maximum of every bucket are kept, so that spikes and outliers stay visible
+    The first and last points are always kept, and a missing value (NaN) is kept in the buckets that have one so that the gaps of the line stay
+    :param x: a numpy array of the x values (lines whose x values are not sorted are not downsampled)
+    :param values: a numpy array of the y values
+    :param bucket_count: the number of buckets
+    :return: a tuple of the downsampled x and y numpy arrays (the input arrays if they are not longer than 2 points per bucket)
+    """
+    if len(x) <= 2 * bucket_count:
+        return x, values
+    x_float = np.asarray(x, dtype=np.float64)
+    if np.any(x_float[1:] < x_float[:-1]):
+        return x, values
+    values = np.asarray(values, dtype=np.float64)
+    span = x_float[-1] - x_float[0]
+    if span > 0:
+        buckets = np.minimum(((x_float - x_float[0]) / span * bucket_count).astype(np.int64), bucket_count - 1)
+    else:
+        buckets = np.zeros(len(x), dtype=np.int64)
+    # the buckets are consecutive ranges of the sorted points
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    counts = np.diff(np.append(starts, len(x)))
+
+    def first_per_bucket(position):
+        if len(position) == 0:
+            return position
+        return position[np.concatenate(([True], buckets[position][1:] != buckets[position][:-1]))]
+
+    missing = np.isnan(values)
+    keep = [[0, len(x) - 1]]
+    for reduce, fill in ((np.minimum, np.inf), (np.maximum, -np.inf)):
+        filled = np.where(missing, fill, values)
+        extreme = np.repeat(reduce.reduceat(filled, starts), counts)
+        # the first point of every bucket reaching the bucket's extreme (none for an all-NaN line)
+        keep.append(first_per_bucket(np.flatnonzero((filled == extreme) & ~missing)))
+    if missing.any():
+        keep.append(first_per_bucket(np.flatnonzero(missing)))
+    keep = np.unique(np.concatenate(keep))
+    return x[keep], values[keep]
+
+
+def make_plot_job(kind, dataframe, save_path, to_analysis, cam_id_name, has_stats=False, threshold=None, downsample_width=None):
+    """
+    Take the arrays to plot out of a merged dataframe, so that the figure can be rendered without the dataframe (ex: in another process)
+    :param kind: "OriTestFig" (as plot_ori_and_test), "StatsFig" (as plot_data_and_stats) or "StatsAbnormalFig" (as plot_data_and_stats_with_outliers)
+    :param dataframe: a pandas dataframe generated by merge_one_type_data (and generate_stats for the stats figures)
+    :param save_path: a string representing the path where the output figure should locate in
+    :param to_analysis: a string corresponding to the column on the dataframe, indicating the data to look into
+    :param cam_id_name: a string representing the name of the cam id parameter
+    :param has_stats: a boolean value of whether this dataframe has statistics
+    :param threshold: the threshold indicating the outlier bottom line (only for "StatsAbnormalFig")
+    :param downsample_width: downsample every line with downsample_min_max into this many buckets (None or 0 plots all the points), FIGURE_WIDTH_PIXELS keeps the figure's look
+    :return: a dictionary describing the figure, to be rendered by render_plot_job
+    """
+    index_names = list(dataframe.columns)
+    x = dataframe[cam_id_name].values
+    stats_list = index_names[-2:] if has_stats and kind != "OriTestFig" else []
+
+    def line(name, column):
+        if downsample_width:
+            return (name,) + downsample_min_max(x, dataframe[column].values, downsample_width)
+        return name, x, dataframe[column].values
+
+    return {"kind": kind,
+            "to_analysis": to_analysis,
+            "cam_id_name": cam_id_name,
+            "series": [line(n.split("_")[-1], n) for n in index_names if n.startswith(to_analysis)],
+            "stats": [line(m_s, m_s) for m_s in stats_list],
+            "threshold": threshold,
+            "file_path": figure_file_path(save_path, to_analysis, kind)}
+
+
+def save_job_figure(fig, job):
+    """
+    Save the figure of a plot job to its file, or encode it in memory for the jobs marked "in_memory" (ex: by PlotRenderer) so that the PPT can be built without reading the figure files again
+    The figure files are written to a temporary file first, so an interrupted run never leaves a truncated figure that a resumed run would take as done
+    :param fig: the matplotlib figure drawn for the job
+    :param job: a dictionary generated by make_plot_job, the in-memory figure is also written to "file_path" unless it is None
+    :return: the path of the figure file, or a tuple of (signal name, plot kind, PNG bytes) for the in-memory jobs
+    """
+    if not job.get("in_memory"):
+        tmp_path = job["file_path"] + ".tmp"
+        fig.savefig(tmp_path, format="png")
+        os.replace(tmp_path, job["file_path"])
+        return job["file_path"]
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    png = buffer.getvalue()
+    if job["file_path"] is not None:
+        tmp_path = job["file_path"] + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, job["file_path"])
+    return job["to_analysis"], job["kind"], png
+
+
+def render_plot_job(job):
+    """
+    Draw and save the figure described by a plot job, then close it so that the figures do not pile up in memory
+    :param job: a dictionary generated by make_plot_job
+    :return: the result of save_job_figure
+    """
+    to_analysis = job["to_analysis"]
+    cam_id_name = job["cam_id_name"]
+    fig = plt.figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+    try:
+        if job["kind"] == "OriTestFig":
+            ax = plt.subplot(111)
+            for _, x, values in job["series"]:
+                plt.plot(x, values)
+            plt.title("Comparison of Original and Test Data's " + to_analysis + " as a function of Camera ID", color='navy', fontsize=18, y=1.03)
+            plt.xlabel(cam_id_name, color='navy', fontsize=15)
+            plt.ylabel(to_analysis, color='navy', fontsize=15)
+            ax.legend([line[0] for line in job["series"]], loc=1, fontsize=12)
+        else:
+            if job["kind"] == "StatsFig":
+                title = "Comparison of Original and Test Data's " + to_analysis + " as a function of Camera ID, with mean and std presented"
+            else:
+                title = "Changes in Test Data's " + to_analysis + " as a function of Camera ID, with mean and std presented"
+            fig.suptitle(title, color='navy', fontsize=18, y=0.95)
+            ax_up = plt.subplot(211)
+            ax_down = plt.subplot(212)
+            colors = ["mediumseagreen", "orangered"]
+            for _, x, values in job["series"]:
+                ax_up.plot(x, values)
+            for idx, (_, x, values) in enumerate(job["stats"]):
+                ax_down.plot(x, values, color=colors[idx])
+            plt.xlabel(cam_id_name, color='navy', fontsize=15)
+            plt.ylabel(to_analysis, color='navy', fontsize=15, y=1.7)
+            if job["kind"] == "StatsAbnormalFig":
+                threshold = job["threshold"]
+                plt.axhline(y=threshold, ls=":", c="purple")
+                x_axis_max = plt.axis()[1]
+                ax_down.text(x_axis_max+50, threshold, "Abnormal data:\nstd >= {:.5f}".format(threshold), fontsize=12, color='navy', bbox=dict(facecolor='white', alpha=0.5))
+            ax_up.legend([line[0] for line in job["series"]], loc=1, fontsize=12)
+            ax_down.legend([line[0] for line in job["stats"]], loc=1, fontsize=12)
+        return save_job_figure(fig, job)
+    finally:
+        plt.close(fig)
+
+
+class FigureTemplate:
+    """
+    A figure of one plot kind built once (figure, axes, fonts, titles, legends, threshold line and text box) and reused for many signals: rendering a plot job only swaps the line data, the limits, the labels and the threshold before saving
+    Attributes:
+        kind: the plot kind of make_plot_job ("OriTestFig", "StatsFig" or "StatsAbnormalFig")
+        fig: the matplotlib figure
+    Methods:
+        render: draw a plot job of this kind and save it, same figure as render_plot_job
+        close: close the figure
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.fig = plt.figure(figsize=FIGURE_SIZE, dpi=FIGURE_DPI)
+        self.series_lines = []
+        self.stats_lines = []
+        if kind == "OriTestFig":
+            self.ax_series = self.fig.add_subplot(111)
+            self.ax_stats = None
+            self.title = self.ax_series.set_title("", color='navy', fontsize=18, y=1.03)
+            self.ax_label = self.ax_series
+        else:
+            self.title = self.fig.suptitle("", color='navy', fontsize=18, y=0.95)
+            self.ax_series = self.fig.add_subplot(211)
+            self.ax_stats = self.fig.add_subplot(212)
+            self.ax_label = self.ax_stats
+            colors = ["mediumseagreen", "orangered"]
+            self.stats_lines = [self.ax_stats.plot([], [], color=colors[idx])[0] for idx in range(2)]
+        self.threshold_line = None
+        self.threshold_text = None
+        if kind == "StatsAbnormalFig":
+            self.threshold_line = self.ax_stats.axhline(y=0, ls=":", c="purple")
+            self.threshold_text = self.ax_stats.text(0, 0, "", fontsize=12, color='navy', bbox=dict(facecolor='white', alpha=0.5))
+
+    def _set_lines(self, ax, lines, data):
+        # lines are added (in the color cycle order) when a signal has more of them than any earlier one, and hidden when it has fewer
+        while len(lines) < len(data):
+            lines.append(ax.plot([], [])[0])
+        for idx, line in enumerate(lines):
+            if idx < len(data):
+                line.set_data(data[idx][1], data[idx][2])
+                line.set_visible(True)
+            else:
+                line.set_data([], [])
+                line.set_visible(False)
+        ax.legend([line_data[0] for line_data in data], loc=1, fontsize=12)
+
+    def render(self, job):
+        to_analysis = job["to_analysis"]
+        if self.kind == "OriTestFig":
+            self.title.set_text("Comparison of Original and Test Data's " + to_analysis + " as a function of Camera ID")
+            self.ax_series.set_ylabel(to_analysis, color='navy', fontsize=15)
+        else:
+            if self.kind == "StatsFig":
+                self.title.set_text("Comparison of Original and Test Data's " + to_analysis + " as a function of Camera ID, with mean and std presented")
+            else:
+                self.title.set_text("Changes in Test Data's " + to_analysis + " as a function of Camera ID, with mean and std presented")
+            self.ax_stats.set_ylabel(to_analysis, color='navy', fontsize=15, y=1.7)
+        self.ax_label.set_xlabel(job["cam_id_name"], color='navy', fontsize=15)
+
+        self._set_lines(self.ax_series, self.series_lines, job["series"])
+        if self.ax_stats is not None:
+            for idx, line in enumerate(self.stats_lines):
+                if idx < len(job["stats"]):
+                    line.set_data(job["stats"][idx][1], job["stats"][idx][2])
+                else:
+                    line.set_data([], [])
+            self.ax_stats.legend([line_data[0] for line_data in job["stats"]], loc=1, fontsize=12)
+        if self.threshold_line is not None:
+            threshold = job["threshold"]
+            self.threshold_line.set_ydata([threshold, threshold])
+        for ax in (self.ax_series, self.ax_stats):
+            if ax is not None:
+                ax.relim()
+                ax.autoscale_view()
+        if self.threshold_text is not None:
+            self.threshold_text.set_position((self.ax_stats.get_xlim()[1] + 50, threshold))
+            self.threshold_text.set_text("Abnormal data:\nstd >= {:.5f}".format(threshold))
+        return save_job_figure(self.fig, job)
+
+    def close(self):
+        plt.close(self.fig)
+
+
+# the figure templates of the current process (one per plot kind), used by render_plot_job_with_template
+figure_templates = {}
+
+
+def render_plot_job_with_template(job):
+    """
+    Render a plot job with the figure template of its kind, the template is built by the first job of the kind in this process
+    :param job: a dictionary generated by make_plot_job
+    :return: the result of save_job_figure
+    """
+    if job["kind"] not in figure_templates:
+        figure_templates[job["kind"]] = FigureTemplate(job["kind"])
+    return figure_templates[job["kind"]].render(job)
+
+
+def close_figure_templates():
+    """
+    Close the figure templates of the current process
+    :return: None
+    """
+    for template in figure_templates.values():
+        template.close()
+    figure_templates.clear()
+
+
+def use_agg_backend():
+    """
+    Switch matplotlib to the non-interactive Agg backend (the figures are only saved to files)
+    :return: None
+    """
+    plt.switch_backend("Agg")
+
+
+def init_render_process():
+    """
+    Initializer of the rendering processes: use the Agg backend, and close the figure templates of the process when it exits
+    :return: None
+    """
+    use_agg_backend()
+    Finalize(None, close_figure_templates, exitpriority=10)
+
+
+class PlotRenderer:
+    """
+    Rendering stage of the report figures: the plot jobs are rendered one after another, or by a pool of processes while the main process keeps preparing the data
+    Attributes:
+        workers: the number of rendering processes (1 renders in the current process)
+        use_templates: render with a FigureTemplate per plot kind and process instead of building every figure from scratch
+        keep_records: encode the figures in memory and keep the (signal name, plot kind, PNG bytes) records in the order of submission, for generate_ppt_from_records
+        save_files: also write the figure files when keep_records is set
+        record_sink: with keep_records, a function called with every record in the order of submission (ex: ReportBuilder.add_record) instead of keeping the records
+        records: the list of the kept records
+        max_pending: the largest number of submitted jobs not rendered yet, which bounds the memory held by the waiting jobs
+        figure_count: the number of figures rendered so far
+    Methods:
+        submit: render a plot job generated by make_plot_job (or hand it to the pool), the jobs are finished in the order of submission
+        close: wait for all submitted jobs and print the rendering throughput
+    """
+
+    def __init__(self, workers=1, use_templates=False, keep_records=False, save_files=True, record_sink=None, max_pending=None):
+        self.workers = max(workers or 1, 1)
+        self.use_templates = use_templates
+        self.keep_records = keep_records
+        self.save_files = save_files
+        self.record_sink = record_sink
+        self.records = []
+        self.max_pending = max_pending or 2 * self.workers
+        self.figure_count = 0
+        self._pending = []
+        self._start_time = time.time()
+        # only the rendering processes switch to the Agg backend, the backend of the current process is left as the user set it
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=init_render_process) if self.workers > 1 else None
+
+    def submit(self, job):
+        if self.keep_records:
+            job = dict(job, in_memory=True, file_path=job["file_path"] if self.save_files else None)
+        render = render_plot_job_with_template if self.use_templates else render_plot_job
+        if self._executor is None:
+            self._done(render(job))
+            return
+        self._pending.append(self._executor.submit(render, job))
+        while len(self._pending) > self.max_pending:
+            self._done(self._pending.pop(0).result())
+
+    def _done(self, result):
+        self.figure_count += 1
+        if self.keep_records and self.record_sink is not None:
+            self.record_sink(result)
+        elif self.keep_records:
+            self.records.append(result)
+
+    def close(self):
+        try:
+            for future in self._pending:
+                self._done(future.result())
+        finally:
+            self._shutdown()
+        elapsed = max(time.time() - self._start_time, 1e-9)
+        print("Rendered {} figure(s) with {} worker(s) in {:.2f}s, {:.2f} figures/s".format(
+            self.figure_count, self.workers, elapsed, self.figure_count / elapsed))
+
+    def _shutdown(self, cancel=False):
+        self._pending = []
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=cancel)
+            self._executor = None
+        close_figure_templates()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # the error is raised as it is, the jobs not started yet are dropped
+            self._shutdown(cancel=True)
@@ -1,60 +1,206 @@
-"""
-Function: generate a ppt file based on the figures' directory and the given abnormal values' list
-Author: Xinran Wang
-Date: 09/02/2020
-"""
-
-import os
-from os import listdir
-from os.path import join, basename
-from re import findall
-import pptx
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_PARAGRAPH_ALIGNMENT
-from change_line_test import *
-
-
-def generate_ppt(fig_path, abnormal_dic, ppt_dir, ppt_name):
-    """
-    Generate the powerpoint, each page has one figure; for the merged dataframe, the outlier interval will also be listed on the powerpoint; the powerpoint will be saved in the same directory as this project
-    :param fig_path: the absolute path of the folder containing all the figures drawn
-    :param abnormal_dic: a dictionary with keys as the file names of data figures that needed to be plotted with abnormals, values as the corresponding outlier values
-    :param ppt_dir: a string of the target directory
-    :param ppt_name: a string of the wanted ppt name
-    :return: None
-    """
-    # set as reading png file because we created png file in plot.py
-    pic_files = [join(fig_path, fn) for fn in listdir(fig_path) if fn.endswith(".png")]
-
-    ppt_file = pptx.Presentation()
-    ppt_file.slide_width = Inches(16)
-    ppt_file.slide_height = Inches(9)
-    for fn in pic_files:
-        slide = ppt_file.slides.add_slide(ppt_file.slide_layouts[6])
-        txt = slide.shapes.add_textbox(Inches(0.5), Inches(0.2), ppt_file.slide_width, Inches(5))
-        p = txt.text_frame.add_paragraph()
-        slide.shapes.add_picture(fn, Inches(0), Inches(1.5), Inches(16), Inches(6.4))
-
-        pic_name = basename(fn)
-        splitted_name = pic_name.split("-")
-        data_type = splitted_name[0]
-        p.text = data_type + ": data comparison figure"
-        p.font.bold = True
-
-        if "Stats" in pic_name:
-            abnormal_text, lines = change_lines(abnormal_dic[data_type])
-            if lines <= 1:
-                abnormal = slide.shapes.add_textbox(Inches(0.5), Inches(7.5), ppt_file.slide_width, Inches(5))
-                para = abnormal.text_frame.add_paragraph()
-                para.text = "Potential abnormal data Camera ID ranges:" + "\n" + abnormal_text
-            else:
-                slide = ppt_file.slides.add_slide(ppt_file.slide_layouts[6])
-                abnormal = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), ppt_file.slide_width, Inches(5))
-                para = abnormal.text_frame.add_paragraph()
-                para.text = "Potential abnormal data Camera ID ranges:" + "\n" + abnormal_text
-
-        p.alignment = PP_PARAGRAPH_ALIGNMENT.LEFT
-        p.font.name = "Times New Roman"
-        p.font.size = Pt(25)
-    ppt_file.save(os.path.join(ppt_dir, ppt_name + ".pptx"))
-
+"""
+Function: generate a ppt file based on the figures' directory and the given abnormal values' list
+Author: Xinran Wang
+Date: 09/02/2020
+"""
+
+import gc
+import os
+from io import BytesIO
+from os import listdir
+from os.path import join, basename
+from re import findall
+import pptx
+from PIL import Image
+from pptx.util import Inches, Pt
+from pptx.enum.text import PP_PARAGRAPH_ALIGNMENT
+from change_line_test import *
+
+
+def generate_ppt(fig_path, abnormal_dic, ppt_dir, ppt_name):
+    """
+    Generate the powerpoint, each page has one figure; for the merged dataframe, the outlier interval will also be listed on the powerpoint; the powerpoint will be saved in the same directory as this project
+    :param fig_path: the absolute path of the folder containing all the figures drawn
+    :param abnormal_dic: a dictionary with keys as the file names of data figures that needed to be plotted with abnormals, values as the corresponding outlier values
+    :param ppt_dir: a string of the target directory
+    :param ppt_name: a string of the wanted ppt name
+    :return: None
+    """
+    # set as reading png file because we created png file in plot.py
+    pic_files = [join(fig_path, fn) for fn in listdir(fig_path) if fn.endswith(".png")]
+
+    ppt_file = new_presentation()
+    for fn in pic_files:
+        pic_name = basename(fn)
+        add_figure_slide(ppt_file, fn, pic_name.split("-")[0], "Stats" in pic_name, abnormal_dic)
+    ppt_file.save(os.path.join(ppt_dir, ppt_name + ".pptx"))
+
+
+def generate_ppt_from_records(records, abnormal_dic, ppt_dir, ppt_name):
+    """
+    Generate the same powerpoint as generate_ppt from the figures kept in memory by plot.PlotRenderer, without reading figure files; the slides follow the order of the records (the signal order) instead of the file names
+    :param records: a list of tuples of (signal name, plot kind, PNG bytes)
+    :param abnormal_dic: a dictionary with keys as the signal names plotted with abnormals, values as the corresponding outlier values
+    :param ppt_dir: a string of the target directory
+    :param ppt_name: a string of the wanted ppt name
+    :return: None
+    """
+    ppt_file = new_presentation()
+    for signal, kind, png in records:
+        add_figure_slide(ppt_file, BytesIO(png), figure_signal_name(signal), "Stats" in kind, abnormal_dic, signal)
+    ppt_file.save(os.path.join(ppt_dir, ppt_name + ".pptx"))
+
+
+class ReportBuilder:
+    """
+    Build the powerpoint incrementally: every figure becomes a slide as soon as it is rendered (ex: as the record_sink of plot.PlotRenderer), the images can be resized and recompressed before embedding, and a report larger than the size limit is split into several decks
+    Attributes:
+        ppt_dir: a string of the target directory
+        ppt_name: a string of the wanted ppt name (the decks of a split report are named ppt_name_part1, ppt_name_part2, ...)
+        abnormal_dic: a dictionary with keys as the signal names plotted with abnormals, values as the outlier ranges (filled before the figures are added)
+        image_dpi: the resolution of the embedded images on the 16 inches wide slides (None embeds the figures as they are)
+        max_deck_mb: the largest size of the images embedded in one deck in MB (None never splits)
+        saved_paths: the paths of the decks saved so far
+    Methods:
+        add_figure: add the slide of one figure
+        add_record: add the slide of a (signal name, plot kind, PNG bytes) record
+        close: save the last deck, return the paths of all decks
+        discard: drop the deck being built without saving it (the report was interrupted)
+    """
+
+    def __init__(self, ppt_dir, ppt_name, abnormal_dic, image_dpi=None, max_deck_mb=None):
+        self.ppt_dir = ppt_dir
+        self.ppt_name = ppt_name
+        self.abnormal_dic = abnormal_dic
+        self.image_dpi = image_dpi
+        self.max_deck_mb = max_deck_mb
+        self.saved_paths = []
+        self._deck = new_presentation()
+        self._deck_bytes = 0
+        self._deck_figures = 0
+
+    def add_figure(self, signal, kind, png):
+        if self.image_dpi:
+            png = recompress_png(png, self.image_dpi)
+        if self.max_deck_mb and self._deck_figures > 0 and self._deck_bytes + len(png) > self.max_deck_mb * 1024 * 1024:
+            self._save_deck()
+        add_figure_slide(self._deck, BytesIO(png), figure_signal_name(signal), "Stats" in kind, self.abnormal_dic, signal)
+        self._deck_bytes += len(png)
+        self._deck_figures += 1
+
+    def add_record(self, record):
+        self.add_figure(*record)
+
+    def _save_deck(self):
+        path = os.path.join(self.ppt_dir, self.ppt_name + "_part" + str(len(self.saved_paths) + 1) + ".pptx")
+        self._deck.save(path)
+        print("Saved PPT: {}, {} figure(s), {:.1f} MB of images".format(path, self._deck_figures, self._deck_bytes / 1024 / 1024))
+        self.saved_paths.append(path)
+        # the saved deck (and its images) is only freed by the cycle collector, as the presentation parts refer to each other
+        self._deck = None
+        gc.collect()
+        self._deck = new_presentation()
+        self._deck_bytes = 0
+        self._deck_figures = 0
+
+    def close(self):
+        if self._deck is None:
+            return self.saved_paths
+        if self.saved_paths:
+            self._save_deck()
+        else:
+            path = os.path.join(self.ppt_dir, self.ppt_name + ".pptx")
+            self._deck.save(path)
+            self.saved_paths.append(path)
+        self._deck = None
+        return self.saved_paths
+
+    def discard(self):
+        self._deck = None
+        if self.saved_paths:
+            print("PPT not finished, the decks saved so far are incomplete: " + ", ".join(self.saved_paths))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # an interrupted report is not saved, so that a partial deck never takes the name of a finished report
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def recompress_png(png, dpi, width_inches=16):
+    """
+    Resize a PNG figure to the given resolution at the width it takes on the slide, and recompress it with a 256 colors palette (enough for the line plots)
+    :param png: the PNG bytes
+    :param dpi: the wanted resolution in pixels per inch
+    :param width_inches: the width of the image on the slide
+    :return: the new PNG bytes (the original ones if they are not larger)
+    """
+    image = Image.open(BytesIO(png)).convert("RGB")
+    width = int(width_inches * dpi)
+    if image.width > width:
+        image = image.resize((width, max(int(round(image.height * width / image.width)), 1)), Image.LANCZOS)
+    buffer = BytesIO()
+    image.quantize(256, method=Image.FASTOCTREE).save(buffer, format="PNG")
+    new_png = buffer.getvalue()
+    return new_png if len(new_png) < len(png) else png
+
+
+def figure_signal_name(signal):
+    """
+    The signal name as written in the figure file names (without the unit part in square brackets)
+    :param signal: a string of the signal name
+    :return: a string
+    """
+    square_bracket = signal.find("[")
+    return signal[:square_bracket] if square_bracket != -1 else signal
+
+
+def new_presentation():
+    """
+    Create an empty 16:9 powerpoint
+    :return: a pptx.Presentation object
+    """
+    ppt_file = pptx.Presentation()
+    ppt_file.slide_width = Inches(16)
+    ppt_file.slide_height = Inches(9)
+    return ppt_file
+
+
+def add_figure_slide(ppt_file, picture, data_type, has_abnormal, abnormal_dic, abnormal_key=None):
+    """
+    Add the slide of one figure (and the abnormal camera id ranges for the stats figures, on a following slide if they are too long)
+    :param ppt_file: a pptx.Presentation object
+    :param picture: the path of the figure file, or a file-like object of the PNG
+    :param data_type: a string of the signal name written on the slide
+    :param has_abnormal: a boolean value of whether the abnormal camera id ranges are listed for this figure
+    :param abnormal_dic: a dictionary with values as the outlier ranges
+    :param abnormal_key: the key of this figure in abnormal_dic (data_type if None)
+    :return: None
+    """
+    slide = ppt_file.slides.add_slide(ppt_file.slide_layouts[6])
+    txt = slide.shapes.add_textbox(Inches(0.5), Inches(0.2), ppt_file.slide_width, Inches(5))
+    p = txt.text_frame.add_paragraph()
+    slide.shapes.add_picture(picture, Inches(0), Inches(1.5), Inches(16), Inches(6.4))
+
+    p.text = data_type + ": data comparison figure"
+    p.font.bold = True
+
+    if has_abnormal:
+        abnormal_text, lines = change_lines(abnormal_dic[data_type if abnormal_key is None else abnormal_key])
+        if lines <= 1:
+            abnormal = slide.shapes.add_textbox(Inches(0.5), Inches(7.5), ppt_file.slide_width, Inches(5))
+            para = abnormal.text_frame.add_paragraph()
+            para.text = "Potential abnormal data Camera ID ranges:" + "\n" + abnormal_text
+        else:
+            slide = ppt_file.slides.add_slide(ppt_file.slide_layouts[6])
+            abnormal = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), ppt_file.slide_width, Inches(5))
+            para = abnormal.text_frame.add_paragraph()
+            para.text = "Potential abnormal data Camera ID ranges:" + "\n" + abnormal_text
+
+    p.alignment = PP_PARAGRAPH_ALIGNMENT.LEFT
+    p.font.name = "Times New Roman"
+    p.font.size = Pt(25)
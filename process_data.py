@@ -1,486 +1,1055 @@
-"""
-Function: test functions of reading mf4 files using the corresponding dbc and extract the wanted signals from excel
-Author: Yiming Gu, Xinran Wang
-Date: 09/02/2020
-"""
-
-import asammdf
-from asammdf import MDF
-import glob
-import pandas as pd
-import os
-import time
-import sys
-
-from pyparsing import Word, Literal, Keyword, Optional, Suppress, Group, QuotedString, Combine
-from pyparsing import printables, nums, alphas, alphanums, LineEnd, ZeroOrMore, OneOrMore
-
-sys.setrecursionlimit(100000)
-pd.set_option('expand_frame_repr', False)
-
-# DBC section types
-VERSION = 'VERSION'
-ECU = 'BU_'
-COMMENT = 'CM_'
-MESSAGE = 'BO_'
-SIGNAL = 'SG_'
-VALTYPE = 'SIG_VALTYPE_'
-VALUETABLE = 'VAL_'
-BA = 'BA_'
-BADEF = 'BA_DEF_'
-BADEFDEF = 'BA_DEF_DEF_'
-BADEFREF = 'BA_DEF_REF_'
-
-# def load_dbc(dbc_file_dir):
-#     dbc = glob.glob(dbc_file_dir + "FR*.dbc")
-#     return dbc
-
-
-class Signal:
-    """
-    CAN Signal object
-    Attributes:
-        name: signal name, as string
-        multi_type: normal signal or multiplexor/multiplexed signal ('N' for normal signal, 'M' for multiplexor, number for multiplexed signal)
-        start_bit: start bit of the signal, as uint, original from dbc
-        length_bit: the bit length of the signal, as uint
-        byte_order: little endien (1: 'Intel') or big endien (0: 'Motorola'), as boolean
-        value_type: unsigned (0) or signed (1), as boolean
-        factor: for float value, as float
-        offset: for float value, as float
-        unit: unit, as string
-        min: minimum value of the signal
-        max: maximum value of the signal
-        value_table: value table of the signal
-        comment: comment
-    Methods: None
-    """
-
-    def __init__(self, name, multi_type, start_bit, length_bit, byte_order, value_type, factor, offset, unit, value_min,
-                 value_max, value_table, comment):
-        self.name = name
-        self.multi_type = multi_type
-        self.start_bit = start_bit
-        self.length_bit = length_bit
-        self.byte_order = byte_order
-        self.value_type = value_type
-        self.factor = factor
-        self.offset = offset
-        self.value_min = value_min
-        self.value_max = value_max
-        self.unit = unit
-        self.value_table = value_table
-        self.comment = comment
-
-    # def __repr__(self):
-    #     fmt = 'signal(' + ', '.join(12 * ['{}']) + ')'
-    #     return fmt.format(self.name,
-    #                       self.start,
-    #                       self.length,
-    #                       self.byte_order,
-    #                       self.type,
-    #                       self.scale,
-    #                       self.offset,
-    #                       self.min,
-    #                       self.max,
-    #                       self.unit,
-    #                       self.choices,
-    #                       self.comment)
-
-
-class Message:
-    """
-    CAN Message object
-    Attributes:
-        id_hex: frame id in hex, as string, also the keyword of a frame
-        id_dec: frame id in dec, as unsigned int
-        name: frame name, as string
-        dlc: frame dlc, as uint
-        type: frame type, as uint (0: CAN standard, 1: ISO CAN FD, 2: Non ISO CAN FD)
-        transmitter: frame transmitter, as string
-        receiver: frame receiver, as string
-        cycle_time: frame cycle time, as uint, in millisecond
-        comment: frame comment, as string
-        signals: signals dict for this frame, signal name as keyword in dict
-    Methods:
-
-    """
-
-    def __init__(self, id_dec, name, dlc, cycle_time=0, message_type=None, transmitter=None, signals=None,
-                 comment=None):
-        self.id_dec = id_dec
-        self.id_hex = hex(id_dec)
-        self.name = name
-        self.dlc = dlc
-        self.cycle_time = cycle_time
-        self.message_type = message_type
-        self.transmitter = transmitter
-        self.signals = signals
-        self.comment = comment
-
-
-class DBCFile:
-    """CAN database file.
-    """
-
-    def __init__(self, messages=None):
-        self.messages = messages if messages else []
-        # self.grammar = self.create_dbc_grammar()
-        self.msg_id_dec = {}
-        self.msg_id_hex = {}
-        self.version = None
-        self.ecus = None
-
-    def read_dbcfile(self, dbc_file_content):
-        """
-        parser DBC file, create DBC file object including messages / signals information.
-        """
-        tokens = self.create_dbc_grammar().parseString(dbc_file_content)
-
-        msg_comments = {}
-        sig_comments = {}
-        valtypes = {}
-        value_tables = {}
-        for item in tokens:
-            if item[0] == COMMENT:
-                frame_id = int(item[2])
-                if item[1] == MESSAGE:
-                    if frame_id not in msg_comments.keys():
-                        msg_comments[frame_id] = item[3]
-                elif item[1] == SIGNAL:
-                    if frame_id not in sig_comments.keys():
-                        sig_comments[frame_id] = {}
-                    sig_comments[frame_id][item[3]] = item[4]
-            elif item[0] == VALTYPE:
-                frame_id = int(item[1])
-                if frame_id not in valtypes:
-                    valtypes[frame_id] = {}
-                valtypes[frame_id][item[2]] = int(item[3])
-            elif item[0] == VALUETABLE:
-                frame_id = int(item[1])
-                if frame_id not in value_tables.keys():
-                    value_tables[frame_id] = {}
-                value_tables[frame_id][item[2]] = [(int(v[0]), v[1]) for v in item[3]]
-            elif item[0] == VERSION:
-                self.version = item[1]
-            elif item[0] == ECU:
-                if len(item) > 1:
-                    # print(item[1])
-                    self.ecus = item[1]
-            else:
-                pass
-        for item in tokens:
-            if item[0] == MESSAGE and item[1] != '3221225472':
-                message = Message(int(item[1]), item[2], int(item[3]), transmitter=item[4])
-                if item[1] in msg_comments.keys():
-                    message.comment = msg_comments[item[1]]
-                message.signals = []
-                for signal in item[5]:
-                    if signal[2] == 'M':
-                        message.signals.append(Signal(
-                            name=signal[1],
-                            multi_type='M',
-                            start_bit=int(signal[3][0]),
-                            length_bit=int(signal[3][1]),
-                            byte_order=(0 if signal[3][2] == '0' else 1),
-                            value_type=(0 if signal[3][3] == '+' else 1),
-                            factor=num(signal[4][0]),
-                            offset=num(signal[4][1]),
-                            value_min=num(signal[5][0]),
-                            value_max=num(signal[5][1]),
-                            unit=signal[6],
-                            value_table=None,
-                            comment=None
-                        ))
-                    elif signal[2][0] == 'm':
-                        message.signals.append(Signal(
-                            name=signal[1],
-                            multi_type=int(signal[2][1]),
-                            start_bit=int(signal[3][0]),
-                            length_bit=int(signal[3][1]),
-                            byte_order=(0 if signal[3][2] == '0' else 1),
-                            value_type=(0 if signal[3][3] == '+' else 1),
-                            factor=num(signal[4][0]),
-                            offset=num(signal[4][1]),
-                            value_min=num(signal[5][0]),
-                            value_max=num(signal[5][1]),
-                            unit=signal[6],
-                            value_table=None,
-                            comment=None
-                        ))
-                    else:
-                        message.signals.append(Signal(
-                            name=signal[1],
-                            multi_type='N',
-                            start_bit=int(signal[2][0]),
-                            length_bit=int(signal[2][1]),
-                            byte_order=(0 if signal[2][2] == '0' else 1),
-                            value_type=(0 if signal[2][3] == '+' else 1),
-                            factor=num(signal[3][0]),
-                            offset=num(signal[3][1]),
-                            value_min=num(signal[4][0]),
-                            value_max=num(signal[4][1]),
-                            unit=signal[5],
-                            value_table=None,
-                            comment=None
-                        ))
-                for sig in message.signals:
-                    # if message.id_dec in valtypes.keys():
-                    #     if sig.name in valtypes[message.id_dec]:
-                    #         sig.value_type = valtypes[message.id_dec][sig.name]
-                    if message.id_dec in value_tables.keys():
-                        if sig.name in value_tables[message.id_dec]:
-                            sig.value_table = value_tables[message.id_dec][sig.name]
-                    if message.id_dec in sig_comments.keys():
-                        if sig.name in sig_comments[message.id_dec]:
-                            sig.comment = sig_comments[message.id_dec][sig.name]
-                self.add_message(message)
-
-    def create_dbc_grammar(self):
-        """Create DBC grammar.
-        """
-
-        # DBC file grammar
-        word = Word(printables, excludeChars=':')
-        integer = Combine(Optional(Literal('-')) + Word(nums))
-        number = Word(nums + '.Ee-+')
-        colon = Suppress(Literal(':'))
-        scolon = Suppress(Literal(';'))
-        pipe = Suppress(Literal('|'))
-        at = Suppress(Literal('@'))
-        sign = Literal('+') | Literal('-')
-        lp = Suppress(Literal('('))
-        rp = Suppress(Literal(')'))
-        lb = Suppress(Literal('['))
-        rb = Suppress(Literal(']'))
-        comma = Suppress(Literal(','))
-        multiplexor = Literal('M')
-        multiplexed = Group(Literal('m') + number)
-
-        version = Group(Keyword('VERSION') + QuotedString('"', multiline=True))
-        symbol = Word(alphas + '_') + Suppress(LineEnd())
-        symbols = Group(Keyword('NS_') + colon + Group(ZeroOrMore(symbol)))
-        discard = Suppress(Keyword('BS_') + colon)
-        ecu = Group(Keyword('BU_') + colon + ZeroOrMore(Word(printables).setWhitespaceChars(' \t')))
-        signal = Group(Keyword(SIGNAL) + word + ZeroOrMore(multiplexor | multiplexed) + colon +
-                       Group(integer + pipe + integer + at + integer + sign) +
-                       Group(lp + number + comma + number + rp) +
-                       Group(lb + number + pipe + number + rb) +
-                       QuotedString('"', multiline=True) + word)
-        message = Group(Keyword(MESSAGE) + integer + word + colon + integer + word + Group(ZeroOrMore(signal)))
-        comment = Group(Keyword(COMMENT) + (
-                (Keyword(MESSAGE) + integer + QuotedString('"', multiline=True) + scolon) |
-                (Keyword(SIGNAL) + integer + word + QuotedString('"', multiline=True) + scolon)))
-        badef = Group(Keyword(BADEF) + Optional(Keyword('BU_') | Keyword('BO_') | Keyword('SG_') | Keyword('EV_')) +
-                      QuotedString('"') + (((Keyword('INT') | Keyword('HEX') | Keyword(
-            'FLOAT')) + integer + integer + scolon) | (Keyword('ENUM') +
-                                                       OneOrMore(QuotedString('"') + Optional(comma)) + scolon) | (
-                                                       Keyword('STRING') + scolon)))
-        badefdef = Group(Keyword(BADEFDEF) + QuotedString('"') + (QuotedString('"') | integer) + scolon)
-        badefref = Group(Keyword(BADEFREF) + QuotedString('"') + (QuotedString('"') | integer) + scolon)
-        ba = Group(Keyword(BA) + QuotedString('"') + Optional(
-            Keyword('BU_') | Keyword('BO_') | Keyword('SG_') | Keyword('EV_')) + (
-                               QuotedString('"') | OneOrMore(Word(alphanums))) + scolon)
-
-        valtable = Group(Keyword('VAL_TABLE_') + Word(alphanums + '_') + Group(
-            OneOrMore(Group(integer + QuotedString('"', multiline=True)))) + scolon)
-
-        valtype = Group(Keyword(VALTYPE) + integer + word + colon + integer + scolon)
-
-        choice = Group(Keyword(VALUETABLE) + integer + word + Group(
-            OneOrMore(Group(integer + QuotedString('"', multiline=True)))) + scolon)
-
-        entry = version | symbols | discard | ecu | message | comment | ba | badef | badefdef | badefref | valtable | valtype | choice
-        grammar = OneOrMore(entry)
-
-        return grammar
-
-    def add_message(self, message):
-        self.messages.append(message)
-        self.msg_id_dec[message.id_dec] = message
-        self.msg_id_hex[message.id_hex] = message
-
-    def decode_message(self, frame_id, data):
-        """Decode a message
-        """
-
-        message = self.frame_id_to_message[frame_id]
-        return message.decode(data)
-
-
-def load_dbc(file_path):
-    """
-    Load the dbc file from the given directory
-    :param file_path: the path of directory storing all dbc files
-    :return: a dictionary containing info extracted from DBC
-    """
-    dbc = DBCFile()
-    with open(file_path, 'r', encoding='utf8', errors='replace') as f:
-        dbc.read_dbcfile(f.read())
-    f.close()
-
-    msg_dict = {message.id_dec: {
-                'id_dec': message.id_dec,
-                'id_hex': message.id_hex,
-                'name': message.name,
-                'dlc': message.dlc,
-                'comment': message.comment,
-                'signals': {signal.name: {'name': signal.name,
-                                            'multi_type': signal.multi_type,
-                                            'start_bit': signal.start_bit,
-                                            'length_bit': signal.length_bit,
-                                            'byte_order':  signal.byte_order,
-                                            'value_type': signal.value_type,
-                                            'factor': signal.factor,
-                                            'offset': signal.offset,
-                                            'value_min': signal.value_min,
-                                            'value_max': signal.value_max,
-                                            'unit': signal.unit,
-                                            'value_table': signal.value_table,
-                                            'comment': signal.comment}
-                            for signal in message.signals}}
-                for message in dbc.messages if message.name != 'VECTOR__INDEPENDENT_SIG_MSG'}
-    return msg_dict
-
-
-def num(s):
-    """
-    convert a string to integer or float
-    :param s: a string of number
-    :return: an int or float type number
-    """
-    try:
-        return int(s)
-    except ValueError:
-        return float(s)
-    else:
-        raise ValueError('Expected integer or floating point number.')
-
-
-# def read_mf4(file_path, dbc):
-#     mdf = MDF(file_path, "r")
-#     print(mdf)
-#     information = mdf.extract_can_logging(dbc)
-#     data = information.to_dataframe()
-#     return data
-
-
-def extract_wanted_signal_data(dataframe, signal_excel_path):
-    signals = pd.read_excel(signal_excel_path)
-    names = list(signals["Name"])
-    return dataframe.reindex(columns=names)
-
-
-def load_total_matrix(root_path, dbc_channel_files):
-    total_messages, total_signals, total_fullpath = {}, {}, {}
-    for channel_key, file_list in dbc_channel_files.items():
-        total_messages[channel_key] = {}
-        total_signals[channel_key] = {}
-        total_fullpath[channel_key] = []
-        if len(file_list) == 0:
-            print("No DBC for channel: " + channel_key[-1])
-        else:
-            for file in file_list:
-                full_path = os.path.join(root_path, file)
-                if os.path.exists(full_path):
-                    if os.path.splitext(full_path)[-1] != ".dbc":
-                        print("File is not DBC file: " + full_path)
-                    else:
-                        total_messages[channel_key].update(load_dbc(full_path))
-                        total_fullpath[channel_key].append(full_path)
-                else:
-                    print("No such DBC file: " + full_path)
-        for msg in total_messages[channel_key]:
-            for sig in total_messages[channel_key][msg]["signals"]:
-                total_signals[channel_key][sig] = total_messages[channel_key][msg]["signals"][sig]
-    return total_fullpath, total_messages, total_signals
-
-
-def loadMF4data2Dict(file, wanted_signals, dbcfiles=None):
-    """
-    Use the given signals, extract the wanted data from the data file
-    :param file: the path of mf4 file
-    :param wanted_signals: a list containing wanted signals
-    :param dbcfiles: the total_fullpath generated from load_total_matrix
-    :return: a dictionary
-    """
-    if not os.path.exists(file):
-        print("Data file not found.")
-        return None
-    t0 = time.time()
-    try:
-        mdffile = asammdf.MDF(file, 'r')
-
-        # signalList = list(mdffile.channels_db.keys())
-        # print(signalList)
-        # count = 0
-        # total_sig_count = sum([len(totalSignals[channel_key]) for channel_key in totalSignals])
-        # for sig in signalList:
-        #     flag = 0
-        #     if 'CAN_' in sig or 'Vector' in sig or 'time' == sig:
-        #         continue
-        #     else:
-        #         for channel_key in totalSignals:
-        #             if sig in totalSignals[channel_key]:
-        #                 flag = 1
-        #         if flag == 1:
-        #             count += 1
-
-        data = {}
-        for channel_key in dbcfiles:
-            channel_num = int(channel_key.split('Ch')[-1])
-            if channel_num in mdffile.bus_logging_map['CAN']:
-                channel_index = list(mdffile.bus_logging_map['CAN'][channel_num].values())[0]
-                mdffile_ext = asammdf.MDF(file, 'r').filter([(None, channel_index, 1)]).extract_can_logging(dbcfiles[channel_key])
-                for w in wanted_signals:
-                    try:
-                        if (w not in data) or (data[w] is None):
-                            tmpdata = mdffile_ext.get(w)
-                            data[w] = pd.DataFrame(tmpdata.samples, index=tmpdata.timestamps, columns=[w])
-                    except:
-                        data[w] = None
-    except Exception as e:
-        print(file + ': ' + str(e))
-        return {}
-
-    if len(data.keys()) == 0:
-        print('No valid signal in file: ' + os.path.split(file)[-1])
-    print('Loaded: ' + os.path.split(file)[-1] + ', time elapsed: ' + str(time.time() - t0) + 's')
-    return data
-
-
-
-if __name__ == "__main__":
-    # path = "C:\\Users\\Z0050908\\Documents\\Reinj_data\\GWM_V71_39_02A01_RB_test_2020_08_26_070508#k826070508q1a24a7\\GWM_V71_39_02A01_RB_test_2020_08_26_070508_log_015.mf4"
-    # # path = "C:\\Users\\Z0050908\\Documents\\Reinj_data\\Raw data\\GWM_TimeSycn_142_2020_07_11_070917_log_007.mf4"
-    #
-    # dbc_path = "C:\\Users\\Z0050908\\Desktop\\read_can_dbc"
-    # # dbc_path = "C:\\Users\Z0050908\\Desktop\\read_can_dbc"
-    # signal = "C:\\Users\\Z0050908\\Desktop\\FR-IFC-Private CAN_Checklist.xlsx"
-    #
-    # # print(pd.read_excel(signal))
-    # dbc = load_dbc(dbc_path)
-    # data = read_mf4(path, dbc)
-    # print(data.shape)
-    # print(extract_wanted_signal_data(data, signal))
-
-    rootpath = "C:\\Users\\Z0050908\\Downloads"
-    dbcs = {"Ch3": ['GWM V71 CAN 01C.dbc'], "Ch4": ['FR-IFC-Private CAN.dbc'], "Ch5": ['GWM V71 CAN 01C.dbc'], "Ch6": ['FR-IFC-Private CAN.dbc']}
-    path_w = "C:\\Users\\Z0050908\\Documents\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\[Reinjection 2] Session_2020_08_26_053716_log_001.mf4"
-    path_w_ori = "C:\\Users\\Z0050908\\Documents\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\[Original] Traffic_signs_and_Lights_2020_08_20_2020_08_20_060823_log_001.mf4"
-    path_g = "C:\\Users\\Z0050908\\Documents\\Reinj_data\\GWM_V71_39_02A01_RB_test_2020_08_26_070508#k826070508q1a24a7\\GWM_V71_39_02A01_RB_test_2020_08_26_070508_log_001.mf4"
-    A, B, C = load_total_matrix(rootpath, dbcs)
-    # print(A, B, C)
-
-    signal_excel_path = "C:\\Users\\Z0050908\\Desktop\\FR-IFC-Private CAN_Checklist.xlsx"
-    signals = pd.read_excel(signal_excel_path)
-    wanted = signals[(signals["Priority"] == 1) & (signals["Alignment"] == "Agree")]["Name"]
-    dat = loadMF4data2Dict(path_w, wanted, A)
-    print(dat.keys())
-    for s in wanted:
-        try:
-            print("exist:", s, dat[s])
-        except:
-            print("not exist:",  s)
-    print(1)
-
+"""
+Function: test functions of reading mf4 files using the corresponding dbc and extract the wanted signals from excel
+Author: Yiming Gu, Xinran Wang
+Date: 09/02/2020
+"""
+
+import asammdf
+from asammdf import MDF
+import glob
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+import os
+import re
+import tempfile
+import time
+import sys
+
+from cache import *
+from frame_decoder import *
+from pyparsing import Word, Literal, Keyword, Optional, Suppress, Group, QuotedString, Combine
+from pyparsing import printables, nums, alphas, alphanums, LineEnd, ZeroOrMore, OneOrMore
+
+sys.setrecursionlimit(100000)
+pd.set_option('expand_frame_repr', False)
+
+# DBC section types
+VERSION = 'VERSION'
+ECU = 'BU_'
+COMMENT = 'CM_'
+MESSAGE = 'BO_'
+SIGNAL = 'SG_'
+VALTYPE = 'SIG_VALTYPE_'
+VALUETABLE = 'VAL_'
+BA = 'BA_'
+BADEF = 'BA_DEF_'
+BADEFDEF = 'BA_DEF_DEF_'
+BADEFREF = 'BA_DEF_REF_'
+
+# increase it whenever the parser or the dictionary generated by load_dbc changes, so that cached DBCs are parsed again
+DBC_PARSER_VERSION = 2
+
+# increase it whenever the content of the decoded signal cache changes
+SIGNAL_CACHE_VERSION = 1
+
+# DBC parsers selectable in load_dbc: the pyparsing grammar, or the line-oriented parser
+DBC_PARSERS = ('pyparsing', 'lines')
+
+# statements that may span several lines and always end with a semicolon
+MULTILINE_STATEMENTS = (COMMENT, VALUETABLE, VALTYPE, BA, 'EV_', 'SIG_GROUP_', 'BO_TX_BU_')
+
+# regular expressions of the line-oriented DBC parser
+RE_SYMBOL = re.compile(r'^[A-Za-z_]+$')
+RE_VERSION = re.compile(r'^VERSION\s+"(.*)"', re.DOTALL)
+RE_ECU = re.compile(r'^BU_\s*:(.*)$')
+RE_MESSAGE = re.compile(r'^BO_\s+(-?\d+)\s+([^\s:]+)\s*:\s*(-?\d+)\s+([^\s:]+)')
+RE_SIGNAL = re.compile(r'^SG_\s+([^\s:]+)\s*(M|m\d+)?\s*:\s*(-?\d+)\|(-?\d+)@(-?\d+)([+-])\s*'
+                       r'\(\s*([\d.Ee+-]+)\s*,\s*([\d.Ee+-]+)\s*\)\s*'
+                       r'\[\s*([\d.Ee+-]+)\s*\|\s*([\d.Ee+-]+)\s*\]\s*"([^"]*)"')
+RE_MESSAGE_COMMENT = re.compile(r'^CM_\s+BO_\s+(-?\d+)\s+"(.*)"\s*;\s*$', re.DOTALL)
+RE_SIGNAL_COMMENT = re.compile(r'^CM_\s+SG_\s+(-?\d+)\s+([^\s:]+)\s+"(.*)"\s*;\s*$', re.DOTALL)
+RE_VALTYPE = re.compile(r'^SIG_VALTYPE_\s+(-?\d+)\s+([^\s:]+)\s*:\s*(-?\d+)\s*;')
+RE_VALUETABLE = re.compile(r'^VAL_\s+(-?\d+)\s+([^\s:]+)\s+(.*);\s*$', re.DOTALL)
+RE_VALUE_PAIR = re.compile(r'(-?\d+)\s+"([^"]*)"', re.DOTALL)
+# statements bound to one message, kept in a pruned DBC only if their message is kept
+RE_MESSAGE_STATEMENT = re.compile(r'^(?:CM_\s+(?:BO_|SG_)|BA_\s+"[^"]*"\s+(?:BO_|SG_)|VAL_|SIG_VALTYPE_|BO_TX_BU_|SG_MUL_VAL_|SIG_GROUP_)\s+(-?\d+)')
+
+# def load_dbc(dbc_file_dir):
+#     dbc = glob.glob(dbc_file_dir + "FR*.dbc")
+#     return dbc
+
+
+class Signal:
+    """
+    CAN Signal object
+    Attributes:
+        name: signal name, as string
+        multi_type: normal signal or multiplexor/multiplexed signal ('N' for normal signal, 'M' for multiplexor, number for multiplexed signal)
+        start_bit: start bit of the signal, as uint, original from dbc
+        length_bit: the bit length of the signal, as uint
+        byte_order: little endien (1: 'Intel') or big endien (0: 'Motorola'), as boolean
+        value_type: unsigned (0) or signed (1), as boolean
+        factor: for float value, as float
+        offset: for float value, as float
+        unit: unit, as string
+        min: minimum value of the signal
+        max: maximum value of the signal
+        value_table: value table of the signal
+        comment: comment
+    Methods: None
+    """
+
+    def __init__(self, name, multi_type, start_bit, length_bit, byte_order, value_type, factor, offset, unit, value_min,
+                 value_max, value_table, comment):
+        self.name = name
+        self.multi_type = multi_type
+        self.start_bit = start_bit
+        self.length_bit = length_bit
+        self.byte_order = byte_order
+        self.value_type = value_type
+        self.factor = factor
+        self.offset = offset
+        self.value_min = value_min
+        self.value_max = value_max
+        self.unit = unit
+        self.value_table = value_table
+        self.comment = comment
+
+    # def __repr__(self):
+    #     fmt = 'signal(' + ', '.join(12 * ['{}']) + ')'
+    #     return fmt.format(self.name,
+    #                       self.start,
+    #                       self.length,
+    #                       self.byte_order,
+    #                       self.type,
+    #                       self.scale,
+    #                       self.offset,
+    #                       self.min,
+    #                       self.max,
+    #                       self.unit,
+    #                       self.choices,
+    #                       self.comment)
+
+
+class Message:
+    """
+    CAN Message object
+    Attributes:
+        id_hex: frame id in hex, as string, also the keyword of a frame
+        id_dec: frame id in dec, as unsigned int
+        name: frame name, as string
+        dlc: frame dlc, as uint
+        type: frame type, as uint (0: CAN standard, 1: ISO CAN FD, 2: Non ISO CAN FD)
+        transmitter: frame transmitter, as string
+        receiver: frame receiver, as string
+        cycle_time: frame cycle time, as uint, in millisecond
+        comment: frame comment, as string
+        signals: signals dict for this frame, signal name as keyword in dict
+    Methods:
+
+    """
+
+    def __init__(self, id_dec, name, dlc, cycle_time=0, message_type=None, transmitter=None, signals=None,
+                 comment=None):
+        self.id_dec = id_dec
+        self.id_hex = hex(id_dec)
+        self.name = name
+        self.dlc = dlc
+        self.cycle_time = cycle_time
+        self.message_type = message_type
+        self.transmitter = transmitter
+        self.signals = signals
+        self.comment = comment
+
+
+class SignalSamples:
+    """
+    Decoded samples of one signal, a lightweight replacement of the one-column dataframe per signal
+    Attributes:
+        name: signal name, as string
+        timestamps: the timestamps of the samples, as numpy array (may be shared by the signals of the same CAN message)
+        samples: the decoded values, as numpy array
+    Methods:
+        to_frame: the one-column pandas dataframe of the signal (index as timestamps), as loadMF4data2Dict generates by default
+    """
+
+    __slots__ = ('name', 'timestamps', 'samples')
+
+    def __init__(self, name, timestamps, samples):
+        self.name = name
+        self.timestamps = timestamps
+        self.samples = samples
+
+    def to_frame(self):
+        return pd.DataFrame(self.samples, index=self.timestamps, columns=[self.name])
+
+
+def as_frame(signal):
+    """
+    Get the one-column dataframe of a loaded signal, whether it was loaded as a dataframe or as a SignalSamples object
+    :param signal: a pandas dataframe or a SignalSamples object
+    :return: a pandas dataframe with the timestamps as index
+    """
+    if isinstance(signal, SignalSamples):
+        return signal.to_frame()
+    return signal
+
+
+def share_timestamps(timestamp_pool, timestamps):
+    """
+    Return an already known timestamp array equal to the given one, so that the signals of the same CAN message keep one timestamp array in memory
+    :param timestamp_pool: a dictionary used as the pool of known timestamp arrays (one per loaded file)
+    :param timestamps: a numpy array of timestamps
+    :return: the shared numpy array of timestamps
+    """
+    if len(timestamps) == 0:
+        return timestamps
+    pool_key = (len(timestamps), timestamps[0], timestamps[-1])
+    candidates = timestamp_pool.setdefault(pool_key, [])
+    for candidate in candidates:
+        if np.array_equal(candidate, timestamps):
+            return candidate
+    candidates.append(timestamps)
+    return timestamps
+
+
+class DBCFile:
+    """CAN database file.
+    """
+
+    def __init__(self, messages=None):
+        self.messages = messages if messages else []
+        # self.grammar = self.create_dbc_grammar()
+        self.msg_id_dec = {}
+        self.msg_id_hex = {}
+        self.version = None
+        self.ecus = None
+
+    def read_dbcfile(self, dbc_file_content):
+        """
+        parser DBC file, create DBC file object including messages / signals information.
+        """
+        tokens = self.create_dbc_grammar().parseString(dbc_file_content)
+
+        msg_comments = {}
+        sig_comments = {}
+        valtypes = {}
+        value_tables = {}
+        for item in tokens:
+            if item[0] == COMMENT:
+                frame_id = int(item[2])
+                if item[1] == MESSAGE:
+                    if frame_id not in msg_comments.keys():
+                        msg_comments[frame_id] = item[3]
+                elif item[1] == SIGNAL:
+                    if frame_id not in sig_comments.keys():
+                        sig_comments[frame_id] = {}
+                    sig_comments[frame_id][item[3]] = item[4]
+            elif item[0] == VALTYPE:
+                frame_id = int(item[1])
+                if frame_id not in valtypes:
+                    valtypes[frame_id] = {}
+                valtypes[frame_id][item[2]] = int(item[3])
+            elif item[0] == VALUETABLE:
+                frame_id = int(item[1])
+                if frame_id not in value_tables.keys():
+                    value_tables[frame_id] = {}
+                value_tables[frame_id][item[2]] = [(int(v[0]), v[1]) for v in item[3]]
+            elif item[0] == VERSION:
+                self.version = item[1]
+            elif item[0] == ECU:
+                if len(item) > 1:
+                    # print(item[1])
+                    self.ecus = item[1]
+            else:
+                pass
+        for item in tokens:
+            if item[0] == MESSAGE and item[1] != '3221225472':
+                message = Message(int(item[1]), item[2], int(item[3]), transmitter=item[4])
+                if int(item[1]) in msg_comments.keys():
+                    message.comment = msg_comments[int(item[1])]
+                message.signals = []
+                for signal in item[5]:
+                    if signal[2] == 'M':
+                        message.signals.append(Signal(
+                            name=signal[1],
+                            multi_type='M',
+                            start_bit=int(signal[3][0]),
+                            length_bit=int(signal[3][1]),
+                            byte_order=(0 if signal[3][2] == '0' else 1),
+                            value_type=(0 if signal[3][3] == '+' else 1),
+                            factor=num(signal[4][0]),
+                            offset=num(signal[4][1]),
+                            value_min=num(signal[5][0]),
+                            value_max=num(signal[5][1]),
+                            unit=signal[6],
+                            value_table=None,
+                            comment=None
+                        ))
+                    elif signal[2][0] == 'm':
+                        message.signals.append(Signal(
+                            name=signal[1],
+                            multi_type=int(signal[2][1]),
+                            start_bit=int(signal[3][0]),
+                            length_bit=int(signal[3][1]),
+                            byte_order=(0 if signal[3][2] == '0' else 1),
+                            value_type=(0 if signal[3][3] == '+' else 1),
+                            factor=num(signal[4][0]),
+                            offset=num(signal[4][1]),
+                            value_min=num(signal[5][0]),
+                            value_max=num(signal[5][1]),
+                            unit=signal[6],
+                            value_table=None,
+                            comment=None
+                        ))
+                    else:
+                        message.signals.append(Signal(
+                            name=signal[1],
+                            multi_type='N',
+                            start_bit=int(signal[2][0]),
+                            length_bit=int(signal[2][1]),
+                            byte_order=(0 if signal[2][2] == '0' else 1),
+                            value_type=(0 if signal[2][3] == '+' else 1),
+                            factor=num(signal[3][0]),
+                            offset=num(signal[3][1]),
+                            value_min=num(signal[4][0]),
+                            value_max=num(signal[4][1]),
+                            unit=signal[5],
+                            value_table=None,
+                            comment=None
+                        ))
+                for sig in message.signals:
+                    # if message.id_dec in valtypes.keys():
+                    #     if sig.name in valtypes[message.id_dec]:
+                    #         sig.value_type = valtypes[message.id_dec][sig.name]
+                    if message.id_dec in value_tables.keys():
+                        if sig.name in value_tables[message.id_dec]:
+                            sig.value_table = value_tables[message.id_dec][sig.name]
+                    if message.id_dec in sig_comments.keys():
+                        if sig.name in sig_comments[message.id_dec]:
+                            sig.comment = sig_comments[message.id_dec][sig.name]
+                self.add_message(message)
+
+    def read_dbcfile_lines(self, dbc_file_lines):
+        """
+        parser DBC file line by line in a single pass, create the same messages / signals information as read_dbcfile without building a token tree of the whole file.
+        statements that are not used by read_dbcfile (BA_, BA_DEF_, VAL_TABLE_, ...) are skipped, statements spanning several lines (multi-line comments) are joined before parsing.
+        """
+        msg_comments = {}
+        sig_comments = {}
+        valtypes = {}
+        value_tables = {}
+        messages = []
+        message = None
+        statement = None
+        in_symbols = False
+
+        for line in dbc_file_lines:
+            if statement is None:
+                stripped = line.strip()
+                if not stripped:
+                    continue
+                # the symbol list following NS_ holds one keyword per line, it must not be read as statements
+                if in_symbols and RE_SYMBOL.match(stripped):
+                    continue
+                in_symbols = stripped.startswith('NS_ ') or stripped.startswith('NS_:')
+                if stripped.startswith(SIGNAL + ' '):
+                    if message is not None:
+                        signal = parse_signal_line(stripped)
+                        if signal is not None:
+                            message.signals.append(signal)
+                    continue
+                match = RE_MESSAGE.match(stripped)
+                if match:
+                    message = None
+                    if match.group(1) != '3221225472':
+                        message = Message(int(match.group(1)), match.group(2), int(match.group(3)), transmitter=match.group(4))
+                        message.signals = []
+                        messages.append(message)
+                    continue
+                message = None
+                statement = stripped
+            else:
+                statement += '\n' + line.rstrip('\r\n')
+            # a statement is complete when all its quoted strings are closed (and it ends with a semicolon if it is expected to)
+            if statement.count('"') % 2 == 1:
+                continue
+            if statement.startswith(MULTILINE_STATEMENTS) and not statement.rstrip().endswith(';'):
+                continue
+            self.parse_dbc_statement(statement, msg_comments, sig_comments, valtypes, value_tables)
+            statement = None
+
+        for message in messages:
+            if message.id_dec in msg_comments.keys():
+                message.comment = msg_comments[message.id_dec]
+            for sig in message.signals:
+                if message.id_dec in value_tables.keys():
+                    if sig.name in value_tables[message.id_dec]:
+                        sig.value_table = value_tables[message.id_dec][sig.name]
+                if message.id_dec in sig_comments.keys():
+                    if sig.name in sig_comments[message.id_dec]:
+                        sig.comment = sig_comments[message.id_dec][sig.name]
+            self.add_message(message)
+
+    def parse_dbc_statement(self, statement, msg_comments, sig_comments, valtypes, value_tables):
+        """
+        parser one complete DBC statement (other than BO_ and SG_) and store its content to the given dictionaries, unused statements are ignored.
+        """
+        if statement.startswith(COMMENT):
+            match = RE_MESSAGE_COMMENT.match(statement)
+            if match:
+                frame_id = int(match.group(1))
+                if frame_id not in msg_comments.keys():
+                    msg_comments[frame_id] = unescape_whitespace(match.group(2))
+                return
+            match = RE_SIGNAL_COMMENT.match(statement)
+            if match:
+                frame_id = int(match.group(1))
+                if frame_id not in sig_comments.keys():
+                    sig_comments[frame_id] = {}
+                sig_comments[frame_id][match.group(2)] = unescape_whitespace(match.group(3))
+        elif statement.startswith(VALTYPE):
+            match = RE_VALTYPE.match(statement)
+            if match:
+                frame_id = int(match.group(1))
+                if frame_id not in valtypes:
+                    valtypes[frame_id] = {}
+                valtypes[frame_id][match.group(2)] = int(match.group(3))
+        elif statement.startswith(VALUETABLE + ' '):
+            match = RE_VALUETABLE.match(statement)
+            if match:
+                frame_id = int(match.group(1))
+                if frame_id not in value_tables.keys():
+                    value_tables[frame_id] = {}
+                value_tables[frame_id][match.group(2)] = [(int(v[0]), unescape_whitespace(v[1])) for v in RE_VALUE_PAIR.findall(match.group(3))]
+        elif statement.startswith(VERSION):
+            match = RE_VERSION.match(statement)
+            if match:
+                self.version = unescape_whitespace(match.group(1))
+        elif statement.startswith(ECU):
+            match = RE_ECU.match(statement)
+            if match and match.group(1).split():
+                self.ecus = match.group(1).split()[0]
+
+    def create_dbc_grammar(self):
+        """Create DBC grammar.
+        """
+
+        # DBC file grammar
+        word = Word(printables, excludeChars=':')
+        integer = Combine(Optional(Literal('-')) + Word(nums))
+        number = Word(nums + '.Ee-+')
+        colon = Suppress(Literal(':'))
+        scolon = Suppress(Literal(';'))
+        pipe = Suppress(Literal('|'))
+        at = Suppress(Literal('@'))
+        sign = Literal('+') | Literal('-')
+        lp = Suppress(Literal('('))
+        rp = Suppress(Literal(')'))
+        lb = Suppress(Literal('['))
+        rb = Suppress(Literal(']'))
+        comma = Suppress(Literal(','))
+        multiplexor = Literal('M')
+        multiplexed = Group(Literal('m') + number)
+
+        version = Group(Keyword('VERSION') + QuotedString('"', multiline=True))
+        symbol = Word(alphas + '_') + Suppress(LineEnd())
+        symbols = Group(Keyword('NS_') + colon + Group(ZeroOrMore(symbol)))
+        discard = Suppress(Keyword('BS_') + colon)
+        ecu = Group(Keyword('BU_') + colon + ZeroOrMore(Word(printables).setWhitespaceChars(' \t')))
+        signal = Group(Keyword(SIGNAL) + word + ZeroOrMore(multiplexor | multiplexed) + colon +
+                       Group(integer + pipe + integer + at + integer + sign) +
+                       Group(lp + number + comma + number + rp) +
+                       Group(lb + number + pipe + number + rb) +
+                       QuotedString('"', multiline=True) + word)
+        message = Group(Keyword(MESSAGE) + integer + word + colon + integer + word + Group(ZeroOrMore(signal)))
+        comment = Group(Keyword(COMMENT) + (
+                (Keyword(MESSAGE) + integer + QuotedString('"', multiline=True) + scolon) |
+                (Keyword(SIGNAL) + integer + word + QuotedString('"', multiline=True) + scolon)))
+        badef = Group(Keyword(BADEF) + Optional(Keyword('BU_') | Keyword('BO_') | Keyword('SG_') | Keyword('EV_')) +
+                      QuotedString('"') + (((Keyword('INT') | Keyword('HEX') | Keyword(
+            'FLOAT')) + integer + integer + scolon) | (Keyword('ENUM') +
+                                                       OneOrMore(QuotedString('"') + Optional(comma)) + scolon) | (
+                                                       Keyword('STRING') + scolon)))
+        badefdef = Group(Keyword(BADEFDEF) + QuotedString('"') + (QuotedString('"') | integer) + scolon)
+        badefref = Group(Keyword(BADEFREF) + QuotedString('"') + (QuotedString('"') | integer) + scolon)
+        ba = Group(Keyword(BA) + QuotedString('"') + Optional(
+            Keyword('BU_') | Keyword('BO_') | Keyword('SG_') | Keyword('EV_')) + (
+                               QuotedString('"') | OneOrMore(Word(alphanums))) + scolon)
+
+        valtable = Group(Keyword('VAL_TABLE_') + Word(alphanums + '_') + Group(
+            OneOrMore(Group(integer + QuotedString('"', multiline=True)))) + scolon)
+
+        valtype = Group(Keyword(VALTYPE) + integer + word + colon + integer + scolon)
+
+        choice = Group(Keyword(VALUETABLE) + integer + word + Group(
+            OneOrMore(Group(integer + QuotedString('"', multiline=True)))) + scolon)
+
+        entry = version | symbols | discard | ecu | message | comment | ba | badef | badefdef | badefref | valtable | valtype | choice
+        grammar = OneOrMore(entry)
+
+        return grammar
+
+    def add_message(self, message):
+        self.messages.append(message)
+        self.msg_id_dec[message.id_dec] = message
+        self.msg_id_hex[message.id_hex] = message
+
+    def decode_message(self, frame_id, data):
+        """Decode a message
+        """
+
+        message = self.msg_id_dec[frame_id]
+        message_dict = {'dlc': message.dlc, 'signals': {signal.name: vars(signal) for signal in message.signals}}
+        payload = np.frombuffer(bytes(data), dtype=np.uint8).reshape(1, -1)
+        decoded = decode_message_frames(message_dict, payload, np.zeros(1))
+        return {name: samples[0] for name, (_, samples) in decoded.items()}
+
+
+def parse_signal_line(line):
+    """
+    Parser one SG_ line of the DBC file to a Signal object (used by the line-oriented parser)
+    :param line: a string of the SG_ line, without leading whitespaces
+    :return: a Signal object, or None if the line is not a valid signal definition
+    """
+    match = RE_SIGNAL.match(line)
+    if match is None:
+        return None
+    name, multiplex, start_bit, length_bit, byte_order, sign, factor, offset, value_min, value_max, unit = match.groups()
+    if multiplex is None:
+        multi_type = 'N'
+    elif multiplex == 'M':
+        multi_type = 'M'
+    else:
+        multi_type = int(multiplex[1:])
+    return Signal(
+        name=name,
+        multi_type=multi_type,
+        start_bit=int(start_bit),
+        length_bit=int(length_bit),
+        byte_order=(0 if byte_order == '0' else 1),
+        value_type=(0 if sign == '+' else 1),
+        factor=num(factor),
+        offset=num(offset),
+        value_min=num(value_min),
+        value_max=num(value_max),
+        unit=unescape_whitespace(unit),
+        value_table=None,
+        comment=None
+    )
+
+
+def unescape_whitespace(text):
+    """
+    Convert the escaped whitespaces in a quoted DBC string the same way as pyparsing's QuotedString does
+    :param text: the content of the quoted string
+    :return: the converted string
+    """
+    if '\\' not in text:
+        return text
+    for escaped, whitespace in ((r'\t', '\t'), (r'\n', '\n'), (r'\f', '\f'), (r'\r', '\r')):
+        text = text.replace(escaped, whitespace)
+    return text
+
+
+def load_dbc(file_path, parser='pyparsing'):
+    """
+    Load the dbc file from the given directory
+    :param file_path: the path of directory storing all dbc files
+    :param parser: 'pyparsing' to parse the file with the pyparsing grammar, 'lines' to parse it line by line with the faster line-oriented parser
+    :return: a dictionary containing info extracted from DBC
+    """
+    if parser not in DBC_PARSERS:
+        raise ValueError('Unknown DBC parser: ' + str(parser) + ', expected one of ' + ', '.join(DBC_PARSERS))
+    dbc = DBCFile()
+    with open(file_path, 'r', encoding='utf8', errors='replace') as f:
+        if parser == 'lines':
+            dbc.read_dbcfile_lines(f)
+        else:
+            dbc.read_dbcfile(f.read())
+
+    msg_dict = {message.id_dec: {
+                'id_dec': message.id_dec,
+                'id_hex': message.id_hex,
+                'name': message.name,
+                'dlc': message.dlc,
+                'comment': message.comment,
+                'signals': {signal.name: {'name': signal.name,
+                                            'multi_type': signal.multi_type,
+                                            'start_bit': signal.start_bit,
+                                            'length_bit': signal.length_bit,
+                                            'byte_order':  signal.byte_order,
+                                            'value_type': signal.value_type,
+                                            'factor': signal.factor,
+                                            'offset': signal.offset,
+                                            'value_min': signal.value_min,
+                                            'value_max': signal.value_max,
+                                            'unit': signal.unit,
+                                            'value_table': signal.value_table,
+                                            'comment': signal.comment}
+                            for signal in message.signals}}
+                for message in dbc.messages if message.name != 'VECTOR__INDEPENDENT_SIG_MSG'}
+    return msg_dict
+
+
+def load_dbc_cached(file_path, cache_dir, parser='pyparsing'):
+    """
+    Load the dbc file through the on-disk cache, the cache entry is keyed by the file path, the hash of the file content and the parser version, so it is parsed again whenever the DBC changes
+    :param file_path: the path of the dbc file
+    :param cache_dir: the root directory of the cache
+    :param parser: the parser used by load_dbc
+    :return: a tuple of the dictionary generated by load_dbc, a boolean of whether the cache was hit, and the seconds saved by the cache
+    """
+    t0 = time.time()
+    key = {'path': os.path.abspath(file_path), 'sha256': file_digest(file_path), 'parser': parser, 'parser_version': DBC_PARSER_VERSION}
+    entry_path = cache_entry_path(cache_dir, 'dbc', file_path)
+    entry = read_cache_entry(entry_path, key)
+    if entry is not None:
+        return entry['messages'], True, entry['parse_time'] - (time.time() - t0)
+
+    t1 = time.time()
+    messages = load_dbc(file_path, parser)
+    write_cache_entry(entry_path, key, messages=messages, parse_time=time.time() - t1)
+    return messages, False, 0.0
+
+
+def prune_dbc_lines(dbc_file_lines, message_ids):
+    """
+    Keep only the given messages of a DBC file: the BO_ blocks of the other messages and every statement bound to them (comments, value tables, attributes...) are left out, the rest of the file is kept as it is
+    :param dbc_file_lines: an iterable of the lines of the dbc file
+    :param message_ids: a set of the message ids (decimal) to keep
+    :return: a list of the lines of the pruned dbc file
+    """
+    pruned = []
+    statement = []
+    keep_message = False
+    in_symbols = False
+    for line in dbc_file_lines:
+        line = line.rstrip('\r\n')
+        if not statement:
+            stripped = line.strip()
+            if in_symbols and RE_SYMBOL.match(stripped):
+                pruned.append(line)
+                continue
+            if not stripped:
+                # the blank lines around the left out messages are collapsed
+                if len(pruned) < 2 or pruned[-1].strip() or pruned[-2].strip():
+                    pruned.append(line)
+                continue
+            in_symbols = stripped.startswith('NS_ ') or stripped.startswith('NS_:')
+            if stripped.startswith(SIGNAL + ' '):
+                if keep_message:
+                    pruned.append(line)
+                continue
+            match = RE_MESSAGE.match(stripped)
+            if match:
+                keep_message = int(match.group(1)) in message_ids
+                if keep_message:
+                    pruned.append(line)
+                continue
+            keep_message = False
+        statement.append(line)
+        # the same completeness rule as read_dbcfile_lines, a statement may span several lines
+        text = '\n'.join(statement)
+        if text.count('"') % 2 == 1:
+            continue
+        if text.lstrip().startswith(MULTILINE_STATEMENTS) and not text.rstrip().endswith(';'):
+            continue
+        match = RE_MESSAGE_STATEMENT.match(text.lstrip())
+        if match is None or int(match.group(1)) in message_ids:
+            pruned.extend(statement)
+        statement = []
+    pruned.extend(statement)
+    return pruned
+
+
+def build_signal_index(total_messages, wanted_signals):
+    """
+    Find where every wanted signal is defined
+    :param total_messages: the total_messages generated from load_total_matrix
+    :param wanted_signals: a list containing wanted signals
+    :return: a dictionary with keys as the wanted signals defined in the dbc files, values as dictionaries with keys as the CAN channel names, values as the id of the message defining the signal on this channel
+    """
+    wanted = set(wanted_signals)
+    signal_index = {}
+    for channel_key, channel_messages in total_messages.items():
+        for msg_id, message in channel_messages.items():
+            for sig in wanted.intersection(message['signals']):
+                signal_index.setdefault(sig, {}).setdefault(channel_key, msg_id)
+    return signal_index
+
+
+def wanted_message_ids(channel_messages, wanted_signals):
+    """
+    :param channel_messages: the messages of one channel, generated by load_total_matrix
+    :param wanted_signals: a list containing wanted signals
+    :return: a set of the ids of the messages carrying at least one wanted signal
+    """
+    wanted = set(wanted_signals)
+    return set(msg_id for msg_id, message in channel_messages.items() if not wanted.isdisjoint(message['signals']))
+
+
+def prune_channel_dbcs(dbcfiles, total_messages, wanted_signals, prune_dir):
+    """
+    Write a pruned copy of every channel's DBC files holding only the messages that carry wanted signals (the camera id is one of the wanted signals), so that extract_can_logging loads and decodes only these messages
+    :param dbcfiles: the total_fullpath generated from load_total_matrix
+    :param total_messages: the total_messages generated from load_total_matrix
+    :param wanted_signals: a list containing wanted signals
+    :param prune_dir: the directory to write the pruned dbc files in
+    :return: a dictionary in the form of dbcfiles, with the paths of the pruned dbc files
+    """
+    t0 = time.time()
+    os.makedirs(prune_dir, exist_ok=True)
+    pruned_dbcs = {}
+    written = {}
+    kept, total = 0, 0
+    for channel_key, paths in dbcfiles.items():
+        message_ids = wanted_message_ids(total_messages.get(channel_key, {}), wanted_signals)
+        kept += len(message_ids)
+        total += len(total_messages.get(channel_key, {}))
+        pruned_dbcs[channel_key] = []
+        for dbc_path in paths:
+            # channels sharing a DBC file and the same wanted messages share one pruned file
+            key = (os.path.abspath(dbc_path), tuple(sorted(message_ids)))
+            if key not in written:
+                with open(dbc_path, 'r', encoding='utf8', errors='replace') as f:
+                    lines = prune_dbc_lines(f, message_ids)
+                name_hash = hashlib.sha1(json.dumps(key).encode('utf8')).hexdigest()[:16]
+                pruned_path = os.path.join(prune_dir, os.path.splitext(os.path.basename(dbc_path))[0] + '-' + name_hash + '.dbc')
+                # a temporary file of its own, so that runs sharing the directory never write to the same file
+                fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=prune_dir)
+                with os.fdopen(fd, 'w', encoding='utf8') as f:
+                    f.write('\n'.join(lines) + '\n')
+                os.replace(tmp_path, pruned_path)
+                written[key] = pruned_path
+            pruned_dbcs[channel_key].append(written[key])
+    print('Pruned DBC files: ' + str(kept) + ' of ' + str(total) + ' message(s) kept over ' + str(len(dbcfiles)) + ' channel(s), time elapsed: ' + str(time.time() - t0) + 's')
+    return pruned_dbcs
+
+
+def num(s):
+    """
+    convert a string to integer or float
+    :param s: a string of number
+    :return: an int or float type number
+    """
+    try:
+        return int(s)
+    except ValueError:
+        return float(s)
+    else:
+        raise ValueError('Expected integer or floating point number.')
+
+
+# def read_mf4(file_path, dbc):
+#     mdf = MDF(file_path, "r")
+#     print(mdf)
+#     information = mdf.extract_can_logging(dbc)
+#     data = information.to_dataframe()
+#     return data
+
+
+def extract_wanted_signal_data(dataframe, signal_excel_path):
+    signals = pd.read_excel(signal_excel_path)
+    names = list(signals["Name"])
+    return dataframe.reindex(columns=names)
+
+
+def load_total_matrix(root_path, dbc_channel_files, cache_dir=None, parser='pyparsing'):
+    """
+    Load all the DBC files of every CAN channel
+    :param root_path: the directory where all the dbc files locate
+    :param dbc_channel_files: a dictionary, key is the CAN channel name, value is the list of dbc file names of this channel
+    :param cache_dir: the root directory of the parsed DBC cache (None to always parse the DBC files)
+    :param parser: the parser used by load_dbc ('pyparsing' or 'lines')
+    :return: a tuple of dictionaries with keys as the CAN channel names, values as respectively the dbc files' full paths, the messages and the signals of this channel
+    """
+    total_messages, total_signals, total_fullpath = {}, {}, {}
+    cache_hit, cache_miss, time_saved = 0, 0, 0.0
+    # the same DBC file is often used by several channels (ex: Ch3 and Ch5), it is parsed only once and the channels share the parsed objects
+    parsed_dbcs = {}
+    channel_views = {}
+    for channel_key, file_list in dbc_channel_files.items():
+        total_fullpath[channel_key] = []
+        channel_dbcs = []
+        if len(file_list) == 0:
+            print("No DBC for channel: " + channel_key[-1])
+        else:
+            for file in file_list:
+                full_path = os.path.join(root_path, file)
+                if os.path.exists(full_path):
+                    if os.path.splitext(full_path)[-1] != ".dbc":
+                        print("File is not DBC file: " + full_path)
+                    else:
+                        resolved_path = os.path.normcase(os.path.realpath(full_path))
+                        if resolved_path not in parsed_dbcs:
+                            if cache_dir:
+                                messages, hit, saved = load_dbc_cached(full_path, cache_dir, parser)
+                                if hit:
+                                    cache_hit += 1
+                                    time_saved += saved
+                                else:
+                                    cache_miss += 1
+                            else:
+                                messages = load_dbc(full_path, parser)
+                            parsed_dbcs[resolved_path] = messages
+                        channel_dbcs.append(resolved_path)
+                        total_fullpath[channel_key].append(full_path)
+                else:
+                    print("No such DBC file: " + full_path)
+
+        # channels with the same list of DBC files share the same message and signal dictionaries
+        view_key = tuple(channel_dbcs)
+        if view_key not in channel_views:
+            channel_messages, channel_signals = {}, {}
+            for resolved_path in channel_dbcs:
+                channel_messages.update(parsed_dbcs[resolved_path])
+            for msg in channel_messages:
+                for sig in channel_messages[msg]["signals"]:
+                    channel_signals[sig] = channel_messages[msg]["signals"][sig]
+            channel_views[view_key] = (channel_messages, channel_signals)
+        total_messages[channel_key], total_signals[channel_key] = channel_views[view_key]
+    print("Parsed " + str(len(parsed_dbcs)) + " DBC file(s) for " + str(len(dbc_channel_files)) + " channel(s)")
+    if cache_dir:
+        print("DBC cache: " + str(cache_hit) + " hit(s), " + str(cache_miss) + " miss(es), " + "{:.2f}".format(time_saved) + "s saved")
+    return total_fullpath, total_messages, total_signals
+
+
+def loadMF4data2Dict(file, wanted_signals, dbcfiles=None, compact=False, decode_dbcs=None, signal_index=None, decoder_messages=None):
+    """
+    Use the given signals, extract the wanted data from the data file
+    :param file: the path of mf4 file
+    :param wanted_signals: a list containing wanted signals
+    :param dbcfiles: the total_fullpath generated from load_total_matrix
+    :param compact: store every signal as a SignalSamples object (sharing the timestamps of the same CAN message) instead of a one-column dataframe
+    :param decode_dbcs: the dbc files actually used to decode every channel, in the form of dbcfiles (ex: generated by prune_channel_dbcs), None to decode with dbcfiles
+    :param signal_index: the dictionary generated by build_signal_index, only the channels defining a wanted signal not found yet are decoded and only the signals defined on a channel are read from it (None to try every signal on every channel)
+    :param decoder_messages: the total_messages generated from load_total_matrix to decode the raw CAN frames with the numpy decoder of frame_decoder (decode_dbcs is then not used), None to decode with asammdf extract_can_logging
+    :return: a dictionary
+    """
+    if decode_dbcs is None:
+        decode_dbcs = dbcfiles
+    if not os.path.exists(file):
+        print("Data file not found.")
+        return None
+    t0 = time.time()
+    mdffile = None
+    try:
+        # the file is parsed only once, every channel is filtered out of this handle instead of re-opening the file
+        mdffile = asammdf.MDF(file, 'r')
+
+        # signalList = list(mdffile.channels_db.keys())
+        # print(signalList)
+        # count = 0
+        # total_sig_count = sum([len(totalSignals[channel_key]) for channel_key in totalSignals])
+        # for sig in signalList:
+        #     flag = 0
+        #     if 'CAN_' in sig or 'Vector' in sig or 'time' == sig:
+        #         continue
+        #     else:
+        #         for channel_key in totalSignals:
+        #             if sig in totalSignals[channel_key]:
+        #                 flag = 1
+        #         if flag == 1:
+        #             count += 1
+
+        data = {}
+        timestamp_pool = {}
+        can_bus_map = mdffile.bus_logging_map['CAN']
+        channel_found = False
+        for channel_key in dbcfiles:
+            channel_num = int(channel_key.split('Ch')[-1])
+            if channel_num in can_bus_map:
+                channel_found = True
+                channel_wanted = wanted_signals
+                if signal_index is not None:
+                    channel_wanted = [w for w in wanted_signals if channel_key in signal_index.get(w, {}) and data.get(w) is None]
+                    if len(channel_wanted) == 0:
+                        continue
+                channel_index = list(can_bus_map[channel_num].values())[0]
+                if decoder_messages is not None:
+                    frames = read_can_frames(mdffile, channel_index, channel_num)
+                    decoded = decode_can_frames(*frames, decoder_messages.get(channel_key, {}), channel_wanted)
+                    for w in channel_wanted:
+                        if data.get(w) is None:
+                            if w not in decoded:
+                                data[w] = None
+                            elif compact:
+                                data[w] = SignalSamples(w, share_timestamps(timestamp_pool, decoded[w][0]), decoded[w][1])
+                            else:
+                                data[w] = pd.DataFrame(decoded[w][1], index=decoded[w][0], columns=[w])
+                    continue
+                mdffile_ext = mdffile.filter([(None, channel_index, 1)]).extract_can_logging(decode_dbcs[channel_key])
+                for w in channel_wanted:
+                    try:
+                        if (w not in data) or (data[w] is None):
+                            if signal_index is not None and w not in mdffile_ext.channels_db:
+                                # the message of the signal is not logged on this channel
+                                data[w] = None
+                                continue
+                            tmpdata = mdffile_ext.get(w)
+                            if compact:
+                                data[w] = SignalSamples(w, share_timestamps(timestamp_pool, tmpdata.timestamps), tmpdata.samples)
+                            else:
+                                data[w] = pd.DataFrame(tmpdata.samples, index=tmpdata.timestamps, columns=[w])
+                    except:
+                        data[w] = None
+    except Exception as e:
+        print(file + ': ' + str(e))
+        return {}
+    finally:
+        if mdffile is not None:
+            mdffile.close()
+
+    if signal_index is not None and channel_found:
+        # the signals defined on none of the logged channels
+        for w in wanted_signals:
+            data.setdefault(w, None)
+    if len(data.keys()) == 0:
+        print('No valid signal in file: ' + os.path.split(file)[-1])
+    print('Loaded: ' + os.path.split(file)[-1] + ', time elapsed: ' + str(time.time() - t0) + 's')
+    return data
+
+
+
+# content hashes of the DBC files already fingerprinted by this process, keyed by (path, size, modification time)
+dbc_digests = {}
+
+
+def dbc_fingerprint(dbcfiles):
+    """
+    Describe the DBC files and the channel mapping used to decode the mf4 files
+    :param dbcfiles: the total_fullpath generated from load_total_matrix
+    :return: a list of [channel name, [[dbc path, content sha256], ...]] sorted by channel name
+    """
+    fingerprint = []
+    for channel_key in sorted(dbcfiles):
+        channel_dbcs = []
+        for dbc_path in dbcfiles[channel_key]:
+            stat = os.stat(dbc_path)
+            digest_key = (os.path.abspath(dbc_path), stat.st_size, stat.st_mtime)
+            if digest_key not in dbc_digests:
+                dbc_digests[digest_key] = file_digest(dbc_path)
+            channel_dbcs.append([os.path.abspath(dbc_path), dbc_digests[digest_key]])
+        fingerprint.append([channel_key, channel_dbcs])
+    return fingerprint
+
+
+def read_signal_cache(entry_path, key):
+    """
+    Read the decoded signals of one mf4 file from its cache entry
+    :param entry_path: the path of the .npz cache entry
+    :param key: the string describing the mf4 file and the DBC files, the entry is only valid if it was written with the same key
+    :return: a tuple of a dictionary with keys as the signal names, values as tuples of (timestamps, samples), and a set of the signals known to be missing in the file
+    """
+    cached, missing = {}, set()
+    if not os.path.exists(entry_path):
+        return cached, missing
+    try:
+        with np.load(entry_path, allow_pickle=True) as entry:
+            if str(entry['key']) != key:
+                return cached, missing
+            for idx, name in enumerate(entry['names']):
+                cached[str(name)] = (entry['t' + str(idx)], entry['v' + str(idx)])
+            missing = set(str(name) for name in entry['missing'])
+    except Exception as e:
+        print('Cannot read cache entry: ' + entry_path + ', ' + str(e))
+        return {}, set()
+    return cached, missing
+
+
+def write_signal_cache(entry_path, key, cached, missing):
+    """
+    Write the decoded signals of one mf4 file to its compressed .npz cache entry
+    :param entry_path: the path of the .npz cache entry
+    :param key: the string describing the mf4 file and the DBC files
+    :param cached: a dictionary with keys as the signal names, values as tuples of (timestamps, samples)
+    :param missing: a set of the signals known to be missing in the file
+    :return: None
+    """
+    names = list(cached)
+    arrays = {'key': np.array(key), 'names': np.array(names, dtype=str), 'missing': np.array(sorted(missing), dtype=str)}
+    for idx, name in enumerate(names):
+        arrays['t' + str(idx)] = cached[name][0]
+        arrays['v' + str(idx)] = cached[name][1]
+    tmp_path = entry_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, entry_path)
+
+
+def load_mf4_cached(file, wanted_signals, dbcfiles, cache_dir, compact=False, decode_dbcs=None, signal_index=None, decoder_messages=None):
+    """
+    Same as loadMF4data2Dict, but the decoded signals are kept in an on-disk cache keyed by the mf4 file's path, size and modification time, the DBC files' content hashes, the channel mapping and the frame decoder; only the signals missing from the cache are decoded
+    :param file: the path of mf4 file
+    :param wanted_signals: a list containing wanted signals
+    :param dbcfiles: the total_fullpath generated from load_total_matrix
+    :param cache_dir: the root directory of the cache
+    :param compact: store every signal as a SignalSamples object instead of a one-column dataframe
+    :param decode_dbcs: the dbc files used to decode the signals missing from the cache (see loadMF4data2Dict), the cache stays keyed by dbcfiles
+    :param signal_index: the dictionary generated by build_signal_index (see loadMF4data2Dict)
+    :param decoder_messages: the total_messages used by the numpy decoder (see loadMF4data2Dict), None to decode with asammdf
+    :return: a dictionary with keys as the wanted signals, values as the dataframes (or SignalSamples) of the signals (None if the signal is not in the file)
+    """
+    if not os.path.exists(file):
+        print("Data file not found.")
+        return None
+    stat = os.stat(file)
+    # the decoders differ on the multiplexed signals, so the signals decoded by one are never served to the other
+    key = json.dumps({'path': os.path.abspath(file), 'size': stat.st_size, 'mtime': stat.st_mtime,
+                      'dbc': dbc_fingerprint(dbcfiles), 'decoder': 'numpy' if decoder_messages is not None else 'asammdf',
+                      'version': SIGNAL_CACHE_VERSION}, sort_keys=True)
+    entry_path = cache_entry_path(cache_dir, 'signals', file, '.npz')
+    cached, missing = read_signal_cache(entry_path, key)
+
+    to_decode = [w for w in wanted_signals if w not in cached and w not in missing]
+    if len(to_decode) > 0:
+        decoded = loadMF4data2Dict(file, to_decode, dbcfiles, True, decode_dbcs, signal_index, decoder_messages)
+        if not decoded:
+            return decoded
+        for w in to_decode:
+            if decoded.get(w) is None:
+                missing.add(w)
+            else:
+                cached[w] = (decoded[w].timestamps, decoded[w].samples)
+        write_signal_cache(entry_path, key, cached, missing)
+    print('Signal cache: ' + os.path.split(file)[-1] + ', ' + str(len(wanted_signals) - len(to_decode)) + ' signal(s) from cache, ' + str(len(to_decode)) + ' decoded')
+
+    data = {}
+    timestamp_pool = {}
+    for w in wanted_signals:
+        if w not in cached:
+            data[w] = None
+        elif compact:
+            data[w] = SignalSamples(w, share_timestamps(timestamp_pool, cached[w][0]), cached[w][1])
+        else:
+            data[w] = pd.DataFrame(cached[w][1], index=cached[w][0], columns=[w])
+    return data
+
+
+if __name__ == "__main__":
+    # path = "C:\\Users\\Z0050908\\Documents\\Reinj_data\\GWM_V71_39_02A01_RB_test_2020_08_26_070508#k826070508q1a24a7\\GWM_V71_39_02A01_RB_test_2020_08_26_070508_log_015.mf4"
+    # # path = "C:\\Users\\Z0050908\\Documents\\Reinj_data\\Raw data\\GWM_TimeSycn_142_2020_07_11_070917_log_007.mf4"
+    #
+    # dbc_path = "C:\\Users\\Z0050908\\Desktop\\read_can_dbc"
+    # # dbc_path = "C:\\Users\Z0050908\\Desktop\\read_can_dbc"
+    # signal = "C:\\Users\\Z0050908\\Desktop\\FR-IFC-Private CAN_Checklist.xlsx"
+    #
+    # # print(pd.read_excel(signal))
+    # dbc = load_dbc(dbc_path)
+    # data = read_mf4(path, dbc)
+    # print(data.shape)
+    # print(extract_wanted_signal_data(data, signal))
+
+    rootpath = "C:\\Users\\Z0050908\\Downloads"
+    dbcs = {"Ch3": ['GWM V71 CAN 01C.dbc'], "Ch4": ['FR-IFC-Private CAN.dbc'], "Ch5": ['GWM V71 CAN 01C.dbc'], "Ch6": ['FR-IFC-Private CAN.dbc']}
+    path_w = "C:\\Users\\Z0050908\\Documents\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\[Reinjection 2] Session_2020_08_26_053716_log_001.mf4"
+    path_w_ori = "C:\\Users\\Z0050908\\Documents\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\Log_FURel02A01_Reinjection_Rel02A01_0825_offline_release_SW_Data_20200826\\[Original] Traffic_signs_and_Lights_2020_08_20_2020_08_20_060823_log_001.mf4"
+    path_g = "C:\\Users\\Z0050908\\Documents\\Reinj_data\\GWM_V71_39_02A01_RB_test_2020_08_26_070508#k826070508q1a24a7\\GWM_V71_39_02A01_RB_test_2020_08_26_070508_log_001.mf4"
+    A, B, C = load_total_matrix(rootpath, dbcs)
+    # print(A, B, C)
+
+    signal_excel_path = "C:\\Users\\Z0050908\\Desktop\\FR-IFC-Private CAN_Checklist.xlsx"
+    signals = pd.read_excel(signal_excel_path)
+    wanted = signals[(signals["Priority"] == 1) & (signals["Alignment"] == "Agree")]["Name"]
+    dat = loadMF4data2Dict(path_w, wanted, A)
+    print(dat.keys())
+    for s in wanted:
+        try:
+            print("exist:", s, dat[s])
+        except:
+            print("not exist:",  s)
+    print(1)
+
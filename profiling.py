@@ -0,0 +1,134 @@
+"""
+Function: record the wall time, CPU time and peak memory of every stage of a run, write them as a JSON and a CSV run profile, and optionally profile one stage with cProfile
+Date: 10/17/2026
+"""
+
+import cProfile
+import csv
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class RunProfile:
+    """
+    The timing records of one run, the stages may be measured from several threads (ex: the stages of the pipelined report)
+    Attributes:
+        enabled: whether the stages are recorded (a disabled profile costs nothing, so the stages can always be wrapped)
+        trace_memory: whether the peak memory of every stage is traced with tracemalloc (slows the run down)
+        cprofile_stage: the name of the stage to run under cProfile (None for no cProfile)
+        cprofile_path: the path prefix of the cProfile output (<cprofile_path>_<stage>.prof)
+        records: a list of dictionaries, one per finished stage: stage, item, wall_s, cpu_s, peak_mb (None if memory is not traced), depth (the number of stages it is nested in)
+    Methods:
+        stage: a context manager measuring one stage
+        add_record: add a stage measured elsewhere (ex: in a worker process)
+        summary: the totals per stage name
+        write: write the records and the summary as <path>.json and <path>.csv
+    """
+
+    def __init__(self, enabled=True, trace_memory=False, cprofile_stage=None, cprofile_path="run_profile"):
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.cprofile_stage = cprofile_stage
+        self.cprofile_path = cprofile_path
+        self.records = []
+        # peaks of the stages being measured, tracemalloc has a single peak so the nested stages fold theirs into the outer ones
+        self._peaks = []
+        self._depth = 0
+        # guards the records and the stage stack (the peaks and the depth)
+        self._lock = threading.Lock()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, item=None):
+        if not self.enabled:
+            yield
+            return
+        with self._lock:
+            if self.trace_memory:
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+                self._peaks.append(0)
+            self._depth += 1
+        profiler = cProfile.Profile() if name == self.cprofile_stage else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = None
+            with self._lock:
+                self._depth -= 1
+                if self.trace_memory:
+                    peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                    if self._peaks:
+                        self._peaks[-1] = max(self._peaks[-1], peak)
+                    peak = peak / 1024 / 1024
+            self.add_record(name, item, wall, cpu, peak)
+            if profiler is not None:
+                self._dump_cprofile(profiler, name, item)
+
+    def add_record(self, name, item, wall, cpu=None, peak_mb=None):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.records.append({"stage": name, "item": item, "wall_s": wall, "cpu_s": cpu, "peak_mb": peak_mb, "depth": self._depth})
+
+    def _records_copy(self):
+        with self._lock:
+            return list(self.records)
+
+    def _dump_cprofile(self, profiler, name, item):
+        path = self.cprofile_path + "_" + name + ("_" + str(len(self.records)) if item is not None else "") + ".prof"
+        profiler.dump_stats(path)
+        print("cProfile of stage " + name + (" (" + str(item) + ")" if item is not None else "") + " saved to: " + path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+
+    def summary(self):
+        """
+        :return: a dictionary with keys as the stage names (in the order they first finished), values as dictionaries of count, total wall and CPU time, and the largest peak memory
+        """
+        totals = {}
+        for record in self._records_copy():
+            total = totals.setdefault(record["stage"], {"count": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_mb": None})
+            total["count"] += 1
+            total["wall_s"] += record["wall_s"]
+            total["cpu_s"] += record["cpu_s"] or 0.0
+            if record["peak_mb"] is not None:
+                total["peak_mb"] = max(total["peak_mb"] or 0.0, record["peak_mb"])
+        return totals
+
+    def write(self, path):
+        """
+        :param path: the path of the output files without extension
+        :return: a tuple of the json and csv file paths
+        """
+        folder = os.path.dirname(os.path.abspath(path))
+        os.makedirs(folder, exist_ok=True)
+        json_path = path + ".json"
+        csv_path = path + ".csv"
+        records = self._records_copy()
+        with open(json_path, "w") as f:
+            json.dump({"summary": self.summary(), "records": records}, f, indent=2)
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["stage", "item", "wall_s", "cpu_s", "peak_mb", "depth"])
+            writer.writeheader()
+            writer.writerows(records)
+        return json_path, csv_path
+
+    def print_summary(self):
+        for name, total in self.summary().items():
+            peak = "" if total["peak_mb"] is None else ", peak {:.1f} MB".format(total["peak_mb"])
+            print("Stage {}: {} time(s), wall {:.2f}s, CPU {:.2f}s{}".format(name, total["count"], total["wall_s"], total["cpu_s"], peak))